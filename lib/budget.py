@@ -0,0 +1,207 @@
+"""
+Token Budgets for Loom
+Run, round and role ceilings enforced through CostTracker, with admission control.
+"""
+
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, field
+
+if TYPE_CHECKING:
+    from .cost_tracker import CostTracker
+
+
+class BudgetExceededError(Exception):
+    """Raised when recorded usage passes a hard budget ceiling."""
+
+    def __init__(self, scope: str, metric: str, limit: float, actual: float):
+        self.scope = scope
+        self.metric = metric
+        self.limit = limit
+        self.actual = actual
+        super().__init__(f"{scope} {metric} budget exceeded: {_format(metric, actual)} > {_format(metric, limit)}")
+
+
+@dataclass
+class PlannedSpawn:
+    """A subagent call about to be dispatched."""
+    role: str
+    task_id: str
+    input_tokens: int
+    output_tokens: Optional[int] = None  # predicted; None: use the role's history
+
+
+@dataclass
+class AdmissionDecision:
+    """
+    Outcome of checking a level of spawns against the budget.
+
+    The planned spawns are never modified; a downgraded spawn's output cap
+    is in output_caps.
+    """
+    admitted: List[PlannedSpawn] = field(default_factory=list)
+    downgraded: List[PlannedSpawn] = field(default_factory=list)  # also in admitted
+    refused: List[PlannedSpawn] = field(default_factory=list)
+    output_caps: Dict[str, int] = field(default_factory=dict)  # task_id -> max output tokens, if downgraded
+    predicted_tokens: int = 0
+    predicted_cost: float = 0.0
+    reasons: Dict[str, str] = field(default_factory=dict)  # task_id -> why downgraded/refused
+
+    @property
+    def all_admitted(self) -> bool:
+        return not self.refused and not self.downgraded
+
+
+@dataclass
+class TokenBudget:
+    """
+    Token and cost ceilings for a run.
+
+    Every ceiling is optional. Per-round ceilings apply to each round
+    separately; per-role ceilings apply to a role's total across the run.
+
+    Enforcement is two-sided:
+    - admit() predicts the cost of the next level before dispatch and
+      admits, downgrades (caps output tokens) or refuses each spawn
+    - With hard=True, CostTracker raises BudgetExceededError as soon as a
+      recorded call takes usage past a ceiling
+    """
+    max_run_tokens: Optional[int] = None
+    max_run_cost: Optional[float] = None
+    max_round_tokens: Optional[int] = None
+    max_round_cost: Optional[float] = None
+    max_role_tokens: Dict[str, int] = field(default_factory=dict)
+    max_role_cost: Dict[str, float] = field(default_factory=dict)
+    hard: bool = True
+    min_output_tokens: int = 1_000  # smallest output cap a downgrade may impose
+    default_output_tokens: int = 4_000  # predicted output for roles with no history
+
+    def _ceilings(self, role: str) -> List[Tuple[str, str, Optional[float]]]:
+        """(scope, metric, limit) for every ceiling a call by role counts against."""
+        return [
+            ("run", "tokens", self.max_run_tokens),
+            ("run", "cost", self.max_run_cost),
+            ("round", "tokens", self.max_round_tokens),
+            ("round", "cost", self.max_round_cost),
+            ("role", "tokens", self.max_role_tokens.get(role)),
+            ("role", "cost", self.max_role_cost.get(role)),
+        ]
+
+    @staticmethod
+    def _usage(tracker: "CostTracker", scope: str, role: str, round_num: int) -> Tuple[int, float]:
+        """Tokens and cost already recorded in a scope."""
+        totals = tracker.get_usage_totals(scope, role=role, round_num=round_num)
+        if totals is None:
+            return 0, 0.0
+        tokens = totals.total_input_tokens + totals.output_tokens
+        return tokens, totals.cost
+
+    def violations(self, tracker: "CostTracker", role: str, round_num: int) -> List[BudgetExceededError]:
+        """
+        Ceilings that recorded usage has passed, for the scopes a call touches.
+
+        Args:
+            tracker: Tracker holding the recorded calls
+            role: Role of the latest call
+            round_num: Round of the latest call
+
+        Returns:
+            One error per exceeded ceiling (empty if within budget)
+        """
+        errors = []
+        for scope, metric, limit in self._ceilings(role):
+            if limit is None:
+                continue
+            tokens, cost = self._usage(tracker, scope, role, round_num)
+            actual = tokens if metric == "tokens" else cost
+            if actual > limit:
+                label = {"run": "run", "round": f"round {round_num}", "role": f"role '{role}'"}[scope]
+                errors.append(BudgetExceededError(label, metric, limit, actual))
+        return errors
+
+    def admit(
+        self,
+        tracker: "CostTracker",
+        planned: List[PlannedSpawn],
+        round_num: int
+    ) -> AdmissionDecision:
+        """
+        Decide which spawns of the next level fit in the remaining budget.
+
+        Spawns are considered in the given order (put the most important
+        first). Each spawn's cost is predicted from its input tokens plus its
+        expected output: the given estimate, else the role's mean output so
+        far, else default_output_tokens. A spawn that does not fit is
+        downgraded to the largest output cap that fits (if at least
+        min_output_tokens, recorded in AdmissionDecision.output_caps),
+        otherwise refused. The planned spawns are left unchanged.
+
+        Args:
+            tracker: Tracker holding the recorded calls
+            planned: Spawns about to be dispatched
+            round_num: Round they belong to
+
+        Returns:
+            AdmissionDecision
+        """
+        decision = AdmissionDecision()
+
+        # Remaining headroom per (scope, metric, key), charged as spawns are admitted
+        headroom: Dict[Tuple[str, str, str], float] = {}
+
+        def remaining(scope: str, metric: str, role: str, limit: float) -> float:
+            key = (scope, metric, role if scope == "role" else "")
+            if key not in headroom:
+                tokens, cost = self._usage(tracker, scope, role, round_num)
+                headroom[key] = limit - (tokens if metric == "tokens" else cost)
+            return headroom[key]
+
+        for spawn in planned:
+            output_tokens = spawn.output_tokens
+            if output_tokens is None:
+                output_tokens = tracker.mean_output_tokens(spawn.role) or self.default_output_tokens
+
+            # Largest output that fits every ceiling this spawn counts against
+            output_cap = float(output_tokens)
+            ceilings = [
+                (scope, metric, limit) for scope, metric, limit in self._ceilings(spawn.role)
+                if limit is not None
+            ]
+            for scope, metric, limit in ceilings:
+                room = remaining(scope, metric, spawn.role, limit)
+                if metric == "tokens":
+                    fits = room - spawn.input_tokens
+                else:
+                    input_cost = tracker.price(spawn.input_tokens, 0, spawn.role)
+                    output_rate = tracker.price(0, 1_000_000, spawn.role) / 1_000_000
+                    fits = (room - input_cost) / output_rate if output_rate else float("inf")
+                output_cap = min(output_cap, fits)
+
+            if output_cap >= output_tokens:
+                admitted_output = output_tokens
+            elif output_cap >= self.min_output_tokens:
+                admitted_output = int(output_cap)
+                decision.output_caps[spawn.task_id] = admitted_output
+                decision.downgraded.append(spawn)
+                decision.reasons[spawn.task_id] = (
+                    f"output capped at {admitted_output:,} tokens (predicted {output_tokens:,})"
+                )
+            else:
+                decision.refused.append(spawn)
+                decision.reasons[spawn.task_id] = "no budget left for this spawn"
+                continue
+
+            decision.admitted.append(spawn)
+            tokens = spawn.input_tokens + admitted_output
+            cost = tracker.price(spawn.input_tokens, admitted_output, spawn.role)
+            decision.predicted_tokens += tokens
+            decision.predicted_cost += cost
+            for scope, metric, limit in ceilings:
+                key = (scope, metric, spawn.role if scope == "role" else "")
+                headroom[key] -= tokens if metric == "tokens" else cost
+
+        return decision
+
+
+def _format(metric: str, value: float) -> str:
+    """Render a budget value: whole tokens, or dollars."""
+    return f"{int(value):,}" if metric == "tokens" else f"${value:,.2f}"
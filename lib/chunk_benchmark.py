@@ -0,0 +1,479 @@
+"""
+Chunking Benchmark for Loom-RLM
+Measures ChunkingStrategy throughput and chunk quality on synthetic inputs.
+"""
+
+from typing import Callable, Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from .chunking import ChunkingStrategy, ChunkingConfig, BoundaryIndex, ChunkSource
+except ImportError:
+    from chunking import ChunkingStrategy, ChunkingConfig, BoundaryIndex, ChunkSource
+
+
+MB = 1024 * 1024
+
+KB = 1024
+
+# Sizes used by the scaling benchmark (1 MB to 1 GB)
+DEFAULT_SCALING_SIZES_MB = [1, 10, 100, 1000]
+
+# Sizes used by the corpus suite (100 KB to 1 GB)
+DEFAULT_SUITE_SIZES_KB = [100, 1_024, 10 * 1_024, 100 * 1_024, 1_024 * 1_024]
+
+# Chunk ends that count as clean breaks for boundary quality
+CLEAN_BREAK_SUFFIXES = {"paragraph": "\n\n", "sentence": ". "}
+
+
+def generate_prose_block(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate ASCII prose with a realistic mix of break points.
+
+    Args:
+        size_bytes: Approximate size of the block
+        seed: Random seed for reproducible output
+
+    Returns:
+        Synthetic prose text
+    """
+    rng = random.Random(seed)
+    words = [
+        "loom", "task", "chunk", "agent", "round", "graph", "token", "merge",
+        "boundary", "compile", "strategist", "validator", "output", "level",
+    ]
+    separators = [". ", ". ", ", ", ", ", "\n", "\n\n"]
+
+    parts = []
+    size = 0
+    while size < size_bytes:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(5, 20)))
+        part = sentence + rng.choice(separators)
+        parts.append(part)
+        size += len(part)
+
+    return "".join(parts)[:size_bytes]
+
+
+def generate_code_block(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate Python-like source: functions, classes, comments and blank lines.
+
+    Args:
+        size_bytes: Approximate size of the block
+        seed: Random seed for reproducible output
+
+    Returns:
+        Synthetic source code
+    """
+    rng = random.Random(seed)
+    names = ["chunk", "task", "merge", "level", "token", "graph", "spawn", "result"]
+
+    parts = []
+    size = 0
+    while size < size_bytes:
+        name = "_".join(rng.sample(names, 2))
+        lines = [f"def {name}_{rng.randint(0, 999)}(items, limit={rng.randint(1, 100)}):"]
+        lines.append(f'    """Process {rng.choice(names)} records."""')
+        for _ in range(rng.randint(3, 12)):
+            var = rng.choice(names)
+            lines.append(rng.choice([
+                f"    {var} = [x for x in items if x < limit]",
+                f"    # {rng.choice(names)} {rng.choice(names)} handling",
+                f"    if len({var}) > {rng.randint(0, 64)}:",
+                f"        return {{'{var}': {var}, 'count': {rng.randint(0, 9999)}}}",
+                f"    {var}.append(limit * {rng.random():.4f})",
+            ]))
+        lines.append("    return items")
+        part = "\n".join(lines) + "\n\n\n"
+        if rng.random() < 0.2:
+            part = f"class {name.title().replace('_', '')}:\n    pass\n\n\n" + part
+        parts.append(part)
+        size += len(part)
+
+    return "".join(parts)[:size_bytes]
+
+
+def generate_json_block(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate pretty-printed JSON records.
+
+    Args:
+        size_bytes: Approximate size of the block
+        seed: Random seed for reproducible output
+
+    Returns:
+        Synthetic JSON text (truncated, so not necessarily valid JSON)
+    """
+    rng = random.Random(seed)
+    roles = ["researcher", "architect", "coder", "reviewer", "documenter"]
+
+    parts = ["[\n"]
+    size = 2
+    while size < size_bytes:
+        record = {
+            "id": f"task_{rng.randint(0, 10**6)}",
+            "role": rng.choice(roles),
+            "tokens": rng.randint(100, 50_000),
+            "cost": round(rng.random() * 3, 6),
+            "depends_on": [f"task_{rng.randint(0, 10**6)}" for _ in range(rng.randint(0, 3))],
+            "done": rng.random() < 0.5,
+        }
+        part = json.dumps(record, indent=2) + ",\n"
+        parts.append(part)
+        size += len(part)
+
+    return "".join(parts)[:size_bytes]
+
+
+def generate_cjk_block(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate CJK text with full-width punctuation and paragraph breaks.
+
+    Args:
+        size_bytes: Approximate size of the block in UTF-8 bytes
+        seed: Random seed for reproducible output
+
+    Returns:
+        Synthetic CJK text
+    """
+    rng = random.Random(seed)
+    separators = ["。", "。", "，", "，", "\n", "\n\n"]
+
+    parts = []
+    size = 0
+    while size < size_bytes:
+        sentence = "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(8, 40)))
+        part = sentence + rng.choice(separators)
+        parts.append(part)
+        size += len(part.encode("utf-8"))
+
+    return "".join(parts)
+
+
+def generate_no_whitespace_block(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate text with no whitespace or punctuation (no natural break points).
+
+    Args:
+        size_bytes: Size of the block
+        seed: Random seed for reproducible output
+
+    Returns:
+        Synthetic alphanumeric text
+    """
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    return "".join(rng.choices(alphabet, k=size_bytes))
+
+
+# Synthetic corpora available to the suite
+CORPUS_GENERATORS: Dict[str, Callable[[int, int], str]] = {
+    "prose": generate_prose_block,
+    "code": generate_code_block,
+    "json": generate_json_block,
+    "cjk": generate_cjk_block,
+    "no_whitespace": generate_no_whitespace_block,
+}
+
+
+def write_synthetic_file(path: str, size_bytes: int, seed: int = 0, corpus: str = "prose") -> None:
+    """
+    Write a synthetic file of the given size without holding it in memory.
+
+    A block of at most 1 MB is generated once and repeated. The final piece
+    is cut on a UTF-8 character boundary, so multi-byte corpora may come out
+    a few bytes short.
+
+    Args:
+        path: Destination file path
+        size_bytes: File size in bytes
+        seed: Random seed for the repeated block
+        corpus: Key into CORPUS_GENERATORS
+    """
+    block = CORPUS_GENERATORS[corpus](min(size_bytes, MB), seed).encode("utf-8")
+    with open(path, "wb") as f:
+        remaining = size_bytes
+        while remaining > 0:
+            piece = block[:remaining]
+            if len(piece) < len(block):
+                # Back off to the start of a character
+                end = len(piece)
+                while end > 0 and block[end] & 0xC0 == 0x80:
+                    end -= 1
+                piece = piece[:end]
+                if not piece:
+                    break
+            f.write(piece)
+            remaining -= len(piece)
+
+
+def benchmark_file(path: str, config: Optional[ChunkingConfig] = None) -> Dict[str, Any]:
+    """
+    Time boundary indexing and streaming chunking of one file.
+
+    Args:
+        path: Input file path
+        config: Chunking configuration (default: ChunkingConfig())
+
+    Returns:
+        Dictionary with timings, throughput and chunk count
+    """
+    size_bytes = os.path.getsize(path)
+
+    with ChunkSource.from_path(path) as source:
+        start = time.perf_counter()
+        BoundaryIndex.build(source.buffer)
+        index_seconds = time.perf_counter() - start
+
+        strategy = ChunkingStrategy(config)
+        start = time.perf_counter()
+        chunk_count = sum(1 for _ in strategy.iter_chunks(source))
+        chunk_seconds = time.perf_counter() - start
+
+    size_mb = size_bytes / MB
+    return {
+        "size_mb": size_mb,
+        "index_seconds": index_seconds,
+        "chunk_seconds": chunk_seconds,
+        "seconds_per_mb": chunk_seconds / size_mb if size_mb else 0.0,
+        "mb_per_second": size_mb / chunk_seconds if chunk_seconds else 0.0,
+        "chunks": chunk_count,
+    }
+
+
+def benchmark_scaling(
+    sizes_mb: Optional[List[int]] = None,
+    workdir: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Chunk synthetic inputs of increasing size and record timings.
+
+    Linear scaling shows up as a roughly constant seconds_per_mb column.
+
+    Args:
+        sizes_mb: Input sizes in MB (default: 1, 10, 100, 1000)
+        workdir: Directory for the temporary input files
+
+    Returns:
+        One result dict per size
+    """
+    results = []
+
+    for size_mb in sizes_mb or DEFAULT_SCALING_SIZES_MB:
+        fd, path = tempfile.mkstemp(suffix=".txt", dir=workdir)
+        os.close(fd)
+        try:
+            write_synthetic_file(path, size_mb * MB)
+            results.append(benchmark_file(path))
+        finally:
+            os.remove(path)
+
+    return results
+
+
+def format_scaling_table(results: List[Dict[str, Any]]) -> str:
+    """
+    Render scaling results as a markdown table.
+
+    Args:
+        results: Output of benchmark_scaling()
+
+    Returns:
+        Markdown table
+    """
+    lines = [
+        "| Size (MB) | Index (s) | Chunk (s) | s/MB | MB/s | Chunks |",
+        "|-----------|-----------|-----------|------|------|--------|",
+    ]
+    for r in results:
+        lines.append(
+            f"| {r['size_mb']:,.0f} | {r['index_seconds']:.2f} | {r['chunk_seconds']:.2f} | "
+            f"{r['seconds_per_mb']:.4f} | {r['mb_per_second']:.1f} | {r['chunks']:,} |"
+        )
+    return "\n".join(lines)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process.
+
+    Returns:
+        Peak RSS in MB, or None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / MB if sys.platform == "darwin" else peak / KB
+
+
+def benchmark_quality(path: str, config: Optional[ChunkingConfig] = None) -> Dict[str, Any]:
+    """
+    Chunk one file and measure throughput, memory and chunk quality.
+
+    Args:
+        path: Input file path
+        config: Chunking configuration (default: ChunkingConfig())
+
+    Returns:
+        Dictionary with throughput, peak RSS, chunk count, token-size
+        statistics and the share of chunk ends on clean breaks
+    """
+    size_bytes = os.path.getsize(path)
+    tokens = []
+    break_counts = {name: 0 for name in CLEAN_BREAK_SUFFIXES}
+
+    with ChunkSource.from_path(path) as source:
+        strategy = ChunkingStrategy(config)
+        start = time.perf_counter()
+        for chunk in strategy.iter_chunks(source):
+            tokens.append(chunk.estimated_tokens)
+            if chunk.is_last:
+                continue
+            tail = source.read(max(chunk.end_char - 2, 0), chunk.end_char)
+            for name, suffix in CLEAN_BREAK_SUFFIXES.items():
+                if tail.endswith(suffix):
+                    break_counts[name] += 1
+        seconds = time.perf_counter() - start
+
+    size_mb = size_bytes / MB
+    interior = max(len(tokens) - 1, 0)
+    result = {
+        "size_bytes": size_bytes,
+        "seconds": seconds,
+        "mb_per_second": size_mb / seconds if seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "chunks": len(tokens),
+        "mean_tokens": statistics.fmean(tokens) if tokens else 0.0,
+        "token_variance": statistics.pvariance(tokens) if tokens else 0.0,
+    }
+    for name, count in break_counts.items():
+        result[f"{name}_break_share"] = count / interior if interior else 0.0
+    return result
+
+
+def _run_suite_case(corpus: str, size_bytes: int, config: Optional[ChunkingConfig], workdir: Optional[str]) -> Dict[str, Any]:
+    """Worker: generate one input and benchmark it in a fresh process."""
+    fd, path = tempfile.mkstemp(suffix=".txt", dir=workdir)
+    os.close(fd)
+    try:
+        write_synthetic_file(path, size_bytes, corpus=corpus)
+        return benchmark_quality(path, config)
+    finally:
+        os.remove(path)
+
+
+def benchmark_suite(
+    corpora: Optional[List[str]] = None,
+    sizes_kb: Optional[List[int]] = None,
+    config: Optional[ChunkingConfig] = None,
+    workdir: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark every corpus at every size.
+
+    Each case runs in its own child process so peak RSS is per case rather
+    than the high-water mark of the whole suite.
+
+    Args:
+        corpora: Keys into CORPUS_GENERATORS (default: all)
+        sizes_kb: Input sizes in KB (default: 100 KB to 1 GB)
+        config: Chunking configuration (default: ChunkingConfig())
+        workdir: Directory for the temporary input files
+
+    Returns:
+        One result dict per (corpus, size)
+    """
+    results = []
+
+    for corpus in corpora or list(CORPUS_GENERATORS):
+        for size_kb in sizes_kb or DEFAULT_SUITE_SIZES_KB:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(_run_suite_case, corpus, size_kb * KB, config, workdir).result()
+            results.append({"corpus": corpus, "size_kb": size_kb, **result})
+
+    return results
+
+
+def write_results(results: List[Dict[str, Any]], path: str, config: Optional[ChunkingConfig] = None) -> None:
+    """
+    Write suite results as JSON, with enough context to compare runs.
+
+    Args:
+        results: Output of benchmark_suite()
+        path: Destination JSON path
+        config: Configuration the suite ran with
+    """
+    config = config or ChunkingConfig()
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "chunk_size_tokens": config.chunk_size_tokens,
+            "overlap_tokens": config.overlap_tokens,
+            "strategy": config.strategy,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def format_suite_table(results: List[Dict[str, Any]]) -> str:
+    """
+    Render suite results as a markdown table.
+
+    Args:
+        results: Output of benchmark_suite()
+
+    Returns:
+        Markdown table
+    """
+    lines = [
+        "| Corpus | Size (KB) | MB/s | Peak RSS (MB) | Chunks | Token stdev | Paragraph | Sentence |",
+        "|--------|-----------|------|---------------|--------|-------------|-----------|----------|",
+    ]
+    for r in results:
+        rss = "n/a" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        lines.append(
+            f"| {r['corpus']} | {r['size_kb']:,} | {r['mb_per_second']:.1f} | {rss} | {r['chunks']:,} | "
+            f"{r['token_variance'] ** 0.5:,.0f} | {r['paragraph_break_share']:.0%} | {r['sentence_break_share']:.0%} |"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage: python chunk_benchmark.py [size_mb ...]
+    #        python chunk_benchmark.py --suite [--corpus NAME ...] [--size-kb N ...] [--output FILE]
+    parser = argparse.ArgumentParser(description="Benchmark ChunkingStrategy")
+    parser.add_argument("sizes_mb", nargs="*", type=int, help="scaling benchmark sizes in MB")
+    parser.add_argument("--suite", action="store_true", help="run the corpus quality suite")
+    parser.add_argument("--corpus", action="append", choices=list(CORPUS_GENERATORS), help="suite corpus (repeatable)")
+    parser.add_argument("--size-kb", action="append", type=int, help="suite input size in KB (repeatable)")
+    parser.add_argument("--strategy", default="uniform", help="chunking strategy for the suite")
+    parser.add_argument("--output", default="chunk_benchmark.json", help="suite results JSON path")
+    args = parser.parse_args()
+
+    if args.suite:
+        suite_config = ChunkingConfig(strategy=args.strategy)
+        suite_results = benchmark_suite(args.corpus, args.size_kb, suite_config)
+        write_results(suite_results, args.output, suite_config)
+        print(format_suite_table(suite_results))
+    else:
+        print(format_scaling_table(benchmark_scaling(args.sizes_mb or None)))
@@ -0,0 +1,165 @@
+"""
+Chunk Result Cache for Loom-RLM
+Stores per-chunk compile results on disk, keyed by chunk content hash.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    from .chunking import Chunk
+    from .chunk_manifest import content_digest
+except ImportError:
+    from chunking import Chunk
+    from chunk_manifest import content_digest
+
+
+class ChunkResultCache:
+    """
+    On-disk cache of chunk compile results.
+
+    Design decisions:
+    - Key: SHA-256 of namespace + chunk content, so identical chunks hit the
+      cache regardless of their position or chunk_id
+    - Namespace: set it to anything the compile output depends on besides
+      the chunk text (compiler instructions version, model, prior context)
+    - Layout: <cache_dir>/<key[:2]>/<key>.json, written atomically
+    - Corrupt or unreadable entries count as misses
+
+    Paired with content-defined chunking, re-running on a slightly edited
+    document recompiles only the chunks whose content changed.
+    """
+
+    def __init__(self, cache_dir: str = "loom/.chunk_cache", namespace: str = ""):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cached results
+            namespace: Extra key material (e.g. compiler version)
+        """
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """
+        Hash chunk content (the hash chunk manifests record).
+
+        Args:
+            content: Chunk text
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return content_digest(content).hex()
+
+    def key_for(self, chunk: Chunk) -> str:
+        """
+        Compute the cache key for a chunk.
+
+        Args:
+            chunk: Chunk to key
+
+        Returns:
+            Hex cache key
+        """
+        digest = hashlib.sha256()
+        digest.update(self.namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.get_content().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, chunk: Chunk) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached compile result for a chunk.
+
+        Args:
+            chunk: Chunk to look up
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        path = self._path_for(self.key_for(chunk))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def put(self, chunk: Chunk, result: Dict[str, Any]) -> str:
+        """
+        Store the compile result for a chunk.
+
+        Args:
+            chunk: Chunk that was compiled
+            result: JSON-serializable compile result
+
+        Returns:
+            Path of the cache entry
+        """
+        path = self._path_for(self.key_for(chunk))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return path
+
+    def partition(self, chunks: List[Chunk]) -> Tuple[Dict[int, Dict[str, Any]], List[Chunk]]:
+        """
+        Split chunks into cached results and chunks that still need compiling.
+
+        Args:
+            chunks: Chunks about to be compiled
+
+        Returns:
+            Tuple of (cached results by chunk_id, chunks to compile)
+        """
+        cached = {}
+        to_compile = []
+
+        for chunk in chunks:
+            result = self.get(chunk)
+            if result is None:
+                to_compile.append(chunk)
+            else:
+                cached[chunk.chunk_id] = result
+
+        return cached, to_compile
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get hit/miss statistics for this cache instance.
+
+        Returns:
+            Dictionary with hits, misses and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cache_dir": self.cache_dir
+        }
@@ -0,0 +1,278 @@
+"""
+Chunk Manifest for Loom-RLM
+Compact binary manifest of chunk spans with O(1) random access by chunk_id.
+"""
+
+from typing import Iterable, Iterator, Optional, Union
+from dataclasses import dataclass
+import hashlib
+import mmap
+import os
+import struct
+
+try:
+    from .chunking import Chunk, ChunkTable
+except ImportError:
+    from chunking import Chunk, ChunkTable
+
+
+class ManifestError(Exception):
+    """Raised when a manifest file is malformed."""
+    pass
+
+
+@dataclass
+class ManifestEntry:
+    """One chunk as recorded in a manifest."""
+    chunk_id: int
+    start_char: int
+    end_char: int
+    overlap_with_next: int
+    estimated_tokens: int
+    content_hash: str  # hex SHA-256 of the UTF-8 chunk content
+
+
+class ChunkManifest:
+    """
+    Reader for a fixed-width binary chunk manifest.
+
+    File layout (little-endian):
+    - Header (40 bytes): magic, version, record size, chunk count,
+      total length of the chunked input, flags, reserved
+    - Records (64 bytes each, in chunk_id order): start, end, overlap,
+      estimated tokens (int64 each), SHA-256 content hash (32 bytes)
+
+    The file is memory-mapped and records are decoded on access, so opening
+    a 10K-chunk manifest costs one header read and any chunk_id is a single
+    struct unpack at a computed offset.
+    """
+
+    MAGIC = b"LOOMCHK1"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIIQQII")
+    RECORD = struct.Struct("<qqqq32s")
+
+    # Flag bits
+    FLAG_BYTE_OFFSETS = 1  # offsets index the UTF-8 file, not a str
+
+    def __init__(self, path: str):
+        """
+        Open a manifest for reading.
+
+        Args:
+            path: Manifest file path
+
+        Raises:
+            ManifestError: If the header is missing or invalid
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ManifestError(f"Empty manifest: {path}")
+
+        if len(self._mmap) < self.HEADER.size:
+            self.close()
+            raise ManifestError(f"Truncated manifest header: {path}")
+
+        magic, version, record_size, count, total_chars, flags, _ = self.HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION or record_size != self.RECORD.size:
+            self.close()
+            raise ManifestError(f"Not a version {self.VERSION} chunk manifest: {path}")
+        if len(self._mmap) < self.HEADER.size + count * record_size:
+            self.close()
+            raise ManifestError(f"Truncated manifest records: {path}")
+
+        self.count = count
+        self.total_chars = total_chars
+        self.flags = flags
+
+    @property
+    def byte_offsets(self) -> bool:
+        return bool(self.flags & self.FLAG_BYTE_OFFSETS)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, chunk_id: int) -> ManifestEntry:
+        if chunk_id < 0:
+            chunk_id += self.count
+        if not 0 <= chunk_id < self.count:
+            raise IndexError(chunk_id)
+
+        start, end, overlap, tokens, digest = self.RECORD.unpack_from(
+            self._mmap, self.HEADER.size + chunk_id * self.RECORD.size
+        )
+        return ManifestEntry(
+            chunk_id=chunk_id,
+            start_char=start,
+            end_char=end,
+            overlap_with_next=overlap,
+            estimated_tokens=tokens,
+            content_hash=digest.hex()
+        )
+
+    def __iter__(self) -> Iterator[ManifestEntry]:
+        for chunk_id in range(self.count):
+            yield self[chunk_id]
+
+    def to_chunk_table(self, source=None) -> ChunkTable:
+        """
+        Load all spans into a ChunkTable.
+
+        Args:
+            source: ChunkSource the spans point into (optional)
+
+        Returns:
+            ChunkTable with one row per manifest record
+        """
+        table = ChunkTable(source)
+        for start, end, overlap, tokens, _ in self.RECORD.iter_unpack(
+            self._mmap[self.HEADER.size:self.HEADER.size + self.count * self.RECORD.size]
+        ):
+            table.append(start, end, overlap, tokens)
+        return table
+
+    def close(self) -> None:
+        """Release the memory map and file handle."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "ChunkManifest":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def content_digest(content: str) -> bytes:
+    """
+    Hash chunk content the way the manifest records it.
+
+    Args:
+        content: Chunk text
+
+    Returns:
+        Raw SHA-256 digest (ChunkResultCache.content_hash is its hex form)
+    """
+    return hashlib.sha256(content.encode("utf-8")).digest()
+
+
+def write_manifest(
+    path: str,
+    chunks: Union[Iterable[Chunk], ChunkTable],
+    total_chars: Optional[int] = None,
+    byte_offsets: bool = False
+) -> int:
+    """
+    Write a chunk manifest.
+
+    Records are streamed to a temporary file, the header (with the final
+    count) is written last, and the file is renamed into place.
+
+    Args:
+        path: Destination manifest path
+        chunks: Chunks in chunk_id order (Chunk objects or a ChunkTable)
+        total_chars: Length of the chunked input (default: last chunk end)
+        byte_offsets: True if offsets index a UTF-8 file rather than a str
+
+    Returns:
+        Number of records written
+    """
+    header_size = ChunkManifest.HEADER.size
+    record = ChunkManifest.RECORD
+    tmp_path = f"{path}.tmp"
+
+    count = 0
+    last_end = 0
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * header_size)
+        for chunk in chunks:
+            f.write(record.pack(
+                chunk.start_char,
+                chunk.end_char,
+                chunk.overlap_with_next,
+                chunk.estimated_tokens,
+                content_digest(chunk.get_content())
+            ))
+            count += 1
+            last_end = chunk.end_char
+
+        f.seek(0)
+        f.write(ChunkManifest.HEADER.pack(
+            ChunkManifest.MAGIC,
+            ChunkManifest.VERSION,
+            record.size,
+            count,
+            last_end if total_chars is None else total_chars,
+            ChunkManifest.FLAG_BYTE_OFFSETS if byte_offsets else 0,
+            0
+        ))
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def update_manifest(
+    path: str,
+    previous: ChunkManifest,
+    changed: Iterable[Chunk],
+    total_chars: Optional[int] = None
+) -> int:
+    """
+    Write a manifest for an appended input without re-hashing old chunks.
+
+    Records before the first changed chunk are copied verbatim from the
+    previous manifest; the changed chunks (from
+    ChunkingStrategy.append_chunks) replace everything after.
+
+    Args:
+        path: Destination manifest path (may be the previous manifest's path)
+        previous: Manifest for the input before it grew
+        changed: New or changed chunks, in chunk_id order
+        total_chars: Length of the grown input (default: last chunk end)
+
+    Returns:
+        Number of records written
+    """
+    changed = list(changed)
+    keep = changed[0].chunk_id if changed else len(previous)
+    header_size = ChunkManifest.HEADER.size
+    record_size = ChunkManifest.RECORD.size
+
+    prefix = previous._mmap[header_size:header_size + keep * record_size]
+    tmp_path = f"{path}.tmp"
+
+    count = keep
+    last_end = previous[keep - 1].end_char if keep else 0
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * header_size)
+        f.write(prefix)
+        for chunk in changed:
+            f.write(ChunkManifest.RECORD.pack(
+                chunk.start_char,
+                chunk.end_char,
+                chunk.overlap_with_next,
+                chunk.estimated_tokens,
+                content_digest(chunk.get_content())
+            ))
+            count += 1
+            last_end = chunk.end_char
+
+        f.seek(0)
+        f.write(ChunkManifest.HEADER.pack(
+            ChunkManifest.MAGIC,
+            ChunkManifest.VERSION,
+            record_size,
+            count,
+            last_end if total_chars is None else total_chars,
+            previous.flags,
+            0
+        ))
+
+    os.replace(tmp_path, path)
+    return count
@@ -3,20 +3,907 @@ Chunking Strategy for Loom-RLM
 Handles large inputs (50K+ tokens) through uniform chunking with sequential merging.
 """
 
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union, BinaryIO, TYPE_CHECKING
+from dataclasses import dataclass
+from array import array
+from collections.abc import MutableMapping
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import heapq
+import io
+import mmap
+import os
+import pathlib
+import random
 import re
+import tokenize
+import zlib
+
+if TYPE_CHECKING:
+    from .chunk_manifest import ChunkManifest
+
+
+class ChunkSource:
+    """
+    Read-only view over the text being chunked.
+
+    Wraps either an in-memory string or a file. Files (given as an
+    os.PathLike path, see from_path(), or an open binary file object) are
+    memory-mapped, so multi-GB inputs are paged in by the OS instead of
+    being loaded into a Python string. Offsets into a mapped source are
+    byte offsets into the UTF-8 encoded file.
+
+    A str is always prompt text, never a path: a prompt that happens to
+    name a file must not be swapped for the file's contents.
+    """
+
+    def __init__(self, data: Union[str, bytes, os.PathLike, BinaryIO]):
+        """
+        Open a chunk source.
+
+        Args:
+            data: Prompt string, raw bytes, os.PathLike path, or binary file object
+        """
+        self._file = None
+        self._mmap = None
+        self.path: Optional[str] = None
+
+        if isinstance(data, (str, bytes)):
+            self.buffer = data
+            return
+
+        if isinstance(data, os.PathLike):
+            self._file = open(data, "rb")
+            file_obj = self._file
+        else:
+            file_obj = data
+
+        # Worker processes re-open the file by path to share the mapping
+        name = getattr(file_obj, "name", None)
+        if isinstance(name, (str, bytes)) and os.path.isfile(name):
+            self.path = os.fsdecode(name)
+
+        try:
+            fileno = file_obj.fileno()
+        except (AttributeError, OSError, ValueError):
+            fileno = None
+
+        if fileno is not None and os.fstat(fileno).st_size > 0:
+            self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            self.buffer = self._mmap
+        elif fileno is not None:
+            self.buffer = b""
+        else:
+            # In-memory file objects (BytesIO) cannot be mapped
+            file_obj.seek(0)
+            self.buffer = file_obj.read()
+
+    @classmethod
+    def from_path(cls, path: Union[str, os.PathLike]) -> "ChunkSource":
+        """
+        Open a file by path.
+
+        Args:
+            path: File path (str or os.PathLike)
+
+        Returns:
+            Memory-mapped ChunkSource over the file
+        """
+        return cls(pathlib.Path(path))
+
+    @property
+    def is_text(self) -> bool:
+        """True when offsets are character offsets into a str."""
+        return isinstance(self.buffer, str)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def read(self, start: int, end: int) -> str:
+        """
+        Decode the text between two offsets.
+
+        Args:
+            start: Start offset (inclusive)
+            end: End offset (exclusive)
+
+        Returns:
+            Text of the requested span
+        """
+        if self.is_text:
+            return self.buffer[start:end]
+        return self.buffer[start:end].decode("utf-8", errors="replace")
+
+    def view(self, start: int, end: int) -> Union[memoryview, str]:
+        """
+        Return the span between two offsets without copying it.
+
+        Args:
+            start: Start offset (inclusive)
+            end: End offset (exclusive)
+
+        Returns:
+            memoryview for mapped and bytes sources; str sources cannot be
+            viewed without a copy and return the slice
+        """
+        if self.is_text:
+            return self.buffer[start:end]
+        return memoryview(self.buffer)[start:end]
+
+    def align(self, pos: int) -> int:
+        """
+        Move a byte offset back onto a UTF-8 character boundary.
+
+        Args:
+            pos: Candidate offset
+
+        Returns:
+            Offset that does not split a multi-byte character
+        """
+        if self.is_text:
+            return pos
+        floor = max(0, pos - 3)
+        while pos > floor and pos < len(self.buffer) and (self.buffer[pos] & 0xC0) == 0x80:
+            pos -= 1
+        return pos
+
+    def close(self) -> None:
+        """Release the memory map and any file opened by this source."""
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Chunk views are still alive; the map is released with them
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ChunkSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class BoundaryIndex:
+    """
+    Sorted offsets of every natural break point in a document.
+
+    Each boundary class is indexed in one scan of the document, then queried
+    with bisect, so picking a break point costs O(log n) per chunk instead of
+    a regex pass over a chunk-sized window. Classes are scanned on first use:
+    most documents never need the dense word-break array. Offsets point just
+    past the break (where the next chunk would start).
+    """
+
+    # Boundary classes in priority order: (name, pattern, offset past match start).
+    # Two-character breaks use a lookahead so runs like "\n\n\n" yield every break.
+    BOUNDARY_CLASSES = [
+        ("paragraph", r'\n(?=\n)', 2),
+        ("line", r'\n', 1),
+        ("sentence", r'\.(?= )', 2),
+        ("clause", r',(?= )', 2),
+        ("word", r' ', 1),
+    ]
+
+    _STR_PATTERNS = [re.compile(p) for _, p, _ in BOUNDARY_CLASSES]
+    _BYTES_PATTERNS = [re.compile(p.encode()) for _, p, _ in BOUNDARY_CLASSES]
+
+    # Smallest scan range worth splitting across worker processes
+    PARALLEL_SCAN_MIN_BYTES = 64 * 1024 * 1024
+
+    def __init__(
+        self,
+        text: Union[str, bytes, None],
+        start: int = 0,
+        end: Optional[int] = None,
+        positions: Optional[List[Optional[array]]] = None,
+        text_length: Optional[int] = None
+    ):
+        """
+        Create an index over text[start:end].
+
+        Args:
+            text: Full text (str, or bytes-like for mapped sources); may be None
+                when every class is supplied in positions
+            start: First offset to scan
+            end: Offset to stop scanning at (default: end of text)
+            positions: Precomputed offset arrays per class (None entries are
+                scanned lazily)
+            text_length: Length of the indexed text (default: len(text))
+
+        Call enable_parallel_scan() to scan large files with several processes.
+        """
+        self.text = text
+        self.text_length = len(text) if text_length is None else text_length
+        self.start = start
+        self.end = self.text_length if end is None else end
+        self.positions = positions or [None] * len(self.BOUNDARY_CLASSES)
+        self.path: Optional[str] = None
+        self.scan_workers = 1
+
+    @staticmethod
+    def typecode_for(text_length: int) -> str:
+        """Smallest array typecode that can hold offsets into the text."""
+        return "I" if text_length < 2 ** 32 and array("I").itemsize >= 4 else "q"
+
+    @classmethod
+    def build(
+        cls,
+        text: Union[str, bytes],
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> "BoundaryIndex":
+        """
+        Index all boundaries in text (or in text[start:end]) eagerly.
+
+        Args:
+            text: Full text (str, or bytes-like for mapped sources)
+            start: First offset to scan
+            end: Offset to stop scanning at (default: end of text)
+
+        Returns:
+            BoundaryIndex with every class scanned
+        """
+        index = cls(text, start, end)
+        for class_idx in range(len(cls.BOUNDARY_CLASSES)):
+            index.get_positions(class_idx)
+        return index
+
+    def get_positions(self, class_idx: int) -> array:
+        """
+        Sorted break offsets for one boundary class, scanning it if needed.
+
+        Args:
+            class_idx: Index into BOUNDARY_CLASSES
+
+        Returns:
+            Array of break offsets
+        """
+        positions = self.positions[class_idx]
+        if positions is None and self._use_parallel_scan():
+            positions = self._parallel_scan(class_idx)
+            self.positions[class_idx] = positions
+        elif positions is None:
+            patterns = self._STR_PATTERNS if isinstance(self.text, str) else self._BYTES_PATTERNS
+            offset = self.BOUNDARY_CLASSES[class_idx][2]
+            positions = array(
+                self.typecode_for(self.text_length),
+                (m.start() + offset for m in patterns[class_idx].finditer(self.text, self.start, self.end))
+            )
+            self.positions[class_idx] = positions
+        return positions
+
+    def enable_parallel_scan(self, path: Optional[str], workers: Optional[int]) -> None:
+        """
+        Scan boundary classes with a process pool over the mapped file.
+
+        Only file-backed sources can be shared with workers; for other
+        sources (or small files) scanning stays in-process.
+
+        Args:
+            path: Path of the file the index covers
+            workers: Number of worker processes (None or 0: CPU count)
+        """
+        self.path = path
+        self.scan_workers = workers or os.cpu_count() or 1
+
+    def _use_parallel_scan(self) -> bool:
+        return (
+            self.scan_workers > 1
+            and self.path is not None
+            and not isinstance(self.text, str)
+            and self.end - self.start >= self.PARALLEL_SCAN_MIN_BYTES
+        )
+
+    def _parallel_scan(self, class_idx: int) -> array:
+        """
+        Scan one boundary class by splitting the file into byte ranges.
+
+        Every class matches at most two bytes with no lookbehind, so a break
+        depends only on the byte at its position and the next one. Workers
+        scan disjoint ranges with one byte of lookahead and the parent
+        concatenates their arrays: the result equals a single-process scan.
+
+        Args:
+            class_idx: Index into BOUNDARY_CLASSES
+
+        Returns:
+            Array of break offsets
+        """
+        span = self.end - self.start
+        # Several ranges per worker so uneven break density still balances
+        pieces = self.scan_workers * 4
+        step = max(1, -(-span // pieces))
+        ranges = [(a, min(a + step, self.end)) for a in range(self.start, self.end, step)]
+
+        typecode = self.typecode_for(self.text_length)
+        positions = array(typecode)
+        try:
+            with ProcessPoolExecutor(max_workers=self.scan_workers) as executor:
+                for chunk in executor.map(
+                    _scan_boundary_range,
+                    [self.path] * len(ranges),
+                    [class_idx] * len(ranges),
+                    [a for a, _ in ranges],
+                    [b for _, b in ranges],
+                    [self.end] * len(ranges),
+                    [typecode] * len(ranges)
+                ):
+                    positions.frombytes(chunk)
+        except (OSError, BrokenProcessPool):
+            # Fall back to scanning in-process
+            patterns = self._BYTES_PATTERNS
+            offset = self.BOUNDARY_CLASSES[class_idx][2]
+            positions = array(
+                typecode,
+                (m.start() + offset for m in patterns[class_idx].finditer(self.text, self.start, self.end))
+            )
+
+        return positions
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of indexed boundaries per class.
+
+        Returns:
+            Dictionary mapping class name to count
+        """
+        return {
+            name: len(self.get_positions(class_idx))
+            for class_idx, (name, _, _) in enumerate(self.BOUNDARY_CLASSES)
+        }
+
+    def last_break(self, low: int, high: int) -> Optional[int]:
+        """
+        Find the last break in [low, high], preferring stronger boundaries.
+
+        Args:
+            low: Lowest acceptable offset
+            high: Highest acceptable offset
+
+        Returns:
+            Offset of the break, or None if the range holds no break
+        """
+        for class_idx in range(len(self.BOUNDARY_CLASSES)):
+            positions = self.get_positions(class_idx)
+            i = bisect_right(positions, high) - 1
+            if i >= 0 and positions[i] >= low:
+                return positions[i]
+        return None
+
+    def find_break_point(self, target_pos: int, max_search: int) -> int:
+        """
+        Find a natural break point near target position.
+
+        Same selection rule as the original regex scan: classes are tried in
+        priority order, keeping the closest break seen so far, and the first
+        class that yields a break within max_search // 4 wins.
+
+        Args:
+            target_pos: Desired break position
+            max_search: Size of the search window
+
+        Returns:
+            Optimal break position
+        """
+        search_start = max(0, target_pos - max_search // 2)
+        search_end = min(self.text_length, target_pos + max_search // 2)
+
+        best_pos = None
+        best_distance = float('inf')
+
+        for class_idx, (_, _, offset) in enumerate(self.BOUNDARY_CLASSES):
+            positions = self.get_positions(class_idx)
+
+            # Breaks whose whole match lies inside the search window
+            lo = bisect_left(positions, search_start + offset)
+            hi = bisect_right(positions, search_end)
+
+            if lo < hi:
+                # Nearest candidates on either side of the target
+                i = bisect_left(positions, target_pos, lo, hi)
+                for j in (i - 1, i):
+                    if lo <= j < hi:
+                        distance = abs(positions[j] - target_pos)
+                        if distance < best_distance:
+                            best_distance = distance
+                            best_pos = positions[j]
+
+            # If we found a good break, use it
+            if best_pos is not None and best_distance < max_search // 4:
+                return best_pos
+
+        # No good break found, use target position
+        return target_pos
+
+
+class StructureIndex:
+    """
+    Offsets where logical units of a document begin.
+
+    Units are Markdown sections (ATX headings), fenced code blocks, and
+    top-level Python definitions. Python definitions are found with a
+    tokenizer pass over ```python fences, or over the whole document when it
+    is Python source, so strings and nested code never produce false splits.
+    Headings inside code fences are ignored.
+
+    A whole document is only tokenized when the caller says it is Python,
+    or when a leading sample compiles as Python; a log line that happens to
+    start with "class " does not trigger a pass over the whole file. The
+    pass reads the source a line at a time, so mapped files stay mapped.
+    """
+
+    PYTHON_FENCE_LANGUAGES = {"python", "py", "python3"}
+
+    # Leading span compiled to decide whether an unlabelled document is Python
+    PYTHON_SAMPLE_CHARS = 64 * 1024
+
+    _TOP_LEVEL_LINE = re.compile(r'\n(?=\S)')
+
+    _HEADING = r'^#{1,6}[ \t]'
+    _FENCE = r'^[ ]{0,3}(`{3,}|~{3,})[ \t]*([^\n]*)$'
+    _PY_DEF = r'^(?:@|async[ \t]+def\b|def\b|class\b)'
+
+    _STR_PATTERNS = {
+        name: re.compile(p, re.MULTILINE)
+        for name, p in (("heading", _HEADING), ("fence", _FENCE), ("py_def", _PY_DEF))
+    }
+    _BYTES_PATTERNS = {
+        name: re.compile(p.encode(), re.MULTILINE)
+        for name, p in (("heading", _HEADING), ("fence", _FENCE), ("py_def", _PY_DEF))
+    }
+
+    def __init__(self, boundaries: List[int], fences: List[Tuple[int, int]]):
+        """
+        Wrap precomputed structure offsets.
+
+        Args:
+            boundaries: Offsets where a logical unit starts
+            fences: (start, end) spans of fenced code blocks
+        """
+        self.boundaries = array(BoundaryIndex.typecode_for(max(boundaries, default=0) + 1),
+                                sorted(set(boundaries)))
+        self.fences = sorted(fences)
+        self._fence_starts = [start for start, _ in self.fences]
+
+    @classmethod
+    def build(
+        cls,
+        text: Union[str, bytes],
+        start: int = 0,
+        python: Optional[bool] = None
+    ) -> "StructureIndex":
+        """
+        Scan a document for structural boundaries.
+
+        Args:
+            text: Full text (str, or bytes-like for mapped sources)
+            start: Offset to start scanning at
+            python: Whether the whole document is Python source (default:
+                decided from a leading sample)
+
+        Returns:
+            StructureIndex for the document
+        """
+        patterns = cls._STR_PATTERNS if isinstance(text, str) else cls._BYTES_PATTERNS
+
+        boundaries: List[int] = []
+        fences: List[Tuple[int, int]] = []
+
+        # Whole-document Python source: its comments and strings are not Markdown
+        if python is None:
+            python = patterns["py_def"].search(text, start) is not None and cls._looks_like_python(text, start)
+        if python:
+            boundaries = [b for b in cls._python_definitions(text, start, len(text)) if 0 < b < len(text)]
+            return cls(boundaries, fences)
+
+        # Pair fence lines: a fence closes on the same marker, at least as long
+        open_fence = None
+        for match in patterns["fence"].finditer(text, start):
+            marker, info = match.group(1), match.group(2).strip()
+            if open_fence is None:
+                open_fence = (match.start(), marker, info, match.end())
+            elif marker[:1] == open_fence[1][:1] and len(marker) >= len(open_fence[1]) and not info:
+                fence_start, _, language, body_start = open_fence
+                fence_end = min(match.end() + 1, len(text))
+                fences.append((fence_start, fence_end))
+                boundaries.extend((fence_start, fence_end))
+
+                if isinstance(language, bytes):
+                    language = language.decode("utf-8", errors="replace")
+                if language.split()[:1] and language.split()[0].lower() in cls.PYTHON_FENCE_LANGUAGES:
+                    boundaries.extend(cls._python_definitions(text, body_start + 1, match.start()))
+                open_fence = None
+
+        fence_index = cls([], fences)
+        for match in patterns["heading"].finditer(text, start):
+            if fence_index.enclosing_fence(match.start()) is None:
+                boundaries.append(match.start())
+
+        boundaries = [b for b in boundaries if 0 < b < len(text)]
+        return cls(boundaries, fences)
+
+    @classmethod
+    def _looks_like_python(cls, text: Union[str, bytes], start: int) -> bool:
+        """
+        Check whether a document's leading sample compiles as Python.
+
+        The sample is cut before its last top-level line, so a statement
+        split by the cut does not count against it.
+
+        Args:
+            text: Full text
+            start: Offset the document starts at
+
+        Returns:
+            True if the sample is valid Python
+        """
+        sample = text[start:start + cls.PYTHON_SAMPLE_CHARS]
+        if not isinstance(sample, str):
+            sample = sample.decode("utf-8", errors="replace")
+        if start + len(sample) < len(text):
+            cut = -1
+            for match in cls._TOP_LEVEL_LINE.finditer(sample):
+                cut = match.start()
+            sample = sample[:cut + 1]
+        try:
+            compile(sample, "<sample>", "exec", dont_inherit=True)
+        except (SyntaxError, ValueError):
+            return False
+        return bool(sample.strip())
+
+    @classmethod
+    def _python_definitions(cls, text: Union[str, bytes], start: int, end: int) -> List[int]:
+        """
+        Find line offsets of top-level def/class statements (with decorators).
+
+        Args:
+            text: Full text
+            start: Offset of the first line of Python source
+            end: Offset just past the Python source
+
+        Returns:
+            Offsets of the first line of each top-level definition
+        """
+        is_str = isinstance(text, str)
+        newline = "\n" if is_str else b"\n"
+
+        # Line number -> offset, for lines read but not yet tokenized
+        line_starts: Dict[int, int] = {}
+        cursor = start
+        lines_read = 0
+        oldest_line = 1
+
+        def readline() -> str:
+            nonlocal cursor, lines_read
+            if cursor >= end:
+                return ""
+            line_end = text.find(newline, cursor, end)
+            line_end = end if line_end == -1 else line_end + 1
+            lines_read += 1
+            line_starts[lines_read] = cursor
+            line = text[cursor:line_end]
+            cursor = line_end
+            return line if is_str else line.decode("utf-8", errors="replace")
+
+        offsets = []
+
+        try:
+            depth = 0
+            bracket_depth = 0
+            at_line_start = True
+            in_decorator = False
+
+            for tok in tokenize.generate_tokens(readline):
+                while oldest_line < tok.start[0]:
+                    line_starts.pop(oldest_line, None)
+                    oldest_line += 1
+
+                if tok.type == tokenize.INDENT:
+                    depth += 1
+                elif tok.type == tokenize.DEDENT:
+                    depth -= 1
+                elif tok.type in (tokenize.NEWLINE, tokenize.NL):
+                    at_line_start = bracket_depth == 0
+                elif tok.type in (tokenize.COMMENT, tokenize.ENDMARKER):
+                    continue
+                else:
+                    if at_line_start and depth == 0:
+                        opens_definition = (
+                            (tok.type == tokenize.OP and tok.string == "@")
+                            or (tok.type == tokenize.NAME and tok.string in ("def", "class", "async"))
+                        )
+                        if opens_definition and not in_decorator:
+                            offsets.append(line_starts[tok.start[0]])
+                        in_decorator = tok.type == tokenize.OP and tok.string == "@"
+                    at_line_start = False
+
+                    if tok.type == tokenize.OP:
+                        if tok.string in "([{":
+                            bracket_depth += 1
+                        elif tok.string in ")]}":
+                            bracket_depth = max(0, bracket_depth - 1)
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            # Not valid Python; fall back to line-anchored definitions
+            patterns = cls._STR_PATTERNS if is_str else cls._BYTES_PATTERNS
+            offsets = [m.start() for m in patterns["py_def"].finditer(text, start, end)]
+
+        return offsets
+
+    def enclosing_fence(self, pos: int) -> Optional[Tuple[int, int]]:
+        """
+        Find the fenced code block containing an offset.
+
+        Args:
+            pos: Offset to look up
+
+        Returns:
+            (start, end) span of the fence, or None
+        """
+        i = bisect_right(self._fence_starts, pos) - 1
+        if i >= 0 and self.fences[i][0] < pos < self.fences[i][1]:
+            return self.fences[i]
+        return None
+
+    def last_boundary(self, low: int, high: int) -> Optional[int]:
+        """
+        Find the last structural boundary in (low, high].
+
+        Args:
+            low: Exclusive lower bound
+            high: Inclusive upper bound
+
+        Returns:
+            Boundary offset, or None if the range holds no boundary
+        """
+        i = bisect_right(self.boundaries, high) - 1
+        if i >= 0 and self.boundaries[i] > low:
+            return self.boundaries[i]
+        return None
 
 
-@dataclass
 class Chunk:
-    """Represents a single chunk of the input."""
-    chunk_id: int
-    content: str
-    start_char: int
-    end_char: int
-    overlap_with_next: int
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    """
+    Represents a single chunk of the input.
+
+    Slotted, with metadata fields stored inline: char_count and is_first are
+    derived from the chunk's own fields, so a chunk costs a small constant
+    amount of memory. Chunks produced by streaming carry no text of their own
+    (content is None); get_content() reads their span from the shared source
+    and view() returns it without copying.
+    """
+
+    __slots__ = (
+        "chunk_id", "content", "start_char", "end_char", "overlap_with_next",
+        "estimated_tokens", "is_last", "source", "_extra"
+    )
+
+    # Metadata keys backed by slots or derived from them
+    _DERIVED_METADATA = ("estimated_tokens", "char_count", "is_first", "is_last")
+
+    def __init__(
+        self,
+        chunk_id: int,
+        content: Optional[str],
+        start_char: int,
+        end_char: int,
+        overlap_with_next: int,
+        metadata: Optional[Dict[str, Any]] = None,
+        source: Optional[ChunkSource] = None
+    ):
+        self.chunk_id = chunk_id
+        self.content = content
+        self.start_char = start_char
+        self.end_char = end_char
+        self.overlap_with_next = overlap_with_next
+        self.source = source
+        self.estimated_tokens = 0
+        self.is_last = False
+        self._extra: Optional[Dict[str, Any]] = None
+
+        for key, value in (metadata or {}).items():
+            self.metadata[key] = value
+
+    @property
+    def char_count(self) -> int:
+        return self.end_char - self.start_char
+
+    @property
+    def metadata(self) -> "ChunkMetadata":
+        """Dict-like view of the chunk's metadata (writes go to the chunk)."""
+        return ChunkMetadata(self)
+
+    def get_content(self) -> str:
+        """
+        Return the chunk text, reading it from the source if not held.
+
+        Returns:
+            Chunk content
+        """
+        if self.content is not None:
+            return self.content
+        if self.source is None:
+            return ""
+        return self.source.read(self.start_char, self.end_char)
+
+    def view(self) -> Union[memoryview, str]:
+        """
+        Return the chunk span without copying it where possible.
+
+        Returns:
+            memoryview over the mapped source, or the text for str sources
+        """
+        if self.content is not None or self.source is None:
+            return self.get_content()
+        return self.source.view(self.start_char, self.end_char)
+
+    def _fields(self) -> Tuple:
+        return (self.chunk_id, self.content, self.start_char, self.end_char,
+                self.overlap_with_next, dict(self.metadata))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Chunk):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (
+            f"Chunk(chunk_id={self.chunk_id!r}, content={self.content!r}, "
+            f"start_char={self.start_char!r}, end_char={self.end_char!r}, "
+            f"overlap_with_next={self.overlap_with_next!r}, metadata={dict(self.metadata)!r})"
+        )
+
+
+class ChunkMetadata(MutableMapping):
+    """Mapping view over a Chunk's slot-backed metadata plus any extra keys."""
+
+    __slots__ = ("_chunk",)
+
+    def __init__(self, chunk: Chunk):
+        self._chunk = chunk
+
+    def __getitem__(self, key: str) -> Any:
+        chunk = self._chunk
+        if key == "estimated_tokens":
+            return chunk.estimated_tokens
+        if key == "char_count":
+            return chunk.char_count
+        if key == "is_first":
+            return chunk.chunk_id == 0
+        if key == "is_last":
+            return chunk.is_last
+        if chunk._extra is None:
+            raise KeyError(key)
+        return chunk._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        chunk = self._chunk
+        if key == "estimated_tokens":
+            chunk.estimated_tokens = value
+        elif key == "is_last":
+            chunk.is_last = value
+        elif key not in ("char_count", "is_first"):
+            # char_count and is_first always follow the chunk's own fields
+            if chunk._extra is None:
+                chunk._extra = {}
+            chunk._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self._chunk._extra is None or key not in self._chunk._extra:
+            raise KeyError(key)
+        del self._chunk._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from Chunk._DERIVED_METADATA
+        if self._chunk._extra:
+            yield from self._chunk._extra
+
+    def __len__(self) -> int:
+        return len(Chunk._DERIVED_METADATA) + len(self._chunk._extra or ())
+
+
+class ChunkTable:
+    """
+    Array-backed table of chunk spans over one shared source.
+
+    Offsets, overlaps and token estimates live in four int64 arrays (32
+    bytes per chunk), and chunk text is exposed as memoryview slices of the
+    mapped source instead of copies. Rows are materialized as Chunk objects
+    only when indexed.
+    """
+
+    __slots__ = ("source", "starts", "ends", "overlaps", "tokens")
+
+    def __init__(self, source: Optional[ChunkSource] = None):
+        """
+        Create an empty table.
+
+        Args:
+            source: Source the spans point into
+        """
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.overlaps = array("q")
+        self.tokens = array("q")
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Chunk], source: Optional[ChunkSource] = None) -> "ChunkTable":
+        """
+        Build a table from existing Chunk objects.
+
+        Args:
+            chunks: Chunks in chunk_id order
+            source: Source the spans point into (default: the first chunk's)
+
+        Returns:
+            ChunkTable with one row per chunk
+        """
+        if source is None and chunks:
+            source = chunks[0].source
+        table = cls(source)
+        for chunk in chunks:
+            table.append(chunk.start_char, chunk.end_char, chunk.overlap_with_next,
+                         chunk.estimated_tokens)
+        return table
+
+    def append(self, start_char: int, end_char: int, overlap_with_next: int, estimated_tokens: int) -> int:
+        """
+        Add a row.
+
+        Returns:
+            chunk_id of the new row
+        """
+        self.starts.append(start_char)
+        self.ends.append(end_char)
+        self.overlaps.append(overlap_with_next)
+        self.tokens.append(estimated_tokens)
+        return len(self.starts) - 1
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, chunk_id: int) -> Chunk:
+        if chunk_id < 0:
+            chunk_id += len(self)
+        if not 0 <= chunk_id < len(self):
+            raise IndexError(chunk_id)
+        chunk = Chunk(
+            chunk_id=chunk_id,
+            content=None,
+            start_char=self.starts[chunk_id],
+            end_char=self.ends[chunk_id],
+            overlap_with_next=self.overlaps[chunk_id],
+            source=self.source
+        )
+        chunk.estimated_tokens = self.tokens[chunk_id]
+        chunk.is_last = chunk_id == len(self) - 1
+        return chunk
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for chunk_id in range(len(self)):
+            yield self[chunk_id]
+
+    def view(self, chunk_id: int) -> Union[memoryview, str]:
+        """
+        Return a chunk's span without copying it where possible.
+
+        Args:
+            chunk_id: Row to view
+
+        Returns:
+            memoryview over the mapped source, or the text for str sources
+        """
+        return self.source.view(self.starts[chunk_id], self.ends[chunk_id])
+
+    def nbytes(self) -> int:
+        """Bytes used by the span arrays."""
+        return sum(len(col) * col.itemsize for col in (self.starts, self.ends, self.overlaps, self.tokens))
 
 
 @dataclass
@@ -24,8 +911,14 @@ class ChunkingConfig:
     """Configuration for chunking strategy."""
     chunk_size_tokens: int = 50_000
     overlap_tokens: int = 5_000
-    strategy: str = "uniform"  # uniform, semantic, or adaptive
-    merge_strategy: str = "sequential"  # sequential or parallel
+    strategy: str = "uniform"  # uniform, semantic (structure-aware), adaptive (content-aware estimator), or content_defined
+    merge_strategy: str = "sequential"  # sequential or tree (pairwise reduction; "parallel" is an alias)
+    dedup_overlap_tasks: bool = False  # collapse near-duplicate tasks from neighbouring chunks
+    dedup_threshold: float = 0.9  # estimated Jaccard similarity that counts as a duplicate
+    token_tolerance: float = 0.10  # adaptive: chunks land in [target * (1 - tol), target]
+    density_window_chars: int = 4_096  # adaptive: span over which token density is sampled
+    scan_workers: int = 1  # processes scanning mapped files for break points (0: CPU count)
+    schedule_workers: int = 4  # parallel chunk compilers assumed by scheduling_hint()
 
 
 class ChunkingStrategy:
@@ -34,17 +927,41 @@ class ChunkingStrategy:
 
     Strategy:
     - Uniform division: Split at regular intervals
+    - Semantic division: Split between headings, code blocks and top-level defs
+    - Adaptive division: Size each chunk from local token density
+      (needs a content-aware estimator to differ from uniform sizing)
+    - Content-defined division: Boundaries chosen by a hash of nearby text,
+      so edits only change the chunks around them (see ChunkResultCache)
     - Overlap: 5K tokens between chunks for context continuity
     - Sequential merge: Chunk N sees results from chunk N-1
+    - Streaming: iter_chunks() maps files and yields offset-only chunks
+    - Incremental: append_chunks() re-splits only the tail of a grown input
+    - Corpus: create_corpus_chunks() bin-packs many documents per chunk
+    - Scheduling: scheduling_hint() orders chunks longest-first for N workers
     """
 
     # Threshold for when to activate chunking
     CHUNKING_THRESHOLD_TOKENS = 50_000
 
+    # Text hashed before each candidate break by content-defined chunking
+    CDC_WINDOW_CHARS = 64
+
+    # Placed between documents packed into one corpus chunk
+    CORPUS_SEPARATOR = "\n\n"
+
+    # Smallest share of the chunk budget a semantic chunk may end at
+    SEMANTIC_MIN_FILL = 0.6
+
+    # Leading span of a streamed source whose tokens set its chunk size
+    TOKEN_SAMPLE_CHARS = 1024 * 1024
+
     def __init__(self, config: Optional[ChunkingConfig] = None):
         self.config = config or ChunkingConfig()
         self.chunks: List[Chunk] = []
         self.metadata: Dict[str, Any] = {}
+        self.chunk_table: Optional[ChunkTable] = None
+        self.boundary_index: Optional[BoundaryIndex] = None
+        self.structure_index: Optional[StructureIndex] = None
 
     def should_chunk(self, prompt: str) -> bool:
         """
@@ -66,10 +983,251 @@ class ChunkingStrategy:
 
     def create_chunks(self, prompt: str) -> List[Chunk]:
         """
-        Split prompt into chunks with overlap.
+        Split prompt into chunks with overlap.
+
+        Args:
+            prompt: Full input prompt
+
+        Returns:
+            List of Chunk objects
+        """
+        try:
+            from .cost_tracker import CostTracker
+        except ImportError:
+            from cost_tracker import CostTracker
+
+        total_tokens = CostTracker.estimate_tokens(prompt)
+        total_chars = len(prompt)
+
+        # Calculate chunk parameters
+        chars_per_token = total_chars / total_tokens if total_tokens > 0 else 1.3
+        chunk_size_chars = int(self.config.chunk_size_tokens * chars_per_token)
+        overlap_chars = int(self.config.overlap_tokens * chars_per_token)
+
+        # Create chunks
+        chunks = []
+        source = ChunkSource(prompt)
+
+        for chunk_id, (start_char, end_char, overlap_with_next) in enumerate(
+            self._iter_spans(source, chunk_size_chars, overlap_chars)
+        ):
+            # Extract chunk content
+            chunk_content = prompt[start_char:end_char]
+
+            chunk = Chunk(
+                chunk_id=chunk_id,
+                content=chunk_content,
+                start_char=start_char,
+                end_char=end_char,
+                overlap_with_next=overlap_with_next,
+                metadata={
+                    "estimated_tokens": CostTracker.estimate_tokens(chunk_content),
+                    "char_count": len(chunk_content),
+                    "is_first": chunk_id == 0,
+                    "is_last": end_char >= total_chars
+                }
+            )
+
+            chunks.append(chunk)
+
+        self.chunks = chunks
+        self.chunk_table = None
+
+        # Store metadata
+        self.metadata = {
+            "total_chunks": len(chunks),
+            "total_tokens": total_tokens,
+            "total_chars": total_chars,
+            "chunk_size_tokens": self.config.chunk_size_tokens,
+            "overlap_tokens": self.config.overlap_tokens,
+            "strategy": self.config.strategy,
+            "merge_strategy": self._merge_strategy()
+        }
+
+        if self.config.strategy == "adaptive":
+            self.metadata["token_tolerance"] = self.config.token_tolerance
+
+        if self.structure_index is not None:
+            boundaries = set(self.structure_index.boundaries)
+            self.metadata["structural_breaks"] = sum(
+                1 for chunk in chunks[:-1] if chunk.end_char in boundaries
+            )
+
+        return chunks
+
+    def iter_chunks(
+        self,
+        source: Union[str, os.PathLike, BinaryIO, ChunkSource]
+    ) -> Iterator[Chunk]:
+        """
+        Lazily split a prompt, file path, or binary file object into chunks.
+
+        Files are memory-mapped and chunks hold only their offsets; text is
+        decoded one chunk at a time when estimating tokens or when a consumer
+        calls Chunk.get_content(). Memory stays flat regardless of input size.
+        For file inputs, start_char/end_char are byte offsets.
+
+        Args:
+            source: Prompt text, os.PathLike path, binary file object, or ChunkSource
+
+        Yields:
+            Chunk objects with content=None and a lazy content accessor
+        """
+        try:
+            from .cost_tracker import CostTracker
+        except ImportError:
+            from cost_tracker import CostTracker
+
+        if not isinstance(source, ChunkSource):
+            source = ChunkSource(source)
+
+        total_chars = len(source)
+        chars_per_token = self._chars_per_token(source)
+        chunk_size_chars = int(self.config.chunk_size_tokens * chars_per_token)
+        overlap_chars = int(self.config.overlap_tokens * chars_per_token)
+
+        self.chunks = []
+        self.chunk_table = None
+        self.metadata = {
+            "total_chunks": 0,
+            "total_tokens": int(total_chars / chars_per_token),
+            "total_chars": total_chars,
+            "chunk_size_tokens": self.config.chunk_size_tokens,
+            "overlap_tokens": self.config.overlap_tokens,
+            "strategy": self.config.strategy,
+            "merge_strategy": self._merge_strategy(),
+            "streaming": True
+        }
+
+        for chunk_id, (start_char, end_char, overlap_with_next) in enumerate(
+            self._iter_spans(source, chunk_size_chars, overlap_chars)
+        ):
+            estimated_tokens = CostTracker.estimate_tokens(source.read(start_char, end_char))
+
+            chunk = Chunk(
+                chunk_id=chunk_id,
+                content=None,
+                start_char=start_char,
+                end_char=end_char,
+                overlap_with_next=overlap_with_next,
+                metadata={
+                    "estimated_tokens": estimated_tokens,
+                    "char_count": end_char - start_char,
+                    "is_first": chunk_id == 0,
+                    "is_last": end_char >= total_chars
+                },
+                source=source
+            )
+
+            # Offsets only, so keeping the list costs nothing per input byte
+            self.chunks.append(chunk)
+            self.metadata["total_chunks"] += 1
+
+            yield chunk
+
+    def append_chunks(
+        self,
+        previous: "ChunkManifest",
+        source: Union[str, os.PathLike, BinaryIO, ChunkSource]
+    ) -> List[Chunk]:
+        """
+        Re-chunk only the tail of an input that has grown since the last run.
+
+        Chunks before the previous last chunk keep their IDs and boundaries.
+        The previous last chunk is re-split together with the appended text,
+        and only those chunks are returned for compilation. Pass the result
+        to chunk_manifest.update_manifest() to record the new layout.
+
+        Args:
+            previous: Manifest written for the input before it grew
+            source: The grown input (prompt text, os.PathLike path, file object, ChunkSource)
+
+        Returns:
+            New or changed chunks, starting at the previous last chunk_id
+
+        Raises:
+            ValueError: If the input changed before the appended region
+        """
+        try:
+            from .cost_tracker import CostTracker
+            from .chunk_manifest import content_digest
+        except ImportError:
+            from cost_tracker import CostTracker
+            from chunk_manifest import content_digest
+
+        if not isinstance(source, ChunkSource):
+            source = ChunkSource(source)
+
+        total_chars = len(source)
+        if previous.byte_offsets == source.is_text:
+            raise ValueError("Manifest offsets and input use different units (bytes vs characters)")
+
+        first_id, start_char = 0, 0
+        if len(previous):
+            last = previous[-1]
+            if total_chars < previous.total_chars or (
+                content_digest(source.read(last.start_char, last.end_char)).hex() != last.content_hash
+            ):
+                raise ValueError("Input changed before the appended region; re-chunk from scratch")
+            first_id, start_char = last.chunk_id, last.start_char
+
+        chars_per_token = self._chars_per_token(source)
+        chunk_size_chars = int(self.config.chunk_size_tokens * chars_per_token)
+        overlap_chars = int(self.config.overlap_tokens * chars_per_token)
+
+        chunks = []
+        for chunk_id, (span_start, span_end, overlap_with_next) in enumerate(
+            self._iter_spans(source, chunk_size_chars, overlap_chars, start_char),
+            start=first_id
+        ):
+            chunk = Chunk(
+                chunk_id=chunk_id,
+                content=None,
+                start_char=span_start,
+                end_char=span_end,
+                overlap_with_next=overlap_with_next,
+                source=source
+            )
+            chunk.estimated_tokens = CostTracker.estimate_tokens(source.read(span_start, span_end))
+            chunk.is_last = span_end >= total_chars
+            chunks.append(chunk)
+
+        self.chunks = chunks
+        self.chunk_table = None
+        self.metadata = {
+            "total_chunks": first_id + len(chunks),
+            "total_tokens": int(total_chars / chars_per_token),
+            "total_chars": total_chars,
+            "chunk_size_tokens": self.config.chunk_size_tokens,
+            "overlap_tokens": self.config.overlap_tokens,
+            "strategy": self.config.strategy,
+            "merge_strategy": self._merge_strategy(),
+            "appended_from_chunk": first_id,
+            "appended_chars": total_chars - previous.total_chars
+        }
+
+        return chunks
+
+    def create_corpus_chunks(
+        self,
+        documents: Union[Dict[str, str], List[Tuple[str, str]]]
+    ) -> List[Chunk]:
+        """
+        Pack many documents into as few chunks as the token budget allows.
+
+        Documents larger than chunk_size_tokens are split with the configured
+        strategy; the pieces and all smaller documents are then bin-packed
+        first-fit-decreasing by estimated tokens. Within a chunk, documents
+        keep their input order and each is preceded by a file header.
+        Headers and separators count against the budget, and a chunk's
+        joined text is re-estimated before a document is added, so no chunk
+        exceeds chunk_size_tokens.
+
+        Chunk offsets index the concatenation of all chunk contents.
+        metadata["file_index"] maps each document to where its text landed.
 
         Args:
-            prompt: Full input prompt
+            documents: Mapping or list of (path, text) pairs
 
         Returns:
             List of Chunk objects
@@ -79,68 +1237,276 @@ class ChunkingStrategy:
         except ImportError:
             from cost_tracker import CostTracker
 
-        total_tokens = CostTracker.estimate_tokens(prompt)
-        total_chars = len(prompt)
-
-        # Calculate chunk parameters
-        chars_per_token = total_chars / total_tokens if total_tokens > 0 else 1.3
-        chunk_size_chars = int(self.config.chunk_size_tokens * chars_per_token)
-        overlap_chars = int(self.config.overlap_tokens * chars_per_token)
+        if isinstance(documents, dict):
+            documents = list(documents.items())
 
-        # Create chunks
-        chunks = []
-        chunk_id = 0
-        start_char = 0
-
-        while start_char < total_chars:
-            end_char = min(start_char + chunk_size_chars, total_chars)
+        budget = self.config.chunk_size_tokens
+        separator_tokens = CostTracker.estimate_tokens(self.CORPUS_SEPARATOR)
 
-            # Try to break at natural boundaries (paragraph, sentence)
-            if end_char < total_chars:
-                end_char = self._find_break_point(prompt, end_char, chunk_size_chars)
+        def bin_text(packed: List[tuple]) -> str:
+            # A chunk's content: documents in input order, each behind its header
+            return self.CORPUS_SEPARATOR.join(
+                self._corpus_header(item[2], item[6], item[7]) + item[5]
+                for item in sorted(packed, key=lambda item: (item[1], item[3]))
+            )
 
-            # Extract chunk content
-            chunk_content = prompt[start_char:end_char]
+        # Pack items: (tokens, order, path, doc_start, doc_end, text, part, parts),
+        # tokens covering the document's header
+        items = []
+        for order, (path, text) in enumerate(documents):
+            tokens = CostTracker.estimate_tokens(self._corpus_header(path, 1, 1) + text)
+            if tokens <= budget:
+                items.append((tokens, order, path, 0, len(text), text, 1, 1))
+                continue
+
+            # Oversized: split like a single prompt, leaving room for the
+            # header. Break points may land past the target, so pieces that
+            # still do not fit are split again.
+            piece_budget = max(1, budget - separator_tokens
+                       - CostTracker.estimate_tokens(self._corpus_header(path, 999_999, 999_999)))
+            splitter = ChunkingStrategy(ChunkingConfig(
+                chunk_size_tokens=piece_budget,
+                overlap_tokens=min(self.config.overlap_tokens, piece_budget // 2),
+                strategy=self.config.strategy,
+                token_tolerance=self.config.token_tolerance,
+                density_window_chars=self.config.density_window_chars
+            ))
+            pieces = []
+            pending = [(0, text)]
+            while pending:
+                piece_start, piece_text = pending.pop()
+                split = [(piece.start_char, piece.content) for piece in splitter.create_chunks(piece_text)]
+                if len(split) == 1:
+                    # No break point inside the budget: cut at the token budget
+                    cut = max(1, len(piece_text) * piece_budget // max(1, CostTracker.estimate_tokens(piece_text)))
+                    split = [(0, piece_text[:cut]), (cut, piece_text[cut:])]
+                for offset, content in split:
+                    if CostTracker.estimate_tokens(content) > piece_budget:
+                        pending.append((piece_start + offset, content))
+                    else:
+                        pieces.append((piece_start + offset, content))
+            pieces.sort()
+
+            for part, (piece_start, piece_text) in enumerate(pieces, start=1):
+                header = self._corpus_header(path, part, len(pieces))
+                items.append((
+                    CostTracker.estimate_tokens(header + piece_text), order, path,
+                    piece_start, piece_start + len(piece_text), piece_text, part, len(pieces)
+                ))
+
+        # First-fit decreasing; a fit by summed estimates is confirmed on the
+        # joined text, which also carries separators
+        bins: List[List[tuple]] = []
+        remaining: List[int] = []
+        for item in sorted(items, key=lambda item: (-item[0], item[1], item[3])):
+            cost = item[0] + separator_tokens
+            for bin_idx, room in enumerate(remaining):
+                if cost <= room and CostTracker.estimate_tokens(bin_text(bins[bin_idx] + [item])) <= budget:
+                    bins[bin_idx].append(item)
+                    remaining[bin_idx] -= cost
+                    break
+            else:
+                bins.append([item])
+                remaining.append(budget - item[0])
 
-            # Calculate overlap with next chunk
-            overlap_with_next = overlap_chars if end_char < total_chars else 0
+        # Emit bins in order of their earliest document
+        bins.sort(key=lambda packed: min((item[1], item[3]) for item in packed))
 
+        chunks = []
+        file_index: Dict[str, List[Dict[str, int]]] = {}
+        offset = 0
+        for chunk_id, packed in enumerate(bins):
+            packed.sort(key=lambda item: (item[1], item[3]))
+
+            length = 0
+            for _, _, path, doc_start, doc_end, text, part, total_parts in packed:
+                if length:
+                    length += len(self.CORPUS_SEPARATOR)
+                header = self._corpus_header(path, part, total_parts)
+                file_index.setdefault(path, []).append({
+                    "chunk_id": chunk_id,
+                    "offset": length + len(header),
+                    "length": len(text),
+                    "doc_start": doc_start,
+                    "doc_end": doc_end
+                })
+                length += len(header) + len(text)
+
+            content = bin_text(packed)
             chunk = Chunk(
                 chunk_id=chunk_id,
-                content=chunk_content,
-                start_char=start_char,
-                end_char=end_char,
-                overlap_with_next=overlap_with_next,
+                content=content,
+                start_char=offset,
+                end_char=offset + len(content),
+                overlap_with_next=0,
                 metadata={
-                    "estimated_tokens": CostTracker.estimate_tokens(chunk_content),
-                    "char_count": len(chunk_content),
-                    "is_first": chunk_id == 0,
-                    "is_last": end_char >= total_chars
+                    "estimated_tokens": CostTracker.estimate_tokens(content),
+                    "is_last": chunk_id == len(bins) - 1,
+                    "files": list(dict.fromkeys(item[2] for item in packed))
                 }
             )
-
             chunks.append(chunk)
-            chunk_id += 1
-
-            # Move to next chunk with overlap
-            start_char = end_char - overlap_with_next
+            offset += len(content)
 
         self.chunks = chunks
+        self.chunk_table = None
 
-        # Store metadata
+        total_tokens = sum(chunk.estimated_tokens for chunk in chunks)
         self.metadata = {
             "total_chunks": len(chunks),
             "total_tokens": total_tokens,
-            "total_chars": total_chars,
+            "total_chars": offset,
             "chunk_size_tokens": self.config.chunk_size_tokens,
             "overlap_tokens": self.config.overlap_tokens,
             "strategy": self.config.strategy,
-            "merge_strategy": self.config.merge_strategy
+            "merge_strategy": self._merge_strategy(),
+            "corpus": True,
+            "total_documents": len(documents),
+            "packing_efficiency": round(total_tokens / (len(chunks) * budget), 3) if chunks else 0.0,
+            "file_index": file_index
         }
 
         return chunks
 
-    def _find_break_point(self, text: str, target_pos: int, max_search: int) -> int:
+    def _chars_per_token(self, source: ChunkSource) -> float:
+        """
+        Offset units per token under the active estimator.
+
+        Measured on the first TOKEN_SAMPLE_CHARS of the source, so streamed
+        inputs are sized like create_chunks() sizes whole prompts without
+        decoding the entire file. The sample lies in the unchanged prefix of
+        a grown input, so append_chunks() sizes the tail like the first run.
+
+        Args:
+            source: Source being chunked
+
+        Returns:
+            Characters (bytes for file sources) per estimated token
+        """
+        try:
+            from .cost_tracker import CostTracker
+        except ImportError:
+            from cost_tracker import CostTracker
+
+        sample_chars = min(len(source), self.TOKEN_SAMPLE_CHARS)
+        sample_tokens = CostTracker.estimate_tokens(source.read(0, sample_chars))
+        if sample_tokens <= 0:
+            return CostTracker.CHAR_TO_TOKEN_MULTIPLIER
+        return sample_chars / sample_tokens
+
+    @staticmethod
+    def _corpus_header(path: str, part: int, total_parts: int) -> str:
+        """File header placed before each document in a corpus chunk."""
+        if total_parts > 1:
+            return f"=== {path} (part {part}/{total_parts}) ===\n"
+        return f"=== {path} ===\n"
+
+    def build_chunk_table(
+        self,
+        source: Union[str, os.PathLike, BinaryIO, ChunkSource]
+    ) -> ChunkTable:
+        """
+        Chunk a source into a compact ChunkTable instead of Chunk objects.
+
+        Same spans as iter_chunks(); use this for inputs that split into
+        thousands of chunks, where per-chunk objects would dominate memory.
+
+        Args:
+            source: Prompt text, os.PathLike path, binary file object, or ChunkSource
+
+        Returns:
+            ChunkTable over the source
+        """
+        if not isinstance(source, ChunkSource):
+            source = ChunkSource(source)
+
+        table = ChunkTable(source)
+        for chunk in self.iter_chunks(source):
+            table.append(chunk.start_char, chunk.end_char, chunk.overlap_with_next,
+                         chunk.estimated_tokens)
+
+        # The table replaces the per-chunk objects
+        self.chunks = []
+        self.chunk_table = table
+        return table
+
+    def _chunk_records(self) -> Union[List[Chunk], ChunkTable]:
+        """Chunks from the last run, whether kept as objects or as a table."""
+        if self.chunks or self.chunk_table is None:
+            return self.chunks
+        return self.chunk_table
+
+    def _iter_spans(
+        self,
+        source: ChunkSource,
+        chunk_size_chars: int,
+        overlap_chars: int,
+        start_char: int = 0
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Walk the source and yield chunk spans.
+
+        Args:
+            source: Text being chunked
+            chunk_size_chars: Target chunk size in offset units
+            overlap_chars: Overlap between consecutive chunks
+            start_char: Offset of the first chunk (text before it is not scanned)
+
+        Yields:
+            Tuples of (start_char, end_char, overlap_with_next)
+        """
+        total_chars = len(source)
+
+        # One scan per boundary class; every break point is then a bisect lookup
+        self.boundary_index = BoundaryIndex(source.buffer, start_char)
+        if self.config.scan_workers != 1:
+            self.boundary_index.enable_parallel_scan(source.path, self.config.scan_workers)
+        self.structure_index = None
+        if self.config.strategy == "semantic":
+            is_python = True if source.path and source.path.endswith(".py") else None
+            self.structure_index = StructureIndex.build(source.buffer, start_char, python=is_python)
+        elif self.config.strategy == "adaptive":
+            yield from self._iter_adaptive_spans(source, start_char)
+            return
+        elif self.config.strategy == "content_defined":
+            yield from self._iter_content_defined_spans(
+                source, chunk_size_chars, overlap_chars, start_char
+            )
+            return
+
+        while start_char < total_chars:
+            end_char = min(start_char + chunk_size_chars, total_chars)
+
+            # Try to break at logical units, then natural boundaries (paragraph, sentence)
+            if end_char < total_chars:
+                if self.structure_index is not None:
+                    end_char = self._find_semantic_break_point(
+                        source.buffer, start_char, end_char, chunk_size_chars, overlap_chars
+                    )
+                else:
+                    end_char = self._find_break_point(
+                        source.buffer, end_char, chunk_size_chars, self.boundary_index
+                    )
+                end_char = source.align(end_char)
+
+            # Calculate overlap with next chunk (kept on a character boundary)
+            if end_char < total_chars:
+                overlap_with_next = end_char - source.align(end_char - overlap_chars)
+            else:
+                overlap_with_next = 0
+
+            yield start_char, end_char, overlap_with_next
+
+            # Move to next chunk with overlap
+            start_char = end_char - overlap_with_next
+
+    def _find_break_point(
+        self,
+        text: Union[str, bytes],
+        target_pos: int,
+        max_search: int,
+        index: Optional[BoundaryIndex] = None
+    ) -> int:
         """
         Find a natural break point near target position.
 
@@ -153,47 +1519,297 @@ class ChunkingStrategy:
         6. Target position (if no break found)
 
         Args:
-            text: Full text
+            text: Full text (str, or bytes-like for mapped sources)
             target_pos: Desired break position
             max_search: Maximum chars to search backward
+            index: Precomputed boundary index for text (built for the search
+                window if omitted)
 
         Returns:
             Optimal break position
         """
-        search_start = max(0, target_pos - max_search // 2)
-        search_end = min(len(text), target_pos + max_search // 2)
-        search_region = text[search_start:search_end]
-
-        # Calculate position relative to search region
-        relative_target = target_pos - search_start
-
-        # Try to find best break point
-        break_patterns = [
-            (r'\n\n', 2),      # Paragraph break
-            (r'\n', 1),        # Line break
-            (r'\. ', 2),       # Sentence break
-            (r', ', 2),        # Clause break
-            (r' ', 1)          # Word break
-        ]
+        if index is None:
+            index = BoundaryIndex(
+                text,
+                max(0, target_pos - max_search // 2),
+                min(len(text), target_pos + max_search // 2)
+            )
 
-        best_pos = None
-        best_distance = float('inf')
+        return index.find_break_point(target_pos, max_search)
 
-        for pattern, offset in break_patterns:
-            for match in re.finditer(pattern, search_region):
-                match_pos = match.start() + offset
-                distance = abs(match_pos - relative_target)
+    def _iter_adaptive_spans(
+        self,
+        source: ChunkSource,
+        start_char: int = 0
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Walk the source and yield spans sized from local token density.
+
+        Token density is estimated per fixed window of density_window_chars
+        with the active estimator, and each chunk ends on the best natural
+        break whose estimated size lies within token_tolerance below
+        chunk_size_tokens. Chunk lengths only follow content when the
+        estimator tells content apart (ContentClassEstimator, BPEEstimator;
+        see token_estimation.set_estimator): then dense regions (code, JSON,
+        CJK) get shorter chunks and sparse prose longer ones. The default
+        HeuristicEstimator is one ratio for all text, so every window has
+        the same density and chunks come out uniform in length.
 
-                if distance < best_distance:
-                    best_distance = distance
-                    best_pos = match_pos
+        Args:
+            source: Text being chunked
+            start_char: Offset of the first chunk
 
-            # If we found a good break, use it
-            if best_pos is not None and best_distance < max_search // 4:
-                return search_start + best_pos
+        Yields:
+            Tuples of (start_char, end_char, overlap_with_next)
+        """
+        try:
+            from .cost_tracker import CostTracker
+        except ImportError:
+            from cost_tracker import CostTracker
 
-        # No good break found, use target position
-        return target_pos
+        total_chars = len(source)
+        window = max(1, self.config.density_window_chars)
+        target_tokens = self.config.chunk_size_tokens
+        low_tokens = target_tokens * (1.0 - self.config.token_tolerance)
+        densities: Dict[int, float] = {}
+
+        def density(window_idx: int) -> float:
+            # Tokens per offset unit within one window
+            if window_idx not in densities:
+                a = window_idx * window
+                b = min(a + window, total_chars)
+                densities[window_idx] = CostTracker.estimate_tokens(source.read(a, b)) / max(b - a, 1)
+            return densities[window_idx]
+
+        def advance(pos: int, tokens: float) -> int:
+            # Offset reached after consuming tokens from pos
+            while pos < total_chars:
+                window_idx = pos // window
+                window_end = min((window_idx + 1) * window, total_chars)
+                d = density(window_idx)
+                available = (window_end - pos) * d
+                if available >= tokens:
+                    return pos + (int(tokens / d) if d > 0 else window_end - pos)
+                tokens -= available
+                pos = window_end
+            return total_chars
+
+        while start_char < total_chars:
+            end_char = advance(start_char, target_tokens)
+
+            if end_char < total_chars:
+                low_char = advance(start_char, low_tokens)
+                break_pos = self.boundary_index.last_break(low_char, end_char)
+                if break_pos is not None:
+                    end_char = break_pos
+                end_char = source.align(end_char)
+
+            # Overlap sized from the density at the end of this chunk
+            if end_char < total_chars:
+                overlap_end = end_char
+                overlap_start = end_char
+                remaining = float(self.config.overlap_tokens)
+                while remaining > 0 and overlap_start > start_char + 1:
+                    window_idx = (overlap_start - 1) // window
+                    window_start = max(window_idx * window, start_char + 1)
+                    d = density(window_idx)
+                    available = (overlap_start - window_start) * d
+                    if available >= remaining:
+                        overlap_start -= int(remaining / d) if d > 0 else 0
+                        break
+                    remaining -= available
+                    overlap_start = window_start
+                overlap_with_next = overlap_end - source.align(overlap_start)
+            else:
+                overlap_with_next = 0
+
+            yield start_char, end_char, overlap_with_next
+
+            # Move to next chunk with overlap; forget densities behind it
+            start_char = end_char - overlap_with_next
+            for window_idx in [k for k in densities if k < start_char // window]:
+                del densities[window_idx]
+
+    def _iter_content_defined_spans(
+        self,
+        source: ChunkSource,
+        chunk_size_chars: int,
+        overlap_chars: int,
+        start_char: int = 0
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Walk the source and yield spans whose ends are chosen by content.
+
+        A natural break becomes a chunk boundary when a hash of the
+        CDC_WINDOW_CHARS before it falls under a threshold proportional to the
+        gap since the previous candidate break. The decision depends only on
+        nearby text, so an edit moves at most the boundaries around it and
+        later chunks keep identical content (and cache keys). Chunks span
+        three quarters to all of the chunk size.
+
+        Args:
+            source: Text being chunked
+            chunk_size_chars: Maximum chunk size in offset units
+            overlap_chars: Overlap between consecutive chunks
+            start_char: Offset of the first chunk
+
+        Yields:
+            Tuples of (start_char, end_char, overlap_with_next)
+        """
+        total_chars = len(source)
+        text = source.buffer
+        min_chars = max(1, chunk_size_chars * 3 // 4, overlap_chars + 1)
+        # Expected distance to a boundary once past min_chars
+        mean_gap = max(1, (chunk_size_chars - min_chars) // 2)
+
+        # Line breaks are the candidates unless lines are too long to cut on
+        candidates = self.boundary_index.get_positions(1)
+        if len(candidates) < 8 * total_chars / max(chunk_size_chars, 1):
+            candidates = self.boundary_index.get_positions(4)
+
+        def window_hash(pos: int) -> float:
+            window = text[max(0, pos - self.CDC_WINDOW_CHARS):pos]
+            if isinstance(window, str):
+                window = window.encode("utf-8")
+            return zlib.crc32(window) / 2 ** 32
+
+        while start_char < total_chars:
+            end_char = min(start_char + chunk_size_chars, total_chars)
+
+            if end_char < total_chars:
+                lo = bisect_left(candidates, start_char + min_chars)
+                hi = bisect_right(candidates, end_char)
+
+                best_pos, best_score = None, float('inf')
+                for i in range(lo, hi):
+                    pos = candidates[i]
+                    gap = pos - candidates[i - 1] if i > 0 else pos
+                    score = window_hash(pos) * mean_gap / max(gap, 1)
+                    if score < 1.0:
+                        best_pos = pos
+                        break
+                    # Fallback: the most boundary-like candidate in range
+                    if score < best_score:
+                        best_pos, best_score = pos, score
+
+                if best_pos is not None:
+                    end_char = best_pos
+                end_char = source.align(end_char)
+
+            # Calculate overlap with next chunk (kept on a character boundary)
+            if end_char < total_chars:
+                overlap_with_next = end_char - source.align(end_char - overlap_chars)
+            else:
+                overlap_with_next = 0
+
+            yield start_char, end_char, overlap_with_next
+
+            # Move to next chunk with overlap
+            start_char = end_char - overlap_with_next
+
+    def _find_semantic_break_point(
+        self,
+        text: Union[str, bytes],
+        start_pos: int,
+        target_pos: int,
+        max_search: int,
+        overlap: int
+    ) -> int:
+        """
+        Find a break point that keeps logical units whole.
+
+        Priority:
+        1. Last structural boundary (heading, code fence, top-level def)
+           before the target, as long as the chunk reaches
+           SEMANTIC_MIN_FILL of its budget
+        2. Natural text break, moved to the start or end of a code fence
+           it would split
+        3. Natural text break inside the unit (unit larger than a chunk)
+
+        Args:
+            text: Full text (str, or bytes-like for mapped sources)
+            start_pos: Start of the current chunk
+            target_pos: Desired break position (chunk budget)
+            max_search: Size of the search window
+            overlap: Overlap carried into the next chunk
+
+        Returns:
+            Optimal break position
+        """
+        # A boundary only wins if the chunk stays mostly full
+        min_end = start_pos + max(int(max_search * self.SEMANTIC_MIN_FILL), overlap + 1)
+
+        boundary = self.structure_index.last_boundary(min_end - 1, target_pos)
+        if boundary is not None:
+            return boundary
+
+        break_pos = self._find_break_point(text, target_pos, max_search, self.boundary_index)
+
+        # End before (or, if it fits, after) a fence rather than inside it;
+        # only a fence longer than a whole chunk gets split
+        fence = self.structure_index.enclosing_fence(break_pos)
+        if fence is not None:
+            if fence[0] > start_pos + overlap:
+                return fence[0]
+            if fence[1] <= target_pos:
+                return fence[1]
+
+        return break_pos
+
+    def scheduling_hint(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Suggest a dispatch order for compiling chunks in parallel.
+
+        Chunks are ordered longest-processing-time first by estimated_tokens,
+        and each is assigned to the least-loaded worker. This keeps a small
+        trailing chunk from running alone while the other workers sit idle.
+        Document order is kept instead in the rare case it predicts a shorter
+        makespan. Makespans are in estimated tokens, a proxy for wall time.
+
+        Args:
+            workers: Number of parallel compilers (default: config.schedule_workers)
+
+        Returns:
+            Dictionary with dispatch order, per-worker assignments, and
+            predicted makespans for LPT and document order
+        """
+        workers = max(1, workers or self.config.schedule_workers)
+        records = self._chunk_records()
+        if isinstance(records, ChunkTable):
+            tokens = list(records.tokens)
+        else:
+            tokens = [chunk.estimated_tokens for chunk in records]
+
+        def list_schedule(order: List[int]) -> Tuple[int, List[List[int]]]:
+            loads = [(0, worker) for worker in range(workers)]
+            assignments: List[List[int]] = [[] for _ in range(workers)]
+            for chunk_id in order:
+                load, worker = heapq.heappop(loads)
+                assignments[worker].append(chunk_id)
+                heapq.heappush(loads, (load + tokens[chunk_id], worker))
+            return max(load for load, _ in loads), assignments
+
+        document_order = list(range(len(tokens)))
+        document_makespan, document_assignments = list_schedule(document_order)
+        order = sorted(document_order, key=lambda chunk_id: (-tokens[chunk_id], chunk_id))
+        makespan, assignments = list_schedule(order)
+
+        # LPT is within 4/3 of optimal but not always better than input order
+        policy = "lpt"
+        if document_makespan < makespan:
+            policy, order, makespan, assignments = (
+                "document", document_order, document_makespan, document_assignments
+            )
+
+        return {
+            "workers": workers,
+            "policy": policy,
+            "order": order,
+            "assignments": assignments,
+            "predicted_makespan_tokens": makespan,
+            "document_order_makespan_tokens": document_makespan,
+            "lower_bound_tokens": max(-(-sum(tokens) // workers), max(tokens, default=0))
+        }
 
     def merge_chunk_results(
         self,
@@ -208,6 +1824,15 @@ class ChunkingStrategy:
         - Chunk 2 sees Chunk 1's results as context
         - Chunk 3 sees Chunk 1+2's results, etc.
 
+        Tree strategy:
+        - Chunk results are combined pairwise, one level at a time, O(log n)
+          levels deep, so partial merges of independent chunk ranges can be
+          combined in any grouping
+        - The combine step is associative, so the merged result is identical
+          to the sequential strategy's
+        - Levels are reduced in-process: combining is a list extend and a
+          dict merge, far cheaper than pickling parts to worker processes
+
         Args:
             chunk_results: List of results from each chunk
             original_prompt: Original user prompt
@@ -227,79 +1852,234 @@ class ChunkingStrategy:
             "context": {
                 "chunked": True,
                 "total_chunks": len(chunk_results),
-                "merge_strategy": self.config.merge_strategy
+                "merge_strategy": self._merge_strategy()
             },
             "deliverables": []
         }
 
-        # Merge tasks from all chunks (sequential context)
-        task_id_offset = 0
-        for chunk_idx, chunk_result in enumerate(chunk_results):
-            chunk_tasks = chunk_result.get("tasks", [])
-
-            # Update task IDs to be globally unique
-            for task in chunk_tasks:
-                # Prefix task_id with chunk number
-                original_id = task["id"]
-                task["id"] = f"chunk{chunk_idx}_{original_id}"
-
-                # Update dependency references
-                if "depends_on" in task:
-                    updated_deps = []
-                    for dep in task["depends_on"]:
-                        # If dependency is from same chunk, prefix it
-                        if not dep.startswith("chunk"):
-                            updated_deps.append(f"chunk{chunk_idx}_{dep}")
-                        else:
-                            updated_deps.append(dep)
-                    task["depends_on"] = updated_deps
-
-                # Add chunk metadata
-                task["chunk_id"] = chunk_idx
-                task["chunk_context"] = f"Processes chunk {chunk_idx + 1}/{len(chunk_results)}"
-
-                merged["tasks"].append(task)
-
-            # Merge context (sequential: later chunks build on earlier)
-            chunk_context = chunk_result.get("context", {})
-            for key, value in chunk_context.items():
-                if key not in merged["context"]:
-                    merged["context"][key] = value
-                elif isinstance(value, list):
-                    # Append to list
-                    if key not in merged["context"]:
-                        merged["context"][key] = []
-                    merged["context"][key].extend(value)
-                elif isinstance(value, dict):
-                    # Merge dicts
-                    if key not in merged["context"]:
-                        merged["context"][key] = {}
-                    merged["context"][key].update(value)
-
-            # Merge deliverables
-            chunk_deliverables = chunk_result.get("deliverables", [])
-            merged["deliverables"].extend(chunk_deliverables)
-
-        # Deduplicate deliverables
-        merged["deliverables"] = list(set(merged["deliverables"]))
+        # Globally unique task IDs per chunk, then one combinable part per chunk
+        task_index = _TaskIdIndex(chunk_results)
+        parts = [
+            self._prepare_merge_part(chunk_idx, chunk_result, len(chunk_results), task_index)
+            for chunk_idx, chunk_result in enumerate(chunk_results)
+        ]
+
+        if self._merge_strategy() == "tree":
+            combined = self._tree_reduce_parts(parts)
+        else:
+            combined = parts[0]
+            for part in parts[1:]:
+                combined = _combine_merge_parts(combined, part)
+
+        combined = _combine_merge_parts(
+            {"tasks": [], "context": merged["context"], "deliverables": []},
+            combined
+        )
+        merged["tasks"] = combined["tasks"]
+        merged["context"] = combined["context"]
+
+        # Overlap regions get compiled twice; keep one copy of each such task
+        replaced = {}
+        if self.config.dedup_overlap_tasks:
+            merged["tasks"], replaced = self._deduplicate_overlap_tasks(merged["tasks"])
+
+        # Deduplicate deliverables (first occurrence wins, so order is stable)
+        merged["deliverables"] = list(dict.fromkeys(combined["deliverables"]))
 
         # Add chunking metadata
         merged["chunking_metadata"] = {
             "total_chunks": len(chunk_results),
-            "merge_strategy": self.config.merge_strategy,
+            "merge_strategy": self._merge_strategy(),
             "chunk_boundaries": [
                 {
                     "chunk_id": chunk.chunk_id,
                     "start_char": chunk.start_char,
                     "end_char": chunk.end_char,
-                    "tokens": chunk.metadata.get("estimated_tokens", 0)
+                    "tokens": chunk.estimated_tokens
                 }
-                for chunk in self.chunks
+                for chunk in self._chunk_records()
             ]
         }
+        merged["chunking_metadata"]["dangling_dependencies"] = task_index.dangling
+        merged["chunking_metadata"]["schedule"] = self.scheduling_hint()
+        # Every dropped task ID, mapped to the task that replaced it
+        merged["chunking_metadata"]["deduplicated_tasks"] = replaced
 
         return merged
 
+    def _deduplicate_overlap_tasks(
+        self,
+        tasks: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Collapse near-duplicate tasks compiled from the same overlap region.
+
+        Opt-in (dedup_overlap_tasks). Only tasks from neighbouring chunks
+        with the same role are compared. Descriptions are fingerprinted with
+        MinHash over word 3-gram shingles, and a later task whose estimated
+        similarity to an earlier one reaches dedup_threshold is dropped.
+        A task repeated across several chunks collapses onto its first
+        copy. The survivor inherits the dropped tasks' depends_on, edges
+        pointing at a dropped task are rewritten to its survivor, and
+        merge_chunk_results() lists every drop in
+        chunking_metadata["deduplicated_tasks"].
+
+        Compiled tasks do not record where in the chunk they came from, so
+        candidates cannot be limited to the overlap span itself. Tasks that
+        share templated wording can look alike, which is why this is off by
+        default and the threshold is high.
+
+        Args:
+            tasks: Merged tasks with globally unique IDs and chunk_id set
+
+        Returns:
+            Tuple of (remaining tasks, {dropped_task_id: survivor_task_id})
+        """
+        by_chunk: Dict[int, List[Dict[str, Any]]] = {}
+        for task in tasks:
+            by_chunk.setdefault(task.get("chunk_id", 0), []).append(task)
+
+        signatures = {
+            id(task): _minhash_signature(_task_fingerprint_text(task))
+            for task in tasks
+        }
+
+        replaced: Dict[str, str] = {}
+        for chunk_idx in sorted(by_chunk):
+            # Dropped tasks stay candidates so a chain of copies resolves to the first
+            earlier = by_chunk.get(chunk_idx - 1, [])
+            if not earlier:
+                continue
+
+            # Greedy one-to-one matching, most similar pairs first
+            pairs = []
+            for later_task in by_chunk[chunk_idx]:
+                for earlier_task in earlier:
+                    if later_task.get("role") != earlier_task.get("role"):
+                        continue
+                    similarity = _minhash_similarity(
+                        signatures[id(later_task)], signatures[id(earlier_task)]
+                    )
+                    if similarity >= self.config.dedup_threshold:
+                        pairs.append((-similarity, later_task["id"], earlier_task["id"]))
+
+            survivors_used = set()
+            for _, later_id, earlier_id in sorted(pairs):
+                if later_id in replaced or earlier_id in survivors_used:
+                    continue
+                replaced[later_id] = earlier_id
+                survivors_used.add(earlier_id)
+
+        if not replaced:
+            return tasks, replaced
+
+        def find(task_id: str) -> str:
+            root = task_id
+            while root in replaced:
+                root = replaced[root]
+            while task_id != root:
+                replaced[task_id], task_id = root, replaced[task_id]
+            return root
+
+        survivor_of = {task_id: find(task_id) for task_id in replaced}
+
+        # Dependencies of dropped tasks move to their survivor
+        inherited: Dict[str, List[str]] = {}
+        for task in tasks:
+            if task["id"] in survivor_of:
+                inherited.setdefault(survivor_of[task["id"]], []).extend(task.get("depends_on", []))
+
+        remaining = []
+        for task in tasks:
+            if task["id"] in survivor_of:
+                continue
+            if "depends_on" in task or task["id"] in inherited:
+                deps = []
+                for dep in task.get("depends_on", []) + inherited.get(task["id"], []):
+                    dep = survivor_of.get(dep, dep)
+                    if dep != task["id"] and dep not in deps:
+                        deps.append(dep)
+                task["depends_on"] = deps
+            remaining.append(task)
+
+        return remaining, survivor_of
+
+    def _prepare_merge_part(
+        self,
+        chunk_idx: int,
+        chunk_result: Dict[str, Any],
+        total_chunks: int,
+        task_index: "_TaskIdIndex"
+    ) -> Dict[str, Any]:
+        """
+        Turn one chunk's result into a combinable merge part.
+
+        Tasks are copied, never modified in place, so chunk_results stay
+        reusable (e.g. as cache entries or for a re-merge).
+
+        Args:
+            chunk_idx: Index of the chunk
+            chunk_result: Compiled result for the chunk
+            total_chunks: Number of chunks being merged
+            task_index: Task-ID index over all chunk results
+
+        Returns:
+            Dict with tasks, context and deliverables
+        """
+        tasks = []
+
+        for original in chunk_result.get("tasks", []):
+            task = dict(original)
+
+            # Prefix task_id with chunk number
+            task["id"] = task_index.global_id(chunk_idx, original["id"])
+
+            # Resolve dependency references against every chunk's tasks
+            if "depends_on" in original:
+                task["depends_on"] = [
+                    resolved
+                    for resolved in (
+                        task_index.resolve(chunk_idx, dep, task["id"])
+                        for dep in original["depends_on"]
+                    )
+                    if resolved is not None
+                ]
+
+            # Add chunk metadata
+            task["chunk_id"] = chunk_idx
+            task["chunk_context"] = f"Processes chunk {chunk_idx + 1}/{total_chunks}"
+
+            tasks.append(task)
+
+        return {
+            "tasks": tasks,
+            "context": _merge_context({}, chunk_result.get("context", {})),
+            "deliverables": list(chunk_result.get("deliverables", []))
+        }
+
+    def _merge_strategy(self) -> str:
+        """Configured merge strategy, with the "parallel" alias resolved to "tree"."""
+        return "tree" if self.config.merge_strategy == "parallel" else self.config.merge_strategy
+
+    def _tree_reduce_parts(self, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine merge parts pairwise, one tree level at a time.
+
+        Args:
+            parts: Merge parts in chunk order
+
+        Returns:
+            Single combined merge part
+        """
+        while len(parts) > 1:
+            carry = [parts[-1]] if len(parts) % 2 else []
+            parts = [
+                _combine_merge_parts(left, right)
+                for left, right in zip(parts[0:-1:2], parts[1::2])
+            ] + carry
+
+        return parts[0]
+
     def get_chunk_metadata_python(self) -> str:
         """
         Generate pseudo-Python structured data for chunks_metadata.py.
@@ -325,20 +2105,48 @@ class ChunkingStrategy:
 
         # Add chunk details
         lines.append("chunks = [")
-        for chunk in self.chunks:
+        for chunk in self._chunk_records():
             lines.append("    {")
             lines.append(f'        "chunk_id": {chunk.chunk_id},')
             lines.append(f'        "start_char": {chunk.start_char},')
             lines.append(f'        "end_char": {chunk.end_char},')
             lines.append(f'        "overlap_with_next": {chunk.overlap_with_next},')
-            lines.append(f'        "estimated_tokens": {chunk.metadata.get("estimated_tokens", 0)},')
-            lines.append(f'        "is_first": {chunk.metadata.get("is_first", False)},')
-            lines.append(f'        "is_last": {chunk.metadata.get("is_last", False)},')
+            lines.append(f'        "estimated_tokens": {chunk.estimated_tokens},')
+            lines.append(f'        "is_first": {chunk.chunk_id == 0},')
+            lines.append(f'        "is_last": {chunk.is_last},')
             lines.append("    },")
         lines.append("]")
 
         return "\n".join(lines)
 
+    def write_manifest(self, path: str) -> int:
+        """
+        Write the current chunks as a binary manifest (see chunk_manifest.py).
+
+        Args:
+            path: Destination manifest path
+
+        Returns:
+            Number of chunks written
+        """
+        try:
+            from .chunk_manifest import write_manifest
+        except ImportError:
+            from chunk_manifest import write_manifest
+
+        records = self._chunk_records()
+        if isinstance(records, ChunkTable):
+            source = records.source
+        else:
+            source = records[0].source if records else None
+
+        return write_manifest(
+            path,
+            records,
+            total_chars=self.metadata.get("total_chars"),
+            byte_offsets=source is not None and not source.is_text
+        )
+
     def to_markdown(self) -> str:
         """
         Generate markdown report of chunking decisions.
@@ -365,7 +2173,7 @@ class ChunkingStrategy:
             "",
         ]
 
-        if self.chunks:
+        if len(self._chunk_records()):
             lines.extend([
                 "## Chunk Details",
                 "",
@@ -373,9 +2181,9 @@ class ChunkingStrategy:
                 "|-------|--------|------------|-------|-----|---------|",
             ])
 
-            for chunk in self.chunks:
-                tokens = chunk.metadata.get('estimated_tokens', 0)
-                chars = chunk.metadata.get('char_count', 0)
+            for chunk in self._chunk_records():
+                tokens = chunk.estimated_tokens
+                chars = chunk.char_count
                 lines.append(
                     f"| {chunk.chunk_id} | {tokens:,} | {chars:,} | "
                     f"{chunk.start_char:,} | {chunk.end_char:,} | "
@@ -383,22 +2191,238 @@ class ChunkingStrategy:
                 )
             lines.append("")
 
-        lines.extend([
-            "## Processing Strategy",
-            "",
-            f"**Sequential Merge:** Chunk N+1 sees results from chunk N as context.",
-            "",
-            "This ensures:",
-            "- Context continuity across chunks",
-            "- Later chunks can reference earlier results",
-            "- Dependencies are preserved",
-            "",
-            "## Next Steps",
-            "",
-            "1. Each chunk will be compiled separately",
-            "2. Results merged sequentially (chunk 2 sees chunk 1 output)",
-            "3. Final compilation combines all chunk results",
-            "",
-        ])
+        lines.extend(["## Processing Strategy", ""])
+        if self._merge_strategy() == "tree":
+            lines.extend([
+                "**Tree Merge:** Chunk results are combined pairwise, one level at a time.",
+                "",
+                "This ensures:",
+                "- Chunks compile independently of each other's output",
+                "- Merging takes O(log n) combine levels instead of n steps",
+                "- The merged result matches a sequential merge",
+                "",
+                "## Next Steps",
+                "",
+                "1. Each chunk will be compiled separately",
+                "2. Results merged pairwise in a tree (chunks 1+2, 3+4, ..., then pairs of those)",
+                "3. Final compilation combines all chunk results",
+                "",
+            ])
+        else:
+            lines.extend([
+                f"**Sequential Merge:** Chunk N+1 sees results from chunk N as context.",
+                "",
+                "This ensures:",
+                "- Context continuity across chunks",
+                "- Later chunks can reference earlier results",
+                "- Dependencies are preserved",
+                "",
+                "## Next Steps",
+                "",
+                "1. Each chunk will be compiled separately",
+                "2. Results merged sequentially (chunk 2 sees chunk 1 output)",
+                "3. Final compilation combines all chunk results",
+                "",
+            ])
 
         return "\n".join(lines)
+
+
+def _scan_boundary_range(
+    path: str,
+    class_idx: int,
+    start: int,
+    end: int,
+    scan_end: int,
+    typecode: str
+) -> bytes:
+    """
+    Worker: scan one byte range of a mapped file for one boundary class.
+
+    Args:
+        path: File to map
+        class_idx: Index into BoundaryIndex.BOUNDARY_CLASSES
+        start: First offset a match may start at
+        end: Offset matches must start before
+        scan_end: End of the whole scan (limits lookahead)
+        typecode: Array typecode for the offsets
+
+    Returns:
+        Raw bytes of an offset array (cheaper to pickle than the array)
+    """
+    pattern = BoundaryIndex._BYTES_PATTERNS[class_idx]
+    offset = BoundaryIndex.BOUNDARY_CLASSES[class_idx][2]
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # One byte of lookahead so breaks straddling the range end are seen
+        positions = array(
+            typecode,
+            (m.start() + offset for m in pattern.finditer(mapped, start, min(end + 1, scan_end))
+             if m.start() < end)
+        )
+    return positions.tobytes()
+
+
+class _TaskIdIndex:
+    """
+    Global task-ID index used to resolve depends_on references during merge.
+
+    A reference from chunk i resolves, in order, to:
+    1. A task defined in chunk i
+    2. An already-prefixed global ID (e.g. "chunk0_setup")
+    3. The nearest earlier chunk defining that ID
+    4. The first later chunk defining that ID
+    Anything else is dangling: it is dropped from depends_on and reported.
+    Each lookup is O(1).
+    """
+
+    def __init__(self, chunk_results: List[Dict[str, Any]]):
+        self.local_ids: List[set] = []
+        self.first_chunk: Dict[str, int] = {}
+        self.global_ids = set()
+
+        for chunk_idx, chunk_result in enumerate(chunk_results):
+            ids = {task["id"] for task in chunk_result.get("tasks", [])}
+            self.local_ids.append(ids)
+            for task_id in ids:
+                self.first_chunk.setdefault(task_id, chunk_idx)
+                self.global_ids.add(self.global_id(chunk_idx, task_id))
+
+        # latest_chunk[id] = last chunk before the current one defining id
+        self._latest_chunk: Dict[str, int] = {}
+        self._scanned_through = -1
+        self.dangling: List[Dict[str, str]] = []
+
+    @staticmethod
+    def global_id(chunk_idx: int, task_id: str) -> str:
+        return f"chunk{chunk_idx}_{task_id}"
+
+    def resolve(self, chunk_idx: int, dep: str, task_id: str) -> Optional[str]:
+        """
+        Resolve a dependency reference made by a task in chunk_idx.
+
+        Chunks must be resolved in ascending order.
+
+        Args:
+            chunk_idx: Chunk of the referencing task
+            dep: Referenced task ID as written in the chunk result
+            task_id: Global ID of the referencing task (for reporting)
+
+        Returns:
+            Global ID of the dependency, or None if it is dangling
+        """
+        # Advance the "defined in an earlier chunk" view up to chunk_idx - 1
+        while self._scanned_through < chunk_idx - 1:
+            self._scanned_through += 1
+            for local_id in self.local_ids[self._scanned_through]:
+                self._latest_chunk[local_id] = self._scanned_through
+
+        if dep in self.local_ids[chunk_idx]:
+            return self.global_id(chunk_idx, dep)
+        if dep in self.global_ids:
+            return dep
+        if dep in self._latest_chunk:
+            return self.global_id(self._latest_chunk[dep], dep)
+        if dep in self.first_chunk:
+            return self.global_id(self.first_chunk[dep], dep)
+
+        self.dangling.append({"task": task_id, "depends_on": dep})
+        return None
+
+
+def _merge_context(merged: Dict[str, Any], chunk_context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold one chunk context into an accumulated context (in place).
+
+    Lists are concatenated, dicts updated, and for any other value the first
+    occurrence wins. The rule is associative as long as each key keeps one
+    type across chunks, which is what lets the tree merge combine
+    contexts in any grouping.
+
+    Args:
+        merged: Accumulated context
+        chunk_context: Context to fold in
+
+    Returns:
+        The accumulated context
+    """
+    for key, value in chunk_context.items():
+        if key not in merged:
+            # Copy containers so later merges never modify chunk results
+            if isinstance(value, list):
+                value = list(value)
+            elif isinstance(value, dict):
+                value = dict(value)
+            merged[key] = value
+        elif isinstance(value, list) and isinstance(merged[key], list):
+            # Append to list
+            merged[key].extend(value)
+        elif isinstance(value, dict) and isinstance(merged[key], dict):
+            # Merge dicts
+            merged[key].update(value)
+    return merged
+
+
+def _combine_merge_parts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine two merge parts covering consecutive chunk ranges.
+
+    The left part is extended in place, so a sequential fold stays linear.
+
+    Args:
+        left: Part for the earlier chunks
+        right: Part for the later chunks
+
+    Returns:
+        The left part, now covering both ranges
+    """
+    left["tasks"].extend(right["tasks"])
+    _merge_context(left["context"], right["context"])
+    left["deliverables"].extend(right["deliverables"])
+    return left
+
+
+# MinHash parameters: fixed seeds so fingerprints are stable across runs
+_MINHASH_PERMUTATIONS = 64
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_SEEDS = [
+    (random.Random(seed).randrange(1, _MINHASH_PRIME), random.Random(-seed).randrange(0, _MINHASH_PRIME))
+    for seed in range(1, _MINHASH_PERMUTATIONS + 1)
+]
+
+
+def _task_fingerprint_text(task: Dict[str, Any]) -> str:
+    """Text a task is fingerprinted on: its description, else its title."""
+    return str(task.get("description") or task.get("title") or task.get("id", ""))
+
+
+def _minhash_signature(text: str, shingle_size: int = 3) -> Tuple[int, ...]:
+    """
+    Compute a MinHash signature over word shingles.
+
+    Args:
+        text: Text to fingerprint
+        shingle_size: Words per shingle
+
+    Returns:
+        Tuple of _MINHASH_PERMUTATIONS minimum hash values
+    """
+    words = re.findall(r'\w+', text.lower())
+    if len(words) <= shingle_size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for shingle in shingles
+    ]
+    return tuple(
+        min((a * h + b) % _MINHASH_PRIME for h in hashes)
+        for a, b in _MINHASH_SEEDS
+    )
+
+
+def _minhash_similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
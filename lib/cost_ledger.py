@@ -0,0 +1,760 @@
+"""
+Cost Ledger for Loom
+Columnar storage for CostTracker calls, in memory and as an append-only file.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+import json
+import mmap
+import os
+import struct
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from .cost_tracker import DEFAULT_MODEL, MODEL_PRICING, ModelPricing, SubagentCall, UsageTotals
+except ImportError:
+    from cost_tracker import DEFAULT_MODEL, MODEL_PRICING, ModelPricing, SubagentCall, UsageTotals
+
+
+class CallLedger:
+    """
+    Array-backed, append-only list of subagent calls.
+
+    Design decisions:
+    - Roles, task IDs and models are interned into one string table and
+      stored as uint32 ids
+    - Token counts (uncached input, output, cache reads, cache writes),
+      rounds and levels are uint32 arrays; the record timestamp and the
+      call's start and finish are float64 epoch seconds (60 bytes per
+      call, so 1M calls take about 60 MB)
+    - Behaves as a read-only sequence of SubagentCall, materialized on
+      access, so code written against CostTracker.calls keeps working
+    - totals_by() groups with numpy when it is installed, and with a
+      single pass over the arrays otherwise
+    """
+
+    # Columns that totals_by() can group on
+    GROUP_COLUMNS = ("role", "task_id", "round")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+        self.roles = array("I")
+        self.task_ids = array("I")
+        self.input_tokens = array("I")
+        self.output_tokens = array("I")
+        self.rounds = array("I")
+        self.timestamps = array("d")
+        self.models = array("I")
+        self.cache_reads = array("I")
+        self.cache_writes = array("I")
+        self.started = array("d")
+        self.finished = array("d")
+        self.levels = array("I")
+
+    def intern(self, value: str) -> int:
+        """
+        Get the string-table id for a role or task ID, adding it if new.
+
+        Args:
+            value: String to intern
+
+        Returns:
+            String-table id
+        """
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def append_row(
+        self,
+        role: str,
+        task_id: str,
+        input_tokens: int,
+        output_tokens: int,
+        timestamp: float,
+        round_num: int,
+        model: str = "",
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        started_at: float = 0.0,
+        finished_at: float = 0.0,
+        level: int = 0
+    ) -> int:
+        """
+        Append one call without building a SubagentCall.
+
+        Args:
+            role: Subagent role
+            task_id: Task identifier
+            input_tokens: Uncached input token count
+            output_tokens: Output token count
+            timestamp: Call time as epoch seconds
+            round_num: Round number
+            model: Model that served the call ("" for the role's model)
+            cache_read_tokens: Input tokens read from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
+            started_at: Dispatch time as epoch seconds (0.0 if unknown)
+            finished_at: Completion time as epoch seconds (0.0 if unknown)
+            level: Spawn level within the round
+
+        Returns:
+            Row index of the new call
+        """
+        self.roles.append(self.intern(role))
+        self.task_ids.append(self.intern(task_id))
+        self.input_tokens.append(input_tokens)
+        self.output_tokens.append(output_tokens)
+        self.timestamps.append(timestamp)
+        self.rounds.append(round_num)
+        self.models.append(self.intern(model))
+        self.cache_reads.append(cache_read_tokens)
+        self.cache_writes.append(cache_write_tokens)
+        self.started.append(started_at)
+        self.finished.append(finished_at)
+        self.levels.append(level)
+        return len(self.roles) - 1
+
+    def append(self, call: SubagentCall) -> int:
+        """
+        Append a SubagentCall (its ISO timestamp is converted to epoch seconds).
+
+        Args:
+            call: Call to append
+
+        Returns:
+            Row index of the new call
+        """
+        return self.append_row(
+            call.role,
+            call.task_id,
+            call.input_tokens,
+            call.output_tokens,
+            datetime.fromisoformat(call.timestamp).timestamp() if call.timestamp else 0.0,
+            call.round,
+            call.model,
+            call.cache_read_tokens,
+            call.cache_write_tokens,
+            call.started_at,
+            call.finished_at,
+            call.level
+        )
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def __getitem__(self, index: int) -> SubagentCall:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return SubagentCall(
+            role=self.strings[self.roles[index]],
+            task_id=self.strings[self.task_ids[index]],
+            input_tokens=self.input_tokens[index],
+            output_tokens=self.output_tokens[index],
+            timestamp=datetime.fromtimestamp(self.timestamps[index]).isoformat(),
+            round=self.rounds[index],
+            model=self.strings[self.models[index]],
+            cache_read_tokens=self.cache_reads[index],
+            cache_write_tokens=self.cache_writes[index],
+            started_at=self.started[index],
+            finished_at=self.finished[index],
+            level=self.levels[index]
+        )
+
+    def __iter__(self) -> Iterator[SubagentCall]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def rows(self, start: int = 0) -> Iterator[Tuple]:
+        """
+        Iterate usage and latency rows without materializing calls.
+
+        Args:
+            start: First row
+
+        Yields:
+            (role, round, model, input_tokens, output_tokens,
+            cache_read_tokens, cache_write_tokens, task_id, started_at,
+            finished_at, level) per call
+        """
+        strings = self.strings
+        for index in range(start, len(self)):
+            yield (
+                strings[self.roles[index]],
+                self.rounds[index],
+                strings[self.models[index]],
+                self.input_tokens[index],
+                self.output_tokens[index],
+                self.cache_reads[index],
+                self.cache_writes[index],
+                strings[self.task_ids[index]],
+                self.started[index],
+                self.finished[index],
+                self.levels[index]
+            )
+
+    def _group_keys(self, column: str) -> Tuple[array, bool]:
+        if column == "role":
+            return self.roles, True
+        if column == "task_id":
+            return self.task_ids, True
+        if column == "round":
+            return self.rounds, False
+        raise ValueError(f"Cannot group by {column!r}; expected one of {self.GROUP_COLUMNS}")
+
+    def totals_by(
+        self,
+        column: str,
+        pricing: Optional[Dict[str, ModelPricing]] = None,
+        model_for: Optional[Callable[[str], str]] = None
+    ) -> Dict[object, UsageTotals]:
+        """
+        Sum tokens, calls and (with pricing) cost per distinct value of a column.
+
+        Args:
+            column: One of GROUP_COLUMNS
+            pricing: Rates by model (default: no cost or savings computed)
+            model_for: Model for calls recorded without one, by role
+                (default: DEFAULT_MODEL)
+
+        Returns:
+            Dictionary mapping role, task ID or round to its totals
+        """
+        keys, interned = self._group_keys(column)
+        if not keys:
+            return {}
+
+        grouped = _group_usage(
+            keys, self.roles, self.models,
+            (self.input_tokens, self.output_tokens, self.cache_reads, self.cache_writes)
+        )
+        return _finish_groups(grouped, self.strings, interned, pricing, model_for)
+
+    def nbytes(self) -> int:
+        """Bytes held by the array columns (excluding the string table)."""
+        columns = (
+            self.roles, self.task_ids, self.input_tokens, self.output_tokens, self.rounds,
+            self.timestamps, self.models, self.cache_reads, self.cache_writes,
+            self.started, self.finished, self.levels
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+def _group_usage(
+    keys: Iterable[int],
+    roles: Iterable[int],
+    models: Iterable[int],
+    token_columns: Tuple[Iterable[int], Iterable[int], Iterable[int], Iterable[int]]
+) -> Dict[Tuple[int, int, int], UsageTotals]:
+    """
+    Sum the token columns per (key, role id, model id).
+
+    Role and model are part of the group so each group has one price. With
+    numpy the columns must support the buffer protocol (uint32).
+    """
+    if numpy is not None:
+        stacked = numpy.stack([numpy.asarray(column, dtype=numpy.uint32) for column in (keys, roles, models)])
+        unique, inverse = numpy.unique(stacked, axis=1, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = numpy.bincount(inverse)
+        sums = [
+            numpy.bincount(inverse, weights=numpy.asarray(column, dtype=numpy.float64))
+            for column in token_columns
+        ]
+        return {
+            (int(unique[0, i]), int(unique[1, i]), int(unique[2, i])): UsageTotals(
+                input_tokens=int(sums[0][i]),
+                output_tokens=int(sums[1][i]),
+                calls=int(counts[i]),
+                cache_read_tokens=int(sums[2][i]),
+                cache_write_tokens=int(sums[3][i])
+            )
+            for i in range(unique.shape[1])
+        }
+
+    grouped: Dict[Tuple[int, int, int], UsageTotals] = {}
+    for key, role, model, input_tokens, output_tokens, cache_reads, cache_writes in zip(
+        keys, roles, models, *token_columns
+    ):
+        group = (key, role, model)
+        totals = grouped.get(group)
+        if totals is None:
+            totals = grouped[group] = UsageTotals()
+        totals.add(input_tokens, output_tokens, cache_reads, cache_writes)
+    return grouped
+
+
+def _finish_groups(
+    grouped: Dict[Tuple[int, int, int], UsageTotals],
+    strings: List[str],
+    interned: bool,
+    pricing: Optional[Dict[str, ModelPricing]],
+    model_for: Optional[Callable[[str], str]]
+) -> Dict[object, UsageTotals]:
+    """Price each (key, role, model) group and merge groups by key."""
+    result: Dict[object, UsageTotals] = {}
+    for (key, role_id, model_id), totals in grouped.items():
+        if pricing is not None:
+            model = strings[model_id] or (model_for(strings[role_id]) if model_for else DEFAULT_MODEL)
+            rates = pricing[model]
+            totals.cost = rates.cost(
+                totals.input_tokens, totals.output_tokens,
+                totals.cache_read_tokens, totals.cache_write_tokens
+            )
+            totals.cache_savings = rates.cache_savings(totals.cache_read_tokens, totals.cache_write_tokens)
+
+        name = strings[key] if interned else key
+        if name in result:
+            result[name].merge(totals)
+        else:
+            result[name] = totals
+    return result
+
+
+class LedgerError(Exception):
+    """Raised when a persistent ledger file is malformed."""
+    pass
+
+
+class LedgerWriter:
+    """
+    Append-only on-disk call ledger.
+
+    File layout (little-endian):
+    - <path>: 24-byte header (magic, version, record size, reserved), then
+      fixed-width records: timestamp (float64 epoch), role id, task id,
+      input tokens, output tokens, round, model id, cache read tokens,
+      cache write tokens (uint32 each), then start and finish time
+      (float64 epoch, 0.0 if unknown) and spawn level (uint32)
+    - <path>.strings: string table, one JSON-encoded string per line;
+      a string's id is its line number
+
+    Records are buffered and written in batches. Each flush writes the
+    string table before the records that reference it, and fsyncs both
+    every sync_every records or sync_interval seconds. A crash can lose at
+    most the unsynced batch. A torn trailing record or string line is cut
+    off the next time the ledger is opened.
+
+    Timestamps are clamped to be non-decreasing so readers can bisect on time.
+    """
+
+    MAGIC = b"LOOMCST1"
+    VERSION = 1
+    HEADER = struct.Struct("<8sII8x")
+    RECORD = struct.Struct("<dIIIIIIIIddI")
+
+    def __init__(self, path: str, sync_every: int = 256, sync_interval: float = 1.0):
+        """
+        Open (or create) a ledger for appending.
+
+        Args:
+            path: Ledger file path
+            sync_every: Records per batched fsync
+            sync_interval: Maximum seconds between fsyncs while appending
+
+        Raises:
+            LedgerError: If the file exists but is not a ledger in this format
+        """
+        self.path = path
+        self.strings_path = f"{path}.strings"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+
+        self.strings, strings_size = _load_string_table(self.strings_path)
+        self._string_ids = {value: i for i, value in enumerate(self.strings)}
+        self._strings_file = open(self.strings_path, "ab")
+        self._strings_file.truncate(strings_size)
+
+        self._file = open(path, "ab")
+        size = self._file.seek(0, os.SEEK_END)
+        if size == 0:
+            self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.RECORD.size))
+            self.last_timestamp = 0.0
+        else:
+            try:
+                _check_header(path)
+            except LedgerError:
+                self._file.close()
+                self._strings_file.close()
+                raise
+            whole = self.HEADER.size + (size - self.HEADER.size) // self.RECORD.size * self.RECORD.size
+            self._file.truncate(whole)
+            self.last_timestamp = 0.0
+            if whole > self.HEADER.size:
+                with open(path, "rb") as f:
+                    f.seek(whole - self.RECORD.size)
+                    self.last_timestamp = self.RECORD.unpack(f.read(self.RECORD.size))[0]
+
+        self._pending_strings: List[bytes] = []
+        self._pending_records: List[bytes] = []
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def intern(self, value: str) -> int:
+        """
+        Get the string-table id for a role or task ID, adding it if new.
+
+        Args:
+            value: String to intern
+
+        Returns:
+            String-table id
+        """
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+            self._pending_strings.append(json.dumps(value).encode("utf-8") + b"\n")
+        return string_id
+
+    def append_row(
+        self,
+        role: str,
+        task_id: str,
+        input_tokens: int,
+        output_tokens: int,
+        timestamp: float,
+        round_num: int,
+        model: str = "",
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        started_at: float = 0.0,
+        finished_at: float = 0.0,
+        level: int = 0
+    ) -> None:
+        """
+        Queue one call for writing.
+
+        Args:
+            role: Subagent role
+            task_id: Task identifier
+            input_tokens: Uncached input token count
+            output_tokens: Output token count
+            timestamp: Call time as epoch seconds
+            round_num: Round number
+            model: Model that served the call
+            cache_read_tokens: Input tokens read from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
+            started_at: Dispatch time as epoch seconds (0.0 if unknown)
+            finished_at: Completion time as epoch seconds (0.0 if unknown)
+            level: Spawn level within the round
+        """
+        timestamp = max(timestamp, self.last_timestamp)
+        self.last_timestamp = timestamp
+        self._pending_records.append(self.RECORD.pack(
+            timestamp, self.intern(role), self.intern(task_id),
+            input_tokens, output_tokens, round_num,
+            self.intern(model), cache_read_tokens, cache_write_tokens,
+            started_at, finished_at, level
+        ))
+
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.flush(sync=True)
+
+    def append(self, call: SubagentCall) -> None:
+        """
+        Queue a SubagentCall for writing.
+
+        Args:
+            call: Call to append
+        """
+        self.append_row(
+            call.role,
+            call.task_id,
+            call.input_tokens,
+            call.output_tokens,
+            datetime.fromisoformat(call.timestamp).timestamp() if call.timestamp else 0.0,
+            call.round,
+            call.model,
+            call.cache_read_tokens,
+            call.cache_write_tokens,
+            call.started_at,
+            call.finished_at,
+            call.level
+        )
+
+    def flush(self, sync: bool = False) -> None:
+        """
+        Write queued strings and records.
+
+        Args:
+            sync: Also fsync both files
+        """
+        if self._pending_strings:
+            self._strings_file.write(b"".join(self._pending_strings))
+            self._pending_strings.clear()
+        self._strings_file.flush()
+        if sync:
+            os.fsync(self._strings_file.fileno())
+
+        if self._pending_records:
+            self._file.write(b"".join(self._pending_records))
+            self._pending_records.clear()
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Flush, fsync and close the ledger."""
+        if self._file.closed:
+            return
+        self.flush(sync=True)
+        self._strings_file.close()
+        self._file.close()
+
+    def __enter__(self) -> "LedgerWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class LedgerReader:
+    """
+    Memory-mapped reader for a ledger written by LedgerWriter.
+
+    Records are decoded straight from the map: time ranges are found by
+    bisecting the timestamp column, and group-by runs over the matching
+    slice with numpy (zero-copy) when available or struct.iter_unpack
+    otherwise. Only the string table is loaded into Python objects.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a ledger for reading.
+
+        Args:
+            path: Ledger file path
+
+        Raises:
+            LedgerError: If the header is missing or invalid
+        """
+        self.path = path
+        self.strings, _ = _load_string_table(f"{path}.strings")
+        _check_header(path)
+        self.record = LedgerWriter.RECORD
+
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = (size - LedgerWriter.HEADER.size) // self.record.size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def timestamp(self, index: int) -> float:
+        """Timestamp of one record."""
+        return struct.unpack_from(
+            "<d", self._mmap, LedgerWriter.HEADER.size + index * self.record.size
+        )[0]
+
+    def __getitem__(self, index: int) -> SubagentCall:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        (
+            timestamp, role_id, task_id, input_tokens, output_tokens, round_num,
+            model_id, cache_reads, cache_writes, started_at, finished_at, level
+        ) = self.record.unpack_from(self._mmap, LedgerWriter.HEADER.size + index * self.record.size)
+        return SubagentCall(
+            role=self.strings[role_id],
+            task_id=self.strings[task_id],
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            timestamp=datetime.fromtimestamp(timestamp).isoformat(),
+            round=round_num,
+            model=self.strings[model_id],
+            cache_read_tokens=cache_reads,
+            cache_write_tokens=cache_writes,
+            started_at=started_at,
+            finished_at=finished_at,
+            level=level
+        )
+
+    def range_for(self, since: Optional[float] = None, until: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Find the records with since <= timestamp < until.
+
+        Args:
+            since: Start time in epoch seconds (default: beginning)
+            until: End time in epoch seconds (default: end)
+
+        Returns:
+            Tuple of (first index, end index)
+        """
+        timestamps = _TimestampColumn(self)
+        start = 0 if since is None else bisect_left(timestamps, since)
+        end = self.count if until is None else bisect_left(timestamps, until, lo=start)
+        return start, end
+
+    def totals_by(
+        self,
+        column: str = "role",
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        pricing: Optional[Dict[str, ModelPricing]] = None,
+        default_model: str = DEFAULT_MODEL
+    ) -> Dict[object, UsageTotals]:
+        """
+        Sum tokens, calls and (with pricing) cost per role, task or round over a time range.
+
+        Args:
+            column: One of CallLedger.GROUP_COLUMNS
+            since: Start time in epoch seconds (default: beginning)
+            until: End time in epoch seconds (default: end)
+            pricing: Rates by model (default: no cost or savings computed)
+            default_model: Model for records written without one
+
+        Returns:
+            Dictionary mapping role, task ID or round to its totals
+        """
+        field_idx = {"role": 1, "task_id": 2, "round": 5}.get(column)
+        if field_idx is None:
+            raise ValueError(f"Cannot group by {column!r}; expected one of {CallLedger.GROUP_COLUMNS}")
+
+        start, end = self.range_for(since, until)
+        if start >= end:
+            return {}
+
+        record_size = self.record.size
+        offset = LedgerWriter.HEADER.size + start * record_size
+        window = memoryview(self._mmap)[offset:offset + (end - start) * record_size]
+
+        if numpy is not None:
+            records = numpy.frombuffer(window, dtype=_NUMPY_RECORD_DTYPE)
+            grouped = _group_usage(
+                records[_NUMPY_FIELDS[field_idx]], records["role"], records["model"],
+                (records["input"], records["output"], records["cache_read"], records["cache_write"])
+            )
+            del records
+        else:
+            grouped = {}
+            for record in self.record.iter_unpack(window):
+                group = (record[field_idx], record[1], record[6])
+                totals = grouped.get(group)
+                if totals is None:
+                    totals = grouped[group] = UsageTotals()
+                totals.add(record[3], record[4], record[7], record[8])
+        window.release()
+
+        return _finish_groups(grouped, self.strings, column != "round", pricing, lambda role: default_model)
+
+    def cost_by_role(
+        self,
+        days: Optional[float] = None,
+        now: Optional[float] = None,
+        pricing: Optional[Dict[str, ModelPricing]] = None
+    ) -> Dict[str, float]:
+        """
+        Cost in USD per role, optionally over the last N days.
+
+        Each record is billed at the model it was recorded with, including
+        prompt-cache rates.
+
+        Args:
+            days: Window length in days (default: all records)
+            now: End of the window in epoch seconds (default: current time)
+            pricing: Rates by model (default: MODEL_PRICING)
+
+        Returns:
+            Dictionary mapping role to cost in USD
+        """
+        since = None
+        if days is not None:
+            since = (time.time() if now is None else now) - days * 86_400
+
+        return {
+            role: totals.cost
+            for role, totals in self.totals_by("role", since=since, pricing=pricing or MODEL_PRICING).items()
+        }
+
+    def close(self) -> None:
+        """Release the memory map and file handle."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "LedgerReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _TimestampColumn:
+    """Sequence view of a reader's timestamps, for bisect."""
+
+    def __init__(self, reader: LedgerReader):
+        self.reader = reader
+
+    def __len__(self) -> int:
+        return self.reader.count
+
+    def __getitem__(self, index: int) -> float:
+        return self.reader.timestamp(index)
+
+
+# numpy field names, indexed like the struct fields
+_NUMPY_FIELDS = (
+    "ts", "role", "task", "input", "output", "round", "model", "cache_read", "cache_write",
+    "started", "finished", "level"
+)
+
+_NUMPY_RECORD_DTYPE = numpy.dtype(
+    [("ts", "<f8")]
+    + [(name, "<u4") for name in _NUMPY_FIELDS[1:9]]
+    + [("started", "<f8"), ("finished", "<f8"), ("level", "<u4")]
+) if numpy is not None else None
+
+
+def _check_header(path: str) -> None:
+    """
+    Validate a ledger header.
+
+    Raises:
+        LedgerError: If the header is truncated, foreign or of another version
+    """
+    header = LedgerWriter.HEADER
+    with open(path, "rb") as f:
+        data = f.read(header.size)
+    if len(data) < header.size:
+        raise LedgerError(f"Truncated ledger header: {path}")
+    magic, version, record_size = header.unpack(data)
+    if magic != LedgerWriter.MAGIC or version != LedgerWriter.VERSION or record_size != LedgerWriter.RECORD.size:
+        raise LedgerError(f"Not a version {LedgerWriter.VERSION} cost ledger: {path}")
+
+
+def _load_string_table(path: str) -> Tuple[List[str], int]:
+    """
+    Read a ledger string table, ignoring a torn last line.
+
+    Returns:
+        Tuple of (strings, byte length of the complete lines)
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+
+    complete = data.rfind(b"\n") + 1
+    strings = [json.loads(line) for line in data[:complete].splitlines()]
+    return strings, complete
@@ -3,9 +3,32 @@ Cost Tracker for Loom
 Tracks token usage and costs across subagent calls with optimization recommendations.
 """
 
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 from dataclasses import dataclass, field
 from datetime import datetime
+import asyncio
+import functools
+import threading
+import time
+
+try:
+    from .token_estimation import DEFAULT_CHARS_PER_TOKEN, get_estimator, observe_usage
+except ImportError:
+    from token_estimation import DEFAULT_CHARS_PER_TOKEN, get_estimator, observe_usage
+
+try:
+    from .budget import AdmissionDecision, BudgetExceededError, PlannedSpawn, TokenBudget
+except ImportError:
+    from budget import AdmissionDecision, BudgetExceededError, PlannedSpawn, TokenBudget
+
+try:
+    from .latency import LatencyTracker
+except ImportError:
+    from latency import LatencyTracker
+
+if TYPE_CHECKING:
+    from .cost_ledger import CallLedger, LedgerWriter
+    from .recursive_spawn import RecursiveSpawnManager
 
 
 @dataclass
@@ -13,10 +36,128 @@ class SubagentCall:
     """Record of a single subagent invocation."""
     role: str
     task_id: str
-    input_tokens: int
+    input_tokens: int  # uncached input; cache reads and writes are counted separately
     output_tokens: int
     timestamp: str
     round: int
+    model: str = ""  # empty: the tracker's default model
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    started_at: float = 0.0  # epoch seconds; 0.0: latency not recorded
+    finished_at: float = 0.0
+    level: int = 0  # spawn level within the round
+
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """Per-million-token rates for one model."""
+    input: float
+    output: float
+    cache_write: float
+    cache_read: float
+
+    def cost(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> float:
+        """
+        Cost in USD of one call's (or a group's) tokens.
+
+        Returns:
+            Cost in dollars
+        """
+        return (
+            input_tokens * self.input
+            + output_tokens * self.output
+            + cache_read_tokens * self.cache_read
+            + cache_write_tokens * self.cache_write
+        ) / 1_000_000
+
+    def cache_savings(self, cache_read_tokens: int, cache_write_tokens: int) -> float:
+        """
+        Net USD saved by prompt caching versus sending the same tokens uncached.
+
+        Cache reads are cheaper than input; cache writes cost a premium over
+        input, which is subtracted.
+
+        Returns:
+            Savings in dollars (negative if writes were never re-read enough)
+        """
+        return (
+            cache_read_tokens * (self.input - self.cache_read)
+            - cache_write_tokens * (self.cache_write - self.input)
+        ) / 1_000_000
+
+
+# USD per million tokens: input, output, cache write (5-minute TTL), cache read
+MODEL_PRICING: Dict[str, ModelPricing] = {
+    "claude-sonnet-4-5": ModelPricing(input=3.00, output=15.00, cache_write=3.75, cache_read=0.30),
+    "claude-haiku-4-5": ModelPricing(input=1.00, output=5.00, cache_write=1.25, cache_read=0.10),
+    "claude-opus-4-1": ModelPricing(input=15.00, output=75.00, cache_write=18.75, cache_read=1.50),
+    "claude-opus-4-5": ModelPricing(input=5.00, output=25.00, cache_write=6.25, cache_read=0.50),
+}
+
+DEFAULT_MODEL = "claude-sonnet-4-5"
+
+
+@dataclass
+class UsageTotals:
+    """Running token, call and cost counts for one group of calls."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    calls: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost: float = 0.0
+    cache_savings: float = 0.0
+
+    def add(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        cost: float = 0.0,
+        cache_savings: float = 0.0,
+        calls: int = 1
+    ) -> None:
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cache_read_tokens += cache_read_tokens
+        self.cache_write_tokens += cache_write_tokens
+        self.cost += cost
+        self.cache_savings += cache_savings
+        self.calls += calls
+
+    def merge(self, other: "UsageTotals") -> None:
+        """Add another group's totals into this one."""
+        self.add(
+            other.input_tokens, other.output_tokens, other.cache_read_tokens,
+            other.cache_write_tokens, other.cost, other.cache_savings, other.calls
+        )
+
+    @property
+    def total_input_tokens(self) -> int:
+        """Input tokens including cache reads and writes."""
+        return self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of all input tokens served from the prompt cache."""
+        total = self.total_input_tokens
+        return self.cache_read_tokens / total if total else 0.0
+
+
+def _locked(method):
+    """Run a CostTracker method under the tracker's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 @dataclass
@@ -24,26 +165,94 @@ class CostTracker:
     """
     Tracks token usage and costs for Loom execution.
 
-    Pricing (Claude Sonnet 4.5):
-    - Input: $3.00 per 1M tokens
-    - Output: $15.00 per 1M tokens
+    Pricing: per-model rates from MODEL_PRICING, including prompt-cache
+    write and read rates. Each role is billed at the model in role_models,
+    or default_model (Claude Sonnet 4.5: $3.00 input / $15.00 output per
+    1M tokens) if unassigned.
+
+    Storage: calls is a list of SubagentCall by default. With
+    columnar=True it is a CallLedger (see cost_ledger.py), which keeps
+    a million calls in tens of MB. Use iter_calls() to read either.
+    With ledger_path set, every call is also appended to a persistent
+    on-disk ledger (LedgerWriter) for cross-run queries (LedgerReader);
+    call close() at the end of the run to flush it.
+
+    Budgets: set budget to a TokenBudget to check each level with admit()
+    before dispatch and, if the budget is hard, raise BudgetExceededError
+    when a recorded call passes a ceiling.
+
+    Latency: pass started_at (and finished_at) to track_subagent_call() to
+    get per-role p50/p95/p99, per-level barrier wait and, with depends_on,
+    the critical path (see latency.py).
+
+    Concurrency: recording and reading are safe from several threads; a
+    re-entrant lock guards the calls and aggregates. With concurrent=True,
+    track_subagent_call() instead appends to a per-thread buffer without
+    taking the lock, and buffers are merged (in timestamp order) into
+    calls on the next read or flush(). Read through the tracker's methods,
+    or call flush() before touching calls directly. A hard budget needs
+    up-to-date totals, so it turns buffering off. For asyncio drivers, see
+    AsyncCostRecorder.
     """
 
-    # Pricing constants (per million tokens)
-    INPUT_PRICE_PER_M = 3.00
-    OUTPUT_PRICE_PER_M = 15.00
+    # Default-model rates (per million tokens), used for filtering savings
+    INPUT_PRICE_PER_M = MODEL_PRICING[DEFAULT_MODEL].input
+    OUTPUT_PRICE_PER_M = MODEL_PRICING[DEFAULT_MODEL].output
 
-    # Token estimation multiplier (chars to tokens)
-    CHAR_TO_TOKEN_MULTIPLIER = 1.3
+    # Token estimation multiplier (chars to tokens) of the default estimator
+    CHAR_TO_TOKEN_MULTIPLIER = DEFAULT_CHARS_PER_TOKEN
 
-    calls: List[SubagentCall] = field(default_factory=list)
+    calls: Union[List[SubagentCall], "CallLedger"] = field(default_factory=list)
     filtering_savings: Dict[str, int] = field(default_factory=dict)
+    columnar: bool = False
+    ledger_path: Optional[str] = None
+    budget: Optional[TokenBudget] = None
+    default_model: str = DEFAULT_MODEL
+    role_models: Dict[str, str] = field(default_factory=dict)
+    pricing: Dict[str, ModelPricing] = field(default_factory=lambda: dict(MODEL_PRICING))
+    concurrent: bool = False
+
+    # Running aggregates over calls[:_aggregated_calls], kept by _record()
+    _totals: UsageTotals = field(default_factory=UsageTotals, init=False, repr=False)
+    _role_totals: Dict[str, UsageTotals] = field(default_factory=dict, init=False, repr=False)
+    _round_totals: Dict[int, UsageTotals] = field(default_factory=dict, init=False, repr=False)
+    # Uncached input tokens per role and the model that served them
+    _role_models: Dict[str, Dict[str, int]] = field(default_factory=dict, init=False, repr=False)
+    _aggregated_calls: int = field(default=0, init=False, repr=False)
+    _ledger: Optional["LedgerWriter"] = field(default=None, init=False, repr=False)
+    _latency: LatencyTracker = field(default_factory=LatencyTracker, init=False, repr=False)
+
+    # Concurrency: lock for calls and aggregates; per-thread row buffers (concurrent=True)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    _local: threading.local = field(default_factory=threading.local, init=False, repr=False, compare=False)
+    _buffers: List[Tuple[threading.Thread, list]] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        try:
+            from .cost_ledger import CallLedger, LedgerWriter
+        except ImportError:
+            from cost_ledger import CallLedger, LedgerWriter
+
+        if self.default_model not in self.pricing:
+            raise ValueError(f"No pricing for default model {self.default_model!r}")
+        for role, model in self.role_models.items():
+            if model not in self.pricing:
+                raise ValueError(f"No pricing for model {model!r} assigned to role {role!r}")
+
+        if self.ledger_path is not None:
+            self._ledger = LedgerWriter(self.ledger_path)
+
+        if self.columnar and isinstance(self.calls, list):
+            ledger = CallLedger()
+            for call in self.calls:
+                ledger.append(call)
+            self.calls = ledger
 
     @staticmethod
     def estimate_tokens(text: str) -> int:
         """
-        Estimate tokens from character count.
-        Uses conservative 1.3 multiplier for safety.
+        Estimate tokens with the active estimator (see token_estimation.py).
+        The default uses a conservative 1.3 chars-per-token multiplier.
 
         Args:
             text: Input text to estimate
@@ -51,7 +260,7 @@ class CostTracker:
         Returns:
             Estimated token count
         """
-        return int(len(text) / CostTracker.CHAR_TO_TOKEN_MULTIPLIER)
+        return get_estimator().count(text)
 
     def track_subagent_call(
         self,
@@ -59,32 +268,506 @@ class CostTracker:
         task_id: str,
         input_text: str,
         output_text: str,
-        round: int
+        round: int,
+        actual_tokens: Optional[int] = None,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        model: Optional[str] = None,
+        started_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+        level: int = 0,
+        depends_on: Optional[List[str]] = None
     ) -> None:
         """
         Track a subagent invocation.
 
+        When the orchestrator has the real usage total for the call, pass it
+        as actual_tokens: it is split between input and output in proportion
+        to their estimates, and fed to the active estimator so estimators that
+        learn from usage (ContentClassEstimator) refit their ratios.
+
         Args:
             role: Subagent role (researcher, coder, etc.)
             task_id: Task identifier
             input_text: Input prompt text
             output_text: Generated output text
             round: Round number
+            actual_tokens: total_tokens reported for the call (optional)
+            cache_read_tokens: Input tokens served from the prompt cache
+                (cache_read_input_tokens in the API usage)
+            cache_write_tokens: Input tokens written to the prompt cache
+                (cache_creation_input_tokens in the API usage)
+            model: Model that served the call (default: the role's model)
+            started_at: Dispatch time as epoch seconds (time.time()); enables
+                latency tracking for the call
+            finished_at: Completion time as epoch seconds (default: now)
+            level: Spawn level within the round (the compiler's task level)
+            depends_on: Task IDs this task consumes, for the critical path
+
+        Cache tokens are billed at cache rates and are not part of
+        input_text's estimate; if they are known, pass the uncached
+        remainder as input_text.
         """
         input_tokens = self.estimate_tokens(input_text)
         output_tokens = self.estimate_tokens(output_text)
 
-        call = SubagentCall(
-            role=role,
-            task_id=task_id,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            timestamp=datetime.now().isoformat(),
-            round=round
+        if actual_tokens is not None:
+            observe_usage(input_text + output_text, actual_tokens)
+            estimated = input_tokens + output_tokens
+            if estimated:
+                input_tokens = int(actual_tokens * input_tokens / estimated)
+                output_tokens = actual_tokens - input_tokens
+            else:
+                input_tokens, output_tokens = actual_tokens, 0
+
+        if model is not None and model not in self.pricing:
+            raise ValueError(f"No pricing for model {model!r}")
+
+        if depends_on:
+            with self._lock:
+                self._latency.depends_on(task_id, depends_on)
+
+        if started_at is None:
+            started_at = finished_at = 0.0
+        elif finished_at is None:
+            finished_at = time.time()
+
+        row = (
+            role, task_id, input_tokens, output_tokens, round,
+            model or "", cache_read_tokens, cache_write_tokens,
+            started_at, finished_at, level, time.time()
         )
+        if self.concurrent and not (self.budget is not None and self.budget.hard):
+            self._thread_buffer().append(row)
+            return
+
+        with self._lock:
+            self._record(*row)
+
+    def _thread_buffer(self) -> list:
+        """The calling thread's row buffer, registered on first use."""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = []
+            with self._lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        return buffer
+
+    def _drain_buffers(self) -> None:
+        """
+        Record rows buffered by concurrent=True threads, in timestamp order.
+
+        Caller holds the lock. Owning threads keep appending while this
+        runs; only the rows present when each buffer is read are taken.
+        Buffers of finished threads are dropped once empty.
+
+        Raises:
+            BudgetExceededError: If a drained call passed a hard budget set
+                after it was buffered (all rows are still recorded)
+        """
+        if not self._buffers:
+            return
+
+        rows = []
+        live = []
+        for thread, buffer in self._buffers:
+            taken = len(buffer)
+            if taken:
+                rows.extend(buffer[:taken])
+                del buffer[:taken]
+            if buffer or thread.is_alive():
+                live.append((thread, buffer))
+        self._buffers = live
+
+        rows.sort(key=lambda row: row[-1])
+        violation = None
+        for row in rows:
+            try:
+                self._record(*row)
+            except BudgetExceededError as error:
+                violation = violation or error
+        if violation is not None:
+            raise violation
+
+    @_locked
+    def flush(self) -> None:
+        """Merge rows buffered by recording threads into calls."""
+        self._drain_buffers()
+        self._sync_aggregates(drain=False)
+
+    def _record(
+        self,
+        role: str,
+        task_id: str,
+        input_tokens: int,
+        output_tokens: int,
+        round_num: int,
+        model: str = "",
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        started_at: float = 0.0,
+        finished_at: float = 0.0,
+        level: int = 0,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Append a call and fold it into the running aggregates. Caller holds
+        the lock.
+
+        Args:
+            role: Subagent role
+            task_id: Task identifier
+            input_tokens: Uncached input token count
+            output_tokens: Output token count
+            round_num: Round number
+            model: Model that served the call ("" for the role's model)
+            cache_read_tokens: Input tokens read from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
+            started_at: Dispatch time as epoch seconds (0.0 if unknown)
+            finished_at: Completion time as epoch seconds (0.0 if unknown)
+            level: Spawn level within the round
+            timestamp: Record time as epoch seconds (default: now)
+        """
+        self._sync_aggregates(drain=False)
+        now = time.time() if timestamp is None else timestamp
+        if self.columnar:
+            self.calls.append_row(
+                role, task_id, input_tokens, output_tokens, now, round_num,
+                model, cache_read_tokens, cache_write_tokens, started_at, finished_at, level
+            )
+        else:
+            self.calls.append(SubagentCall(
+                role=role,
+                task_id=task_id,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                timestamp=datetime.fromtimestamp(now).isoformat(),
+                round=round_num,
+                model=model,
+                cache_read_tokens=cache_read_tokens,
+                cache_write_tokens=cache_write_tokens,
+                started_at=started_at,
+                finished_at=finished_at,
+                level=level
+            ))
+        if self._ledger is not None:
+            self._ledger.append_row(
+                role, task_id, input_tokens, output_tokens, now, round_num,
+                model or self.model_for(role), cache_read_tokens, cache_write_tokens,
+                started_at, finished_at, level
+            )
+
+        self._accumulate(
+            role, round_num, model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens,
+            task_id, started_at, finished_at, level
+        )
+
+        # The call already happened, so it stays recorded even if it breaks the budget
+        if self.budget is not None and self.budget.hard:
+            violations = self.budget.violations(self, role, round_num)
+            if violations:
+                raise violations[0]
+
+    def _accumulate(
+        self,
+        role: str,
+        round_num: int,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        task_id: str = "",
+        started_at: float = 0.0,
+        finished_at: float = 0.0,
+        level: int = 0
+    ) -> None:
+        model = model or self.model_for(role)
+        pricing = self.pricing[model]
+        usage = (
+            input_tokens,
+            output_tokens,
+            cache_read_tokens,
+            cache_write_tokens,
+            pricing.cost(input_tokens, output_tokens, cache_read_tokens, cache_write_tokens),
+            pricing.cache_savings(cache_read_tokens, cache_write_tokens)
+        )
+
+        self._totals.add(*usage)
+
+        role_totals = self._role_totals.get(role)
+        if role_totals is None:
+            role_totals = self._role_totals[role] = UsageTotals()
+        role_totals.add(*usage)
+        role_models = self._role_models.setdefault(role, {})
+        role_models[model] = role_models.get(model, 0) + input_tokens
+
+        round_totals = self._round_totals.get(round_num)
+        if round_totals is None:
+            round_totals = self._round_totals[round_num] = UsageTotals()
+        round_totals.add(*usage)
+
+        if started_at:
+            self._latency.record(role, task_id, round_num, level, started_at, finished_at)
+
+        self._aggregated_calls += 1
+
+    def model_for(self, role: str) -> str:
+        """
+        Model a role's calls are billed at unless a call names its own.
+
+        Args:
+            role: Subagent role
+
+        Returns:
+            Model name (a key of pricing)
+        """
+        return self.role_models.get(role, self.default_model)
+
+    @_locked
+    def close(self) -> None:
+        """Merge buffered rows, then flush and close the persistent ledger, if any."""
+        self.flush()
+        if self._ledger is not None:
+            self._ledger.close()
+            self._ledger = None
+
+    def iter_calls(self) -> Iterator[SubagentCall]:
+        """
+        Iterate recorded calls in order, whatever the storage mode.
+
+        Returns:
+            Iterator of SubagentCall
+        """
+        self.flush()
+        return iter(self.calls)
+
+    @_locked
+    def _sync_aggregates(self, drain: bool = True) -> None:
+        """
+        Catch the aggregates up with calls appended or removed directly.
+
+        Calls added through track_subagent_call() are already counted, so
+        this is a length check. Editing a recorded call in place is not
+        detected.
+
+        Args:
+            drain: Also merge rows buffered by recording threads
+        """
+        if drain:
+            self._drain_buffers()
+
+        calls = self.calls
+        if len(calls) == self._aggregated_calls:
+            return
+
+        if len(calls) < self._aggregated_calls:
+            self._totals = UsageTotals()
+            self._role_totals = {}
+            self._round_totals = {}
+            self._role_models = {}
+            self._latency.reset_calls()
+            self._aggregated_calls = 0
+
+        if self.columnar:
+            if self._aggregated_calls == 0:
+                # Fresh or loaded ledger: group the columns in one go
+                self._role_totals = calls.totals_by("role", self.pricing, self.model_for)
+                self._round_totals = calls.totals_by("round", self.pricing, self.model_for)
+                self._totals = UsageTotals()
+                for totals in self._role_totals.values():
+                    self._totals.merge(totals)
+                self._role_models = {}
+                for role_id, model_id, input_tokens in zip(calls.roles, calls.models, calls.input_tokens):
+                    role = calls.strings[role_id]
+                    model = calls.strings[model_id] or self.model_for(role)
+                    role_models = self._role_models.setdefault(role, {})
+                    role_models[model] = role_models.get(model, 0) + input_tokens
+                for index in range(len(calls)):
+                    if calls.started[index]:
+                        self._latency.record(
+                            calls.strings[calls.roles[index]], calls.strings[calls.task_ids[index]],
+                            calls.rounds[index], calls.levels[index],
+                            calls.started[index], calls.finished[index]
+                        )
+                self._aggregated_calls = len(calls)
+                return
+            rows = calls.rows(self._aggregated_calls)
+        else:
+            rows = (
+                (
+                    call.role, call.round, call.model, call.input_tokens, call.output_tokens,
+                    call.cache_read_tokens, call.cache_write_tokens,
+                    call.task_id, call.started_at, call.finished_at, call.level
+                )
+                for call in calls[self._aggregated_calls:]
+            )
+
+        for row in rows:
+            self._accumulate(*row)
 
-        self.calls.append(call)
+    def price(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        role: Optional[str] = None,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> float:
+        """
+        Cost in USD of the given token counts.
+
+        Args:
+            input_tokens: Uncached input token count
+            output_tokens: Output token count
+            role: Role the tokens are billed to (default model if None)
+            cache_read_tokens: Input tokens read from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
+
+        Returns:
+            Cost in dollars
+        """
+        model = self.default_model if role is None else self.model_for(role)
+        return self.pricing[model].cost(input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+
+    @_locked
+    def get_usage_totals(
+        self,
+        scope: str,
+        role: Optional[str] = None,
+        round_num: Optional[int] = None
+    ) -> Optional[UsageTotals]:
+        """
+        Running totals for the whole run, one round, or one role.
+
+        Args:
+            scope: "run", "round" or "role"
+            role: Role, for scope "role"
+            round_num: Round number, for scope "round"
+
+        Returns:
+            UsageTotals, or None if nothing was recorded in that scope
+        """
+        self._sync_aggregates()
+        if scope == "run":
+            return self._totals
+        if scope == "round":
+            return self._round_totals.get(round_num)
+        if scope == "role":
+            return self._role_totals.get(role)
+        raise ValueError(f"Unknown budget scope: {scope!r}")
+
+    @_locked
+    def mean_output_tokens(self, role: str) -> Optional[int]:
+        """
+        Average output tokens per call for a role so far.
+
+        Args:
+            role: Subagent role
+
+        Returns:
+            Mean output tokens, or None if the role has no calls
+        """
+        totals = self.get_usage_totals("role", role=role)
+        if not totals or not totals.calls:
+            return None
+        return totals.output_tokens // totals.calls
+
+    @_locked
+    def admit(self, planned: List[PlannedSpawn], round_num: int) -> AdmissionDecision:
+        """
+        Check the next level of spawns against the budget before dispatch.
+
+        Args:
+            planned: Spawns about to be dispatched, most important first
+            round_num: Round they belong to
+
+        Returns:
+            AdmissionDecision (everything admitted when no budget is set)
+        """
+        if self.budget is not None:
+            return self.budget.admit(self, planned, round_num)
+
+        decision = AdmissionDecision(admitted=list(planned))
+        for spawn in planned:
+            output_tokens = spawn.output_tokens
+            if output_tokens is None:
+                output_tokens = self.mean_output_tokens(spawn.role) or 0
+            decision.predicted_tokens += spawn.input_tokens + output_tokens
+            decision.predicted_cost += self.price(spawn.input_tokens, output_tokens, spawn.role)
+        return decision
+
+    @_locked
+    def get_latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-role latency percentiles for calls tracked with started_at.
+
+        Returns:
+            Dictionary mapping role to {"p50", "p95", "p99" (seconds), "count"}
+        """
+        self._sync_aggregates()
+        return self._latency.percentiles_by_role()
+
+    @_locked
+    def get_level_barriers(self) -> Dict[Tuple[int, int], Dict[str, float]]:
+        """
+        Timing of each spawn level.
+
+        Returns:
+            Dictionary mapping (round, level) to calls, wall_seconds,
+            barrier_wait_seconds (finished calls waiting for the level's
+            slowest), utilization and gap_before_seconds (time from the
+            previous level's last finish to this level's first start)
+        """
+        self._sync_aggregates()
+        gaps = self._latency.level_gaps()
+        return {
+            key: {
+                "calls": barrier.calls,
+                "wall_seconds": barrier.wall_seconds,
+                "barrier_wait_seconds": barrier.barrier_wait_seconds,
+                "utilization": barrier.utilization,
+                "gap_before_seconds": gaps.get(key, 0.0),
+            }
+            for key, barrier in sorted(self._latency.levels.items())
+        }
+
+    @_locked
+    def get_critical_path(self) -> Tuple[List[str], float, float]:
+        """
+        End-to-end critical path over the task DAG (depends_on).
 
+        Returns:
+            Tuple of (task_ids along the path, its duration in seconds, and
+            the barrier path: the sum of each level's slowest call, which
+            is what per-level barriers force)
+        """
+        self._sync_aggregates()
+        path, seconds = self._latency.critical_path()
+        return path, seconds, self._latency.barrier_path_seconds()
+
+    @_locked
+    def to_chrome_trace(self, path: str, spawn_manager: Optional["RecursiveSpawnManager"] = None) -> int:
+        """
+        Write the run timeline as Chrome trace-event JSON (chrome://tracing,
+        ui.perfetto.dev). Calls are spans on per-level tracks, with
+        validator and strategist phases on their own tracks.
+
+        Args:
+            path: Output path
+            spawn_manager: Spawn tree of the same run, added as its own tracks
+
+        Returns:
+            Number of trace events written
+        """
+        try:
+            from .trace_export import write_chrome_trace
+        except ImportError:
+            from trace_export import write_chrome_trace
+
+        return write_chrome_trace(path, tracker=self, spawn_manager=spawn_manager)
+
+    @_locked
     def track_filtering_savings(self, version: int, tokens_removed: int) -> None:
         """
         Track tokens saved through filtering.
@@ -95,17 +778,19 @@ class CostTracker:
         """
         self.filtering_savings[f"v{version}"] = tokens_removed
 
+    @_locked
     def get_total_tokens(self) -> Tuple[int, int]:
         """
-        Get total input and output tokens across all calls.
+        Get total input (including prompt-cache reads and writes) and output
+        tokens across all calls.
 
         Returns:
             Tuple of (total_input_tokens, total_output_tokens)
         """
-        total_input = sum(call.input_tokens for call in self.calls)
-        total_output = sum(call.output_tokens for call in self.calls)
-        return total_input, total_output
+        self._sync_aggregates()
+        return self._totals.total_input_tokens, self._totals.output_tokens
 
+    @_locked
     def get_total_cost(self) -> float:
         """
         Calculate total cost in USD.
@@ -113,33 +798,57 @@ class CostTracker:
         Returns:
             Total cost in dollars
         """
-        total_input, total_output = self.get_total_tokens()
-
-        input_cost = (total_input / 1_000_000) * self.INPUT_PRICE_PER_M
-        output_cost = (total_output / 1_000_000) * self.OUTPUT_PRICE_PER_M
-
-        return input_cost + output_cost
+        self._sync_aggregates()
+        return self._totals.cost
 
-    def get_cost_by_role(self) -> Dict[str, float]:
+    @_locked
+    def get_cost_by_role(self, detailed: bool = False) -> Dict[str, Union[float, Dict[str, Any]]]:
         """
         Break down costs by subagent role.
 
+        Args:
+            detailed: Return a dict per role with model and prompt-caching
+                figures instead of just the cost
+
         Returns:
-            Dictionary mapping role to cost in USD
+            Dictionary mapping role to cost in USD, or (detailed) to a dict
+            with model (the model the role's calls ran on, or "mixed"),
+            models, cost, cache_savings, cache_hit_rate, cache_read_tokens
+            and cache_write_tokens
         """
-        role_costs = {}
+        self._sync_aggregates()
+        if not detailed:
+            return {
+                role: totals.cost
+                for role, totals in self._role_totals.items()
+            }
 
-        for call in self.calls:
-            input_cost = (call.input_tokens / 1_000_000) * self.INPUT_PRICE_PER_M
-            output_cost = (call.output_tokens / 1_000_000) * self.OUTPUT_PRICE_PER_M
-            total_cost = input_cost + output_cost
+        report = {}
+        for role, totals in self._role_totals.items():
+            models = sorted(self._role_models.get(role, ()))
+            report[role] = {
+                "model": models[0] if len(models) == 1 else "mixed",
+                "models": models,
+                "cost": totals.cost,
+                "cache_savings": totals.cache_savings,
+                "cache_hit_rate": totals.cache_hit_rate,
+                "cache_read_tokens": totals.cache_read_tokens,
+                "cache_write_tokens": totals.cache_write_tokens,
+            }
+        return report
 
-            if call.role not in role_costs:
-                role_costs[call.role] = 0.0
-            role_costs[call.role] += total_cost
+    @_locked
+    def get_cache_savings(self) -> Tuple[float, float]:
+        """
+        Prompt-caching impact across the run.
 
-        return role_costs
+        Returns:
+            Tuple of (net USD saved by caching, share of input tokens read from cache)
+        """
+        self._sync_aggregates()
+        return self._totals.cache_savings, self._totals.cache_hit_rate
 
+    @_locked
     def get_cost_by_round(self) -> Dict[int, float]:
         """
         Break down costs by round.
@@ -147,19 +856,13 @@ class CostTracker:
         Returns:
             Dictionary mapping round number to cost in USD
         """
-        round_costs = {}
-
-        for call in self.calls:
-            input_cost = (call.input_tokens / 1_000_000) * self.INPUT_PRICE_PER_M
-            output_cost = (call.output_tokens / 1_000_000) * self.OUTPUT_PRICE_PER_M
-            total_cost = input_cost + output_cost
-
-            if call.round not in round_costs:
-                round_costs[call.round] = 0.0
-            round_costs[call.round] += total_cost
-
-        return round_costs
+        self._sync_aggregates()
+        return {
+            round_num: totals.cost
+            for round_num, totals in self._round_totals.items()
+        }
 
+    @_locked
     def get_filtering_impact(self) -> Tuple[int, float]:
         """
         Calculate total impact of filtering.
@@ -174,6 +877,7 @@ class CostTracker:
 
         return total_saved, cost_saved
 
+    @_locked
     def get_optimization_recommendations(self) -> List[str]:
         """
         Generate optimization recommendations based on usage patterns.
@@ -197,6 +901,28 @@ class CostTracker:
                     f"Consider optimizing {max_role_name} prompts or reducing calls."
                 )
 
+        # Roles re-sending the same instructions without prompt caching. Only
+        # meaningful once cache usage is reported: calls tracked from text
+        # alone carry no cache tokens and would all look uncached.
+        uncached = []
+        cache_reported = self._totals.cache_read_tokens or self._totals.cache_write_tokens
+        for role, totals in sorted(self._role_totals.items(), key=lambda x: x[1].input_tokens, reverse=True):
+            if cache_reported and totals.calls >= 3 and totals.cache_hit_rate < 0.10:
+                # Priced at the models the role's calls actually ran on
+                input_cost = sum(
+                    input_tokens * self.pricing[model].input / 1_000_000
+                    for model, input_tokens in self._role_models.get(role, {}).items()
+                )
+                uncached.append(f"{role} (${input_cost:.4f} uncached input)")
+        if uncached:
+            default_pricing = self.pricing[self.default_model]
+            recommendations.append(
+                "Little prompt-cache reuse for: " + ", ".join(uncached) + ". "
+                "A stable shared prefix (security rules, role instructions) would bill "
+                f"repeated input at {default_pricing.cache_read / default_pricing.input * 100:.0f}% "
+                "of the input price."
+            )
+
         # Analyze filtering effectiveness
         tokens_saved, cost_saved = self.get_filtering_impact()
         if tokens_saved > 0:
@@ -246,6 +972,7 @@ class CostTracker:
 
         return recommendations if recommendations else ["No specific optimizations recommended."]
 
+    @_locked
     def to_markdown(self) -> str:
         """
         Generate a markdown report of costs and recommendations.
@@ -273,6 +1000,20 @@ class CostTracker:
             "",
         ]
 
+        if self.budget is not None:
+            lines.extend(["## Budget", ""])
+            if self.budget.max_run_tokens is not None:
+                lines.append(
+                    f"- **Run Tokens:** {total_input + total_output:,} / {self.budget.max_run_tokens:,}"
+                )
+            if self.budget.max_run_cost is not None:
+                lines.append(f"- **Run Cost:** ${total_cost:.4f} / ${self.budget.max_run_cost:.4f}")
+            if self.budget.max_round_cost is not None:
+                lines.append(f"- **Per-Round Cost Ceiling:** ${self.budget.max_round_cost:.4f}")
+            for role, limit in sorted(self.budget.max_role_cost.items()):
+                lines.append(f"- **{role} Cost:** ${role_costs.get(role, 0.0):.4f} / ${limit:.4f}")
+            lines.append("")
+
         if tokens_saved > 0:
             lines.extend([
                 "## Filtering Impact",
@@ -288,9 +1029,32 @@ class CostTracker:
                 "## Cost by Role",
                 "",
             ])
+            role_details = self.get_cost_by_role(detailed=True)
             for role, cost in sorted(role_costs.items(), key=lambda x: x[1], reverse=True):
                 pct = (cost / total_cost * 100) if total_cost > 0 else 0
-                lines.append(f"- **{role}:** ${cost:.4f} ({pct:.1f}%)")
+                details = role_details[role]
+                line = f"- **{role}:** ${cost:.4f} ({pct:.1f}%, {details['model']})"
+                if details["cache_read_tokens"] or details["cache_write_tokens"]:
+                    line += f" — caching saved {_usd(details['cache_savings'])}"
+                lines.append(line)
+            lines.append("")
+
+            cache_saved, cache_hit_rate = self.get_cache_savings()
+            lines.extend([
+                "## Prompt Caching",
+                "",
+                f"- **Net Savings:** {_usd(cache_saved)}",
+                f"- **Input Served from Cache:** {cache_hit_rate * 100:.1f}%",
+                "",
+                "| Role | Model | Cache Hit Rate | Cache Reads | Cache Writes | Saved |",
+                "|------|-------|----------------|-------------|--------------|-------|",
+            ])
+            for role, details in sorted(role_details.items(), key=lambda x: x[1]["cache_savings"], reverse=True):
+                lines.append(
+                    f"| {role} | {details['model']} | {details['cache_hit_rate'] * 100:.1f}% | "
+                    f"{details['cache_read_tokens']:,} | {details['cache_write_tokens']:,} | "
+                    f"{_usd(details['cache_savings'])} |"
+                )
             lines.append("")
 
         if round_costs:
@@ -304,6 +1068,10 @@ class CostTracker:
                 lines.append(f"- **Round {round_num}:** ${cost:.4f} ({pct:.1f}%)")
             lines.append("")
 
+        latency = self._latency.to_markdown()
+        if latency:
+            lines.append(latency)
+
         recommendations = self.get_optimization_recommendations()
         if recommendations:
             lines.extend([
@@ -315,3 +1083,120 @@ class CostTracker:
             lines.append("")
 
         return "\n".join(lines)
+
+
+class AsyncCostRecorder:
+    """
+    Queue-fed recorder for asyncio drivers.
+
+    Coroutines enqueue calls with record() and return immediately; a
+    single consumer task hands them to the tracker in batches. Each batch
+    (token estimation, aggregation, ledger writes) runs in the loop's
+    default executor, so the event loop never blocks on the tracker lock
+    while other threads record. Use as an async context manager, or call
+    start() and close():
+
+        async with AsyncCostRecorder(tracker) as recorder:
+            await asyncio.gather(*(run_task(recorder, task) for task in level))
+
+    An error raised while recording (e.g. BudgetExceededError from a hard
+    budget) is re-raised by the next record() or by close().
+    """
+
+    _STOP = object()
+
+    def __init__(self, tracker: CostTracker, maxsize: int = 0, batch_size: int = 256):
+        """
+        Initialize the recorder.
+
+        Args:
+            tracker: Tracker to record into
+            maxsize: Queue bound; record() waits when full (0: unbounded)
+            batch_size: Calls recorded per batch, under one tracker lock hold
+        """
+        self.tracker = tracker
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def start(self) -> "AsyncCostRecorder":
+        """Create the queue and start the consumer task on the running loop."""
+        self._queue = asyncio.Queue(self.maxsize)
+        self._consumer = asyncio.get_running_loop().create_task(self._consume())
+        return self
+
+    async def record(
+        self,
+        role: str,
+        task_id: str,
+        input_text: str,
+        output_text: str,
+        round: int,
+        **kwargs: Any
+    ) -> None:
+        """
+        Enqueue a call (same arguments as CostTracker.track_subagent_call).
+
+        If started_at is given without finished_at, finished_at is stamped
+        now rather than when the call is dequeued.
+        """
+        if self._error is not None:
+            raise self._error
+        if kwargs.get("started_at") is not None and kwargs.get("finished_at") is None:
+            kwargs["finished_at"] = time.time()
+        await self._queue.put((role, task_id, input_text, output_text, round, kwargs))
+
+    async def _consume(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            stopping = await loop.run_in_executor(None, self._record_batch, batch)
+            for _ in batch:
+                queue.task_done()
+
+    def _record_batch(self, batch: List[Any]) -> bool:
+        """Record one batch under a single lock hold; True if it held the stop marker."""
+        stopping = False
+        with self.tracker._lock:
+            for item in batch:
+                if item is self._STOP:
+                    stopping = True
+                    continue
+                role, task_id, input_text, output_text, round_num, kwargs = item
+                try:
+                    self.tracker.track_subagent_call(
+                        role, task_id, input_text, output_text, round_num, **kwargs
+                    )
+                except Exception as error:
+                    self._error = self._error or error
+        return stopping
+
+    async def close(self) -> None:
+        """Record everything queued so far, stop the consumer and re-raise any recording error."""
+        if self._consumer is not None:
+            await self._queue.put(self._STOP)
+            await self._consumer
+            self._consumer = None
+        if self._error is not None:
+            raise self._error
+
+    async def __aenter__(self) -> "AsyncCostRecorder":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+def _usd(amount: float) -> str:
+    """Format a dollar amount that may be negative (e.g. -$0.0050)."""
+    return f"-${-amount:.4f}" if amount < 0 else f"${amount:.4f}"
@@ -0,0 +1,373 @@
+"""
+Latency Tracking for Loom
+Per-role latency percentiles, per-level barrier wait and critical-path analysis.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+import math
+
+
+# Orchestration roles: timed per role, but not part of any spawn level's barrier
+PHASE_ROLES = ("compiler", "validator", "strategist", "reporter")
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram.
+
+    Bucket i holds durations in [min_seconds * growth**i, min_seconds *
+    growth**(i+1)), so quantiles carry a relative error of at most half a
+    bucket (about 5% at the default growth) whatever the range. Memory is
+    one counter per occupied bucket, a few hundred at most.
+    """
+
+    def __init__(self, growth: float = 1.1, min_seconds: float = 0.001):
+        """
+        Initialize the histogram.
+
+        Args:
+            growth: Ratio between consecutive bucket bounds
+            min_seconds: Upper bound of the first bucket
+        """
+        self.growth = growth
+        self.min_seconds = min_seconds
+        self._log_growth = math.log(growth)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        Add one duration.
+
+        Args:
+            seconds: Duration in seconds
+        """
+        seconds = max(seconds, 0.0)
+        if seconds < self.min_seconds:
+            bucket = -1
+        else:
+            bucket = int(math.log(seconds / self.min_seconds) / self._log_growth)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile in [0, 1] (0.95 for p95)
+
+        Returns:
+            Geometric midpoint of the bucket holding the quantile, clamped
+            to the recorded range, in seconds
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                if bucket < 0:
+                    estimate = self.min_seconds / 2
+                else:
+                    estimate = self.min_seconds * self.growth ** bucket * math.sqrt(self.growth)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class LevelBarrier:
+    """
+    Timing of one spawn level, whose calls all wait for the slowest.
+
+    Barrier wait is the time calls spend finished but blocked on the
+    level's last call: the sum over calls of (last finish - own finish).
+    """
+    round: int
+    level: int
+    calls: int = 0
+    first_start: float = math.inf
+    last_start: float = -math.inf
+    last_finish: float = -math.inf
+    finish_sum: float = 0.0
+    busy_seconds: float = 0.0
+    max_duration: float = 0.0
+
+    def add(self, started_at: float, finished_at: float) -> None:
+        self.calls += 1
+        self.max_duration = max(self.max_duration, finished_at - started_at)
+        self.first_start = min(self.first_start, started_at)
+        self.last_start = max(self.last_start, started_at)
+        self.last_finish = max(self.last_finish, finished_at)
+        self.finish_sum += finished_at
+        self.busy_seconds += finished_at - started_at
+
+    @property
+    def wall_seconds(self) -> float:
+        """First start to last finish."""
+        return self.last_finish - self.first_start if self.calls else 0.0
+
+    @property
+    def barrier_wait_seconds(self) -> float:
+        """Total time finished calls sat waiting for the level's slowest call."""
+        return self.calls * self.last_finish - self.finish_sum if self.calls else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Busy time over calls x wall time (1.0: no stragglers)."""
+        capacity = self.calls * self.wall_seconds
+        return self.busy_seconds / capacity if capacity > 0 else 1.0
+
+
+@dataclass
+class LatencyTracker:
+    """
+    Running latency statistics for a Loom run.
+
+    Everything is updated per call in O(1): one histogram per role, one
+    LevelBarrier per (round, level) for work roles (PHASE_ROLES run
+    between levels and are left out) and one span per task (first start to
+    last finish over the task's calls). The critical path over declared
+    task dependencies is computed on demand.
+    """
+    role_histograms: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    levels: Dict[Tuple[int, int], LevelBarrier] = field(default_factory=dict)
+    spans: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)
+
+    def record(
+        self,
+        role: str,
+        task_id: str,
+        round_num: int,
+        level: int,
+        started_at: float,
+        finished_at: float
+    ) -> None:
+        """
+        Record one call's wall-clock span.
+
+        Args:
+            role: Subagent role
+            task_id: Task identifier
+            round_num: Round number
+            level: Spawn level within the round
+            started_at: Dispatch time (epoch seconds)
+            finished_at: Completion time (epoch seconds)
+        """
+        histogram = self.role_histograms.get(role)
+        if histogram is None:
+            histogram = self.role_histograms[role] = LatencyHistogram()
+        histogram.record(finished_at - started_at)
+
+        if role not in PHASE_ROLES:
+            key = (round_num, level)
+            barrier = self.levels.get(key)
+            if barrier is None:
+                barrier = self.levels[key] = LevelBarrier(round=round_num, level=level)
+            barrier.add(started_at, finished_at)
+
+        span = self.spans.get(task_id)
+        if span is not None:
+            started_at, finished_at = min(span[0], started_at), max(span[1], finished_at)
+        self.spans[task_id] = (started_at, finished_at)
+
+    def depends_on(self, task_id: str, dependencies: Iterable[str]) -> None:
+        """
+        Declare the tasks a task consumes (the spawn prompt's depends_on).
+
+        Args:
+            task_id: Dependent task
+            dependencies: Tasks it depends on
+        """
+        known = self.dependencies.setdefault(task_id, [])
+        known.extend(dep for dep in dependencies if dep not in known)
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Critical path over the recorded spans and declared dependencies.
+
+        Returns:
+            Tuple of (task_ids along the path, summed duration in seconds)
+        """
+        return critical_path(self.spans, self.dependencies)
+
+    def reset_calls(self) -> None:
+        """Drop per-call statistics, keeping declared dependencies."""
+        self.role_histograms = {}
+        self.levels = {}
+        self.spans = {}
+
+    def percentiles_by_role(self, quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, Dict[str, float]]:
+        """
+        Latency percentiles per role.
+
+        Args:
+            quantiles: Quantiles to report
+
+        Returns:
+            Dictionary mapping role to {"p50": s, "p95": s, ..., "count": n}
+        """
+        quantiles = list(quantiles)
+        report = {}
+        for role, histogram in self.role_histograms.items():
+            row = {f"p{q * 100:g}": histogram.quantile(q) for q in quantiles}
+            row["count"] = histogram.count
+            report[role] = row
+        return report
+
+    def barrier_path_seconds(self) -> float:
+        """
+        Wall time the per-level barrier model forces with zero dispatch
+        overhead: the sum of each level's slowest call. Compare with
+        critical_path() over the real dependencies to see what the
+        barriers cost.
+
+        Returns:
+            Seconds
+        """
+        return sum(barrier.max_duration for barrier in self.levels.values())
+
+    def level_gaps(self) -> Dict[Tuple[int, int], float]:
+        """
+        Orchestration gap before each level: its first start minus the
+        previous level's last finish in the same round.
+
+        Returns:
+            Dictionary mapping (round, level) to gap seconds
+        """
+        gaps = {}
+        ordered = sorted(self.levels)
+        for previous, current in zip(ordered, ordered[1:]):
+            if previous[0] == current[0]:
+                gaps[current] = self.levels[current].first_start - self.levels[previous].last_finish
+        return gaps
+
+    def to_markdown(self) -> str:
+        """
+        Render latency percentiles and per-level barrier statistics.
+
+        Returns:
+            Markdown section (empty string if nothing was recorded)
+        """
+        if not self.role_histograms:
+            return ""
+
+        lines = [
+            "## Latency",
+            "",
+            "| Role | Calls | p50 (s) | p95 (s) | p99 (s) |",
+            "|------|-------|---------|---------|---------|",
+        ]
+        for role, row in sorted(self.percentiles_by_role().items()):
+            lines.append(
+                f"| {role} | {row['count']} | {row['p50']:.1f} | {row['p95']:.1f} | {row['p99']:.1f} |"
+            )
+        lines.append("")
+
+        total_wait = sum(barrier.barrier_wait_seconds for barrier in self.levels.values())
+        lines.extend([
+            f"- **Barrier Path:** {self.barrier_path_seconds():.1f}s (sum of each level's slowest call)",
+            f"- **Barrier Wait:** {total_wait:.1f}s (finished calls waiting on their level)",
+        ])
+        if self.dependencies:
+            path, seconds = self.critical_path()
+            lines.append(f"- **Critical Path:** {seconds:.1f}s ({' → '.join(path)})")
+        lines.append("")
+
+        gaps = self.level_gaps()
+        lines.extend([
+            "| Round | Level | Calls | Wall (s) | Barrier Wait (s) | Utilization | Gap Before (s) |",
+            "|-------|-------|-------|----------|------------------|-------------|----------------|",
+        ])
+        for key in sorted(self.levels):
+            barrier = self.levels[key]
+            gap = gaps.get(key)
+            lines.append(
+                f"| {barrier.round} | {barrier.level} | {barrier.calls} | {barrier.wall_seconds:.1f} | "
+                f"{barrier.barrier_wait_seconds:.1f} | {barrier.utilization * 100:.0f}% | "
+                f"{'' if gap is None else f'{gap:.1f}'} |"
+            )
+        lines.append("")
+
+        return "\n".join(lines)
+
+
+def critical_path(
+    spans: Dict[str, Tuple[float, float]],
+    dependencies: Dict[str, List[str]]
+) -> Tuple[List[str], float]:
+    """
+    Longest chain of dependent tasks by execution time.
+
+    This is the lower bound on wall time with unlimited parallelism and no
+    barriers; comparing it with the actual run time shows how much the
+    per-level barrier model costs.
+
+    Args:
+        spans: task_id -> (started_at, finished_at)
+        dependencies: task_id -> task_ids it depends on (unknown ids ignored)
+
+    Returns:
+        Tuple of (task_ids along the path, summed duration in seconds)
+
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    duration = {task_id: max(end - start, 0.0) for task_id, (start, end) in spans.items()}
+
+    best: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+    state: Dict[str, int] = {}  # 1: visiting, 2: done
+
+    for root in duration:
+        if root in best:
+            continue
+        stack = [(root, False)]
+        while stack:
+            task_id, expanded = stack.pop()
+            if expanded:
+                previous = None
+                length = 0.0
+                for dep in dependencies.get(task_id, []):
+                    if dep in best and best[dep] > length:
+                        previous, length = dep, best[dep]
+                best[task_id] = length + duration[task_id]
+                via[task_id] = previous
+                state[task_id] = 2
+                continue
+            if state.get(task_id) == 2:
+                continue
+            if state.get(task_id) == 1:
+                raise ValueError(f"Dependency cycle through task {task_id!r}")
+            state[task_id] = 1
+            stack.append((task_id, True))
+            for dep in dependencies.get(task_id, []):
+                if dep in duration and state.get(dep) != 2:
+                    if state.get(dep) == 1:
+                        raise ValueError(f"Dependency cycle through task {dep!r}")
+                    stack.append((dep, False))
+
+    if not best:
+        return [], 0.0
+
+    end = max(best, key=best.get)
+    path = []
+    node: Optional[str] = end
+    while node is not None:
+        path.append(node)
+        node = via[node]
+    path.reverse()
+    return path, best[end]
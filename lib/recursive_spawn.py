@@ -3,10 +3,13 @@ Recursive Spawn Manager for Loom-RLM
 Enables hierarchical task decomposition with controlled depth limits.
 """
 
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
 from dataclasses import dataclass, field
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from .cost_tracker import CostTracker
+
 
 @dataclass
 class SpawnNode:
@@ -18,6 +21,7 @@ class SpawnNode:
     spawned_at: str
     children: List[str] = field(default_factory=list)
     status: str = "pending"  # pending, running, completed, failed
+    finished_at: Optional[str] = None  # set when status becomes completed or failed
 
 
 class RecursiveSpawnManager:
@@ -29,6 +33,7 @@ class RecursiveSpawnManager:
     - Auto-approval: Within depth limit (no user prompt)
     - Tree visualization: ASCII tree for logging
     - Spawn tracking: All spawns logged to spawn_tree.md
+    - Timeline: to_chrome_trace() exports the tree as a trace (see trace_export.py)
     """
 
     def __init__(self, max_depth: int = 2, auto_approve: bool = True):
@@ -134,12 +139,19 @@ class RecursiveSpawnManager:
         """
         Update the status of a task.
 
+        Completed and failed tasks get finished_at stamped.
+
         Args:
             task_id: Task identifier
             status: New status (pending, running, completed, failed)
         """
         if task_id in self.spawn_tree:
-            self.spawn_tree[task_id].status = status
+            node = self.spawn_tree[task_id]
+            node.status = status
+            if status in ("completed", "failed"):
+                node.finished_at = datetime.now().isoformat()
+            else:
+                node.finished_at = None
 
     def get_depth(self, task_id: str) -> int:
         """
@@ -368,12 +380,32 @@ class RecursiveSpawnManager:
                     f"- **Parent:** {node.parent_task_id or 'None (root)'}",
                     f"- **Children:** {len(node.children)}",
                     f"- **Spawned:** {node.spawned_at}",
+                    f"- **Finished:** {node.finished_at or '-'}",
                     f"- **Path:** {path}",
                     "",
                 ])
 
         return "\n".join(lines)
 
+    def to_chrome_trace(self, path: str, tracker: Optional["CostTracker"] = None) -> int:
+        """
+        Write the spawn tree as Chrome trace-event JSON.
+
+        Args:
+            path: Output path
+            tracker: CostTracker of the same run; adds its call timeline and
+                per-task token counts
+
+        Returns:
+            Number of trace events written
+        """
+        try:
+            from .trace_export import write_chrome_trace
+        except ImportError:
+            from trace_export import write_chrome_trace
+
+        return write_chrome_trace(path, tracker=tracker, spawn_manager=self)
+
     def validate_spawn_request(
         self,
         parent_task_id: str,
@@ -0,0 +1,455 @@
+"""
+Token Estimation for Loom
+Pluggable token estimators behind CostTracker.estimate_tokens, with memoization.
+"""
+
+from typing import Dict, Optional, Tuple, Union
+from collections import OrderedDict
+from functools import lru_cache
+import abc
+import base64
+import re
+import threading
+
+
+# Characters per token assumed by the default heuristic
+DEFAULT_CHARS_PER_TOKEN = 1.3
+
+
+class TokenEstimator(abc.ABC):
+    """
+    Base class for token estimators.
+
+    Subclasses implement count(). Estimators whose count() costs more than
+    len() set cacheable = True so set_estimator() memoizes them.
+    """
+
+    name = "base"
+    cacheable = True
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Estimate the number of tokens in text.
+
+        Args:
+            text: Text to estimate
+
+        Returns:
+            Estimated token count
+        """
+
+
+class HeuristicEstimator(TokenEstimator):
+    """
+    Characters-per-token ratio. O(1), so never worth caching.
+
+    The default 1.3 ratio deliberately overestimates English prose (closer
+    to 4 chars/token) to keep budgets conservative.
+    """
+
+    name = "heuristic"
+    cacheable = False
+
+    def __init__(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token)
+
+
+def load_tiktoken_ranks(path: str) -> Dict[bytes, int]:
+    """
+    Load a BPE rank table in tiktoken format (base64 token, space, rank).
+
+    Args:
+        path: Rank file path (e.g. a locally cached cl100k_base.tiktoken)
+
+    Returns:
+        Dictionary mapping token bytes to merge rank
+    """
+    ranks = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            token, rank = line.split()
+            ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+class BPEEstimator(TokenEstimator):
+    """
+    Byte-pair-encoding token counter driven by a local rank table.
+
+    Text is pre-split into words, numbers, punctuation and whitespace runs
+    (an approximation of the cl100k split pattern using the re module), and
+    each piece is merged lowest-rank-pair first. Only the count is kept, not
+    the token ids. Pieces repeat heavily, so merged counts are memoized.
+
+    No network access is needed: the rank file must already be on disk. The
+    Claude tokenizer is not published, so a public vocabulary is a close but
+    not exact stand-in; wrap it in a CalibratedEstimator to correct the bias.
+    """
+
+    name = "bpe"
+
+    PIECE_PATTERN = re.compile(
+        r"'(?i:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+    )
+
+    def __init__(self, ranks: Union[str, Dict[bytes, int]], piece_cache_size: int = 65_536):
+        """
+        Initialize the estimator.
+
+        Args:
+            ranks: Rank table, or path to a tiktoken-format rank file
+            piece_cache_size: Pieces whose token counts are memoized
+        """
+        self.ranks = load_tiktoken_ranks(ranks) if isinstance(ranks, str) else ranks
+        self._piece_tokens = lru_cache(maxsize=piece_cache_size)(self._merge_piece)
+
+    def _merge_piece(self, piece: bytes) -> int:
+        ranks = self.ranks
+        if piece in ranks:
+            return 1
+
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_idx = -1
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    best_idx = i
+            if best_rank is None:
+                break
+            parts[best_idx:best_idx + 2] = [parts[best_idx] + parts[best_idx + 1]]
+
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        piece_tokens = self._piece_tokens
+        return sum(
+            piece_tokens(piece.encode("utf-8"))
+            for piece in self.PIECE_PATTERN.findall(text)
+        )
+
+
+class CalibratedEstimator(TokenEstimator):
+    """
+    Scales a base estimator by the observed ratio of actual to estimated tokens.
+
+    Feed it real usage numbers with observe(); the scale is the ratio of the
+    summed actual counts to the summed base estimates.
+    """
+
+    name = "calibrated"
+    cacheable = False  # the scale moves; the base estimator is cached instead
+
+    def __init__(self, base: Optional[TokenEstimator] = None, scale: float = 1.0):
+        """
+        Initialize the estimator.
+
+        Args:
+            base: Estimator being corrected (default: HeuristicEstimator())
+            scale: Starting scale before any observations
+        """
+        base = base or HeuristicEstimator()
+        self.base = CachedEstimator(base) if base.cacheable else base
+        self.scale = scale
+        self.estimated_total = 0
+        self.actual_total = 0
+
+    def observe(self, text: str, actual_tokens: int) -> None:
+        """
+        Record the real token count for a text and refit the scale.
+
+        Args:
+            text: Text that was sent to the model
+            actual_tokens: Token count reported by the API
+        """
+        self.estimated_total += self.base.count(text)
+        self.actual_total += actual_tokens
+        if self.estimated_total:
+            self.scale = self.actual_total / self.estimated_total
+
+    def count(self, text: str) -> int:
+        return int(self.base.count(text) * self.scale)
+
+
+class ContentClassEstimator(TokenEstimator):
+    """
+    Linear model over per-class character counts.
+
+    Characters are split into CONTENT_CLASSES with a single regex pass
+    (prose is whatever is left), and the estimate is the sum of each class's
+    character count times its tokens-per-character weight. Code symbols,
+    digits and CJK cost far more tokens per character than English prose,
+    which is where a single ratio goes wrong.
+
+    observe() accumulates the normal equations of a least-squares fit of
+    the weights to real token counts and refits with non-negative
+    coordinate descent. A ridge prior pulls each weight toward its default
+    until enough text of that class has been seen.
+    """
+
+    name = "content_class"
+    cacheable = False  # weights move; per-text class counts are cached instead
+
+    CONTENT_CLASSES = ("prose", "code", "digits", "whitespace", "cjk")
+
+    # Tokens per character before any calibration
+    DEFAULT_WEIGHTS = {
+        "prose": 0.25,
+        "code": 0.75,
+        "digits": 0.34,
+        "whitespace": 0.15,
+        "cjk": 1.0,
+    }
+
+    _CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+
+    # One alternation, one group per class; each character lands in exactly one
+    _CLASS_PATTERN = re.compile(
+        f"(?P<cjk>[{_CJK}]+)"
+        r"|(?P<digits>\d+)"
+        r"|(?P<whitespace>\s+)"
+        f"|(?P<code>[^\\w\\s{_CJK}]+|_+)"
+    )
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        prior_chars: float = 1_000.0,
+        cache_size: int = 4_096
+    ):
+        """
+        Initialize the estimator.
+
+        Args:
+            weights: Starting tokens-per-character weights by class
+            prior_chars: Strength of the pull toward the starting weights,
+                as characters of pseudo-observation per class
+            cache_size: Texts whose class counts are memoized
+        """
+        self.prior = dict(self.DEFAULT_WEIGHTS)
+        self.prior.update(weights or {})
+        self.weights = dict(self.prior)
+        self.prior_chars = prior_chars
+        self.samples = 0
+
+        n = len(self.CONTENT_CLASSES)
+        self._xtx = [[0.0] * n for _ in range(n)]
+        self._xty = [0.0] * n
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, int], Tuple[int, ...]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def class_counts(self, text: str) -> Tuple[int, ...]:
+        """
+        Count characters of each content class.
+
+        Args:
+            text: Text to classify
+
+        Returns:
+            Character counts in CONTENT_CLASSES order
+        """
+        counts = dict.fromkeys(self.CONTENT_CLASSES, 0)
+        for match in self._CLASS_PATTERN.finditer(text):
+            counts[match.lastgroup] += match.end() - match.start()
+        counts["prose"] = len(text) - sum(counts.values())
+        return tuple(counts[name] for name in self.CONTENT_CLASSES)
+
+    def _cached_class_counts(self, text: str) -> Tuple[int, ...]:
+        # Same (length, hash) LRU as CachedEstimator, storing class counts
+        cache = self._cache
+        key = (len(text), hash(text))
+        with self._cache_lock:
+            counts = cache.get(key)
+            if counts is not None:
+                cache.move_to_end(key)
+                return counts
+
+        counts = self.class_counts(text)
+        with self._cache_lock:
+            cache[key] = counts
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return counts
+
+    def count(self, text: str) -> int:
+        counts = self._cached_class_counts(text)
+        weights = self.weights
+        return int(sum(
+            chars * weights[name]
+            for name, chars in zip(self.CONTENT_CLASSES, counts)
+        ))
+
+    def observe(self, text: str, actual_tokens: int) -> None:
+        """
+        Record the real token count for a text and refit the weights.
+
+        Args:
+            text: Text that was sent to (or produced by) the model
+            actual_tokens: Token count reported by the API
+        """
+        x = self._cached_class_counts(text)
+        for i, xi in enumerate(x):
+            if xi:
+                row = self._xtx[i]
+                for j, xj in enumerate(x):
+                    row[j] += xi * xj
+                self._xty[i] += xi * actual_tokens
+        self.samples += 1
+        self.refit()
+
+    def refit(self, sweeps: int = 50) -> Dict[str, float]:
+        """
+        Refit weights to all observations (non-negative ridge least squares).
+
+        Args:
+            sweeps: Coordinate-descent passes over the weights
+
+        Returns:
+            Fitted tokens-per-character weights by class
+        """
+        names = self.CONTENT_CLASSES
+        ridge = self.prior_chars ** 2
+        w = [self.weights[name] for name in names]
+
+        for _ in range(sweeps):
+            for i, name in enumerate(names):
+                diag = self._xtx[i][i] + ridge
+                residual = self._xty[i] + ridge * self.prior[name] - sum(
+                    self._xtx[i][j] * w[j] for j in range(len(names)) if j != i
+                )
+                w[i] = max(0.0, residual / diag)
+
+        self.weights = dict(zip(names, w))
+        return self.weights
+
+    def chars_per_token(self) -> Dict[str, float]:
+        """
+        Current weights as characters per token, the usual way ratios are quoted.
+
+        Returns:
+            Dictionary mapping class to chars per token
+        """
+        return {
+            name: (1 / weight if weight else float("inf"))
+            for name, weight in self.weights.items()
+        }
+
+
+class CachedEstimator(TokenEstimator):
+    """
+    Bounded LRU cache in front of another estimator.
+
+    Keys are (length, hash) rather than the text itself, so cached entries
+    never keep large prompts alive. str caches its own hash, so a repeated
+    lookup on the same string object costs one dict probe.
+
+    Safe to share between threads: cache updates take a lock, the backend
+    count runs outside it.
+    """
+
+    cacheable = False
+
+    def __init__(self, backend: TokenEstimator, maxsize: int = 4_096):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Estimator to memoize
+            maxsize: Maximum number of cached counts
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        key = (len(text), hash(text))
+        cache = self._cache
+
+        with self._lock:
+            tokens = cache.get(key)
+            if tokens is not None:
+                cache.move_to_end(key)
+                self.hits += 1
+                return tokens
+            self.misses += 1
+
+        tokens = self.backend.count(text)
+        with self._lock:
+            cache[key] = tokens
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+        return tokens
+
+    def clear(self) -> None:
+        """Drop all cached counts."""
+        with self._lock:
+            self._cache.clear()
+
+
+_estimator: TokenEstimator = HeuristicEstimator()
+
+# Serializes observe() calls, which update estimator state in several steps
+_observe_lock = threading.Lock()
+
+
+def get_estimator() -> TokenEstimator:
+    """
+    Get the estimator used by CostTracker.estimate_tokens.
+
+    Returns:
+        Active estimator
+    """
+    return _estimator
+
+
+def observe_usage(text: str, actual_tokens: int) -> bool:
+    """
+    Feed a real token count to the active estimator, if it learns from usage.
+
+    Args:
+        text: Text the count covers
+        actual_tokens: Token count reported by the API
+
+    Returns:
+        True if the estimator recorded the observation
+    """
+    estimator = _estimator
+    if isinstance(estimator, CachedEstimator):
+        estimator = estimator.backend
+    observe = getattr(estimator, "observe", None)
+    if observe is None:
+        return False
+    with _observe_lock:
+        observe(text, actual_tokens)
+    return True
+
+
+def set_estimator(estimator: TokenEstimator, cache_size: int = 4_096) -> TokenEstimator:
+    """
+    Replace the estimator used by CostTracker.estimate_tokens.
+
+    Cacheable estimators are wrapped in a CachedEstimator.
+
+    Args:
+        estimator: New estimator
+        cache_size: LRU size for the wrapping cache
+
+    Returns:
+        The installed (possibly wrapped) estimator
+    """
+    global _estimator
+    _estimator = CachedEstimator(estimator, cache_size) if estimator.cacheable else estimator
+    return _estimator
@@ -0,0 +1,257 @@
+"""
+Trace Export for Loom
+Chrome trace-event JSON of a run timeline, viewable in chrome://tracing or Perfetto.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from datetime import datetime
+import json
+
+try:
+    from .latency import PHASE_ROLES
+except ImportError:
+    from latency import PHASE_ROLES
+
+if TYPE_CHECKING:
+    from .cost_tracker import CostTracker
+    from .recursive_spawn import RecursiveSpawnManager
+
+
+# Process ids: one "process" per group of tracks, in display order
+ORCHESTRATION_PID = 1
+LEVEL_PID_BASE = 10
+SPAWN_PID_BASE = 1000
+
+
+def build_chrome_trace(
+    tracker: Optional["CostTracker"] = None,
+    spawn_manager: Optional["RecursiveSpawnManager"] = None
+) -> Dict[str, Any]:
+    """
+    Build a Chrome trace-event document for a run.
+
+    Layout:
+    - "Orchestration": one track per phase role (validator, strategist,
+      ...) plus a "rounds" track spanning each round
+    - "Level N": subagent calls at spawn level N. Concurrent calls get
+      separate lanes; after each call a "barrier wait" slice runs until
+      the level's slowest call finishes
+    - "Spawn depth N": spawn-tree tasks by depth, from spawned_at to
+      finished_at, when a RecursiveSpawnManager is given
+
+    Call slices carry role, task, model, token counts and cost as args.
+    Only calls tracked with started_at appear (see
+    CostTracker.track_subagent_call).
+
+    Args:
+        tracker: Tracker whose calls to export
+        spawn_manager: Spawn tree to export
+
+    Returns:
+        Trace document ({"traceEvents": [...], ...}) ready for json.dump
+    """
+    events: List[Dict[str, Any]] = []
+    spans: List[Tuple[float, float]] = []
+
+    calls = []
+    if tracker is not None:
+        calls = [call for call in tracker.iter_calls() if call.started_at]
+        spans.extend((call.started_at, call.finished_at) for call in calls)
+
+    nodes = []
+    if spawn_manager is not None:
+        for node in spawn_manager.spawn_tree.values():
+            start = _epoch(node.spawned_at)
+            end = _epoch(node.finished_at) if node.finished_at else start
+            nodes.append((node, start, end))
+            spans.append((start, end))
+
+    origin = min((start for start, _ in spans), default=0.0)
+    metadata: Dict[Tuple[int, Optional[int]], Tuple[str, int]] = {}
+
+    if calls:
+        _call_events(tracker, calls, origin, events, metadata)
+    if nodes:
+        _spawn_events(tracker, nodes, origin, events, metadata)
+
+    for (pid, tid), (name, sort_index) in sorted(metadata.items(), key=lambda x: (x[0][0], x[0][1] or -1)):
+        kind = "process" if tid is None else "thread"
+        ids = {"pid": pid} if tid is None else {"pid": pid, "tid": tid}
+        events.append({"ph": "M", "name": f"{kind}_name", **ids, "args": {"name": name}})
+        events.append({"ph": "M", "name": f"{kind}_sort_index", **ids, "args": {"sort_index": sort_index}})
+
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {
+            "run_start": datetime.fromtimestamp(origin).isoformat() if spans else None,
+        },
+    }
+
+
+def write_chrome_trace(
+    path: str,
+    tracker: Optional["CostTracker"] = None,
+    spawn_manager: Optional["RecursiveSpawnManager"] = None
+) -> int:
+    """
+    Write a run's Chrome trace-event JSON (see build_chrome_trace).
+
+    Args:
+        path: Output path (conventionally loom/{slug}/trace.json)
+        tracker: Tracker whose calls to export
+        spawn_manager: Spawn tree to export
+
+    Returns:
+        Number of trace events written
+    """
+    trace = build_chrome_trace(tracker, spawn_manager)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f)
+    return len(trace["traceEvents"])
+
+
+def _call_events(
+    tracker: "CostTracker",
+    calls: List[Any],
+    origin: float,
+    events: List[Dict[str, Any]],
+    metadata: Dict[Tuple[int, Optional[int]], Tuple[str, int]]
+) -> None:
+    """Slices for tracked calls: phases, per-level work, barrier waits and rounds."""
+    level_end: Dict[Tuple[int, int], float] = {}
+    round_span: Dict[int, Tuple[float, float]] = {}
+    for call in calls:
+        if call.role not in PHASE_ROLES:
+            key = (call.round, call.level)
+            level_end[key] = max(level_end.get(key, call.finished_at), call.finished_at)
+        first, last = round_span.get(call.round, (call.started_at, call.finished_at))
+        round_span[call.round] = (min(first, call.started_at), max(last, call.finished_at))
+
+    metadata[(ORCHESTRATION_PID, None)] = ("Orchestration", 0)
+    metadata[(ORCHESTRATION_PID, 0)] = ("rounds", 0)
+    for round_num, (first, last) in sorted(round_span.items()):
+        events.append(_slice(f"Round {round_num}", "round", ORCHESTRATION_PID, 0, first, last, origin))
+
+    # Greedy lane assignment per level: a lane is free once its previous
+    # call's barrier wait is over
+    lanes: Dict[int, List[float]] = {}
+    for call in sorted(calls, key=lambda c: (c.started_at, c.finished_at)):
+        model = call.model or tracker.model_for(call.role)
+        args = {
+            "role": call.role,
+            "task_id": call.task_id,
+            "round": call.round,
+            "model": model,
+            "input_tokens": call.input_tokens,
+            "output_tokens": call.output_tokens,
+            "cache_read_tokens": call.cache_read_tokens,
+            "cache_write_tokens": call.cache_write_tokens,
+            "cost_usd": round(tracker.pricing[model].cost(
+                call.input_tokens, call.output_tokens,
+                call.cache_read_tokens, call.cache_write_tokens
+            ), 6),
+        }
+
+        if call.role in PHASE_ROLES:
+            tid = PHASE_ROLES.index(call.role) + 1
+            metadata[(ORCHESTRATION_PID, tid)] = (call.role, tid)
+            events.append(_slice(
+                f"{call.role} (round {call.round})", "phase", ORCHESTRATION_PID, tid,
+                call.started_at, call.finished_at, origin, args
+            ))
+            continue
+
+        pid = LEVEL_PID_BASE + call.level
+        barrier_end = level_end[(call.round, call.level)]
+        free_at = lanes.setdefault(call.level, [])
+        lane = next((i for i, free in enumerate(free_at) if free <= call.started_at), None)
+        if lane is None:
+            lane = len(free_at)
+            free_at.append(0.0)
+        free_at[lane] = max(barrier_end, call.finished_at)
+
+        metadata[(pid, None)] = (f"Level {call.level}", LEVEL_PID_BASE + call.level)
+        metadata[(pid, lane)] = (f"lane {lane}", lane)
+        events.append(_slice(
+            f"{call.role}:{call.task_id}", "call", pid, lane,
+            call.started_at, call.finished_at, origin, args
+        ))
+        if barrier_end > call.finished_at:
+            events.append(_slice(
+                "barrier wait", "barrier", pid, lane, call.finished_at, barrier_end, origin,
+                {"task_id": call.task_id, "wait_seconds": round(barrier_end - call.finished_at, 3)}
+            ))
+
+
+def _spawn_events(
+    tracker: Optional["CostTracker"],
+    nodes: List[Tuple[Any, float, float]],
+    origin: float,
+    events: List[Dict[str, Any]],
+    metadata: Dict[Tuple[int, Optional[int]], Tuple[str, int]]
+) -> None:
+    """Slices for spawn-tree tasks, one lane per task within its depth."""
+    task_tokens: Dict[str, Tuple[int, int]] = {}
+    if tracker is not None:
+        for call in tracker.iter_calls():
+            tokens = task_tokens.get(call.task_id, (0, 0))
+            task_tokens[call.task_id] = (
+                tokens[0] + call.input_tokens + call.cache_read_tokens + call.cache_write_tokens,
+                tokens[1] + call.output_tokens
+            )
+
+    lanes: Dict[int, List[float]] = {}
+    for node, start, end in sorted(nodes, key=lambda n: (n[1], n[0].task_id)):
+        pid = SPAWN_PID_BASE + node.depth
+        free_at = lanes.setdefault(node.depth, [])
+        lane = next((i for i, free in enumerate(free_at) if free <= start), None)
+        if lane is None:
+            lane = len(free_at)
+            free_at.append(0.0)
+        # Unfinished tasks get a zero-length slice; keep their lane reserved
+        free_at[lane] = end if node.finished_at else float("inf")
+
+        metadata[(pid, None)] = (f"Spawn depth {node.depth}", SPAWN_PID_BASE + node.depth)
+        metadata[(pid, lane)] = (f"lane {lane}", lane)
+
+        args = {
+            "role": node.role,
+            "task_id": node.task_id,
+            "parent_task_id": node.parent_task_id,
+            "status": node.status,
+            "children": len(node.children),
+        }
+        if node.task_id in task_tokens:
+            args["input_tokens"], args["output_tokens"] = task_tokens[node.task_id]
+        events.append(_slice(f"{node.role}:{node.task_id}", "spawn", pid, lane, start, end, origin, args))
+
+
+def _slice(
+    name: str,
+    category: str,
+    pid: int,
+    tid: int,
+    start: float,
+    end: float,
+    origin: float,
+    args: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Complete ("X") event; times are epoch seconds, emitted as microseconds from origin."""
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "pid": pid,
+        "tid": tid,
+        "ts": round((start - origin) * 1_000_000),
+        "dur": max(round((end - start) * 1_000_000), 0),
+    }
+    if args:
+        event["args"] = args
+    return event
+
+
+def _epoch(timestamp: str) -> float:
+    """ISO timestamp (as stored on SpawnNode) to epoch seconds."""
+    return datetime.fromisoformat(timestamp).timestamp()
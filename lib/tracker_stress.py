@@ -0,0 +1,233 @@
+"""
+CostTracker Stress Check for Loom
+Records many concurrent subagent calls and verifies that none are lost.
+"""
+
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+try:
+    from .cost_tracker import AsyncCostRecorder, CostTracker
+except ImportError:
+    from cost_tracker import AsyncCostRecorder, CostTracker
+
+
+DEFAULT_CALLS = 10_000
+
+DEFAULT_THREADS = 64
+
+ROLES = ["researcher", "architect", "coder", "reviewer"]
+
+
+def _call_args(i: int) -> Dict[str, Any]:
+    """Deterministic arguments for call i; token counts vary with i."""
+    return {
+        "role": ROLES[i % len(ROLES)],
+        "task_id": f"task_{i}",
+        "input_text": "x" * (13 + i % 97),
+        "output_text": "y" * (26 + i % 89),
+        "round": 1 + i % 3,
+    }
+
+
+def _expected_tokens(calls: int) -> int:
+    """Total tokens a tracker should hold after recording calls 0..calls-1."""
+    tracker = CostTracker()
+    return sum(
+        tracker.estimate_tokens(args["input_text"]) + tracker.estimate_tokens(args["output_text"])
+        for args in map(_call_args, range(calls))
+    )
+
+
+def _check(tracker: CostTracker, calls: int, expected_tokens: int, seconds: float) -> Dict[str, Any]:
+    """Compare a tracker against the expected call set."""
+    recorded = list(tracker.iter_calls())
+    task_ids = {call.task_id for call in recorded}
+    total_input, total_output = tracker.get_total_tokens()
+    role_calls = sum(
+        tracker.get_usage_totals("role", role=role).calls
+        for role in ROLES
+        if tracker.get_usage_totals("role", role=role) is not None
+    )
+    return {
+        "calls": calls,
+        "recorded": len(recorded),
+        "lost": calls - len(task_ids),
+        "duplicated": len(recorded) - len(task_ids),
+        "aggregate_calls": role_calls,
+        "tokens_match": total_input + total_output == expected_tokens,
+        "seconds": seconds,
+        "calls_per_second": calls / seconds if seconds else 0.0,
+    }
+
+
+def stress_serial(calls: int = DEFAULT_CALLS, expected_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Baseline: record every call from one thread.
+
+    Args:
+        calls: Number of calls to record
+        expected_tokens: Precomputed _expected_tokens(calls)
+
+    Returns:
+        Result dict (see _check)
+    """
+    tracker = CostTracker()
+    start = time.perf_counter()
+    for i in range(calls):
+        tracker.track_subagent_call(**_call_args(i))
+    seconds = time.perf_counter() - start
+    return _check(tracker, calls, expected_tokens or _expected_tokens(calls), seconds)
+
+
+def stress_threads(
+    calls: int = DEFAULT_CALLS,
+    threads: int = DEFAULT_THREADS,
+    concurrent: bool = True,
+    expected_tokens: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Record calls from a thread pool, all released at once, while a reader
+    thread keeps querying totals.
+
+    Args:
+        calls: Number of calls to record
+        threads: Recording threads
+        concurrent: Use per-thread buffers (False: every call takes the lock)
+        expected_tokens: Precomputed _expected_tokens(calls)
+
+    Returns:
+        Result dict (see _check) plus the number of concurrent reads
+    """
+    tracker = CostTracker(concurrent=concurrent)
+    go = threading.Event()
+    done = threading.Event()
+    reads = 0
+
+    def record(worker: int) -> None:
+        go.wait()
+        for i in range(worker, calls, threads):
+            tracker.track_subagent_call(**_call_args(i))
+
+    def read() -> None:
+        nonlocal reads
+        go.wait()
+        while not done.is_set():
+            tracker.get_cost_by_role()
+            reads += 1
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(record, worker) for worker in range(threads)]
+        start = time.perf_counter()
+        go.set()
+        for future in futures:
+            future.result()
+        seconds = time.perf_counter() - start
+    done.set()
+    reader.join()
+
+    result = _check(tracker, calls, expected_tokens or _expected_tokens(calls), seconds)
+    result["reads"] = reads
+    return result
+
+
+def stress_asyncio(calls: int = DEFAULT_CALLS, expected_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Record calls from one coroutine per call through an AsyncCostRecorder.
+
+    Args:
+        calls: Number of calls to record
+        expected_tokens: Precomputed _expected_tokens(calls)
+
+    Returns:
+        Result dict (see _check)
+    """
+    tracker = CostTracker()
+
+    async def run() -> float:
+        async with AsyncCostRecorder(tracker) as recorder:
+            async def subagent(i: int) -> None:
+                await asyncio.sleep(0)
+                args = _call_args(i)
+                await recorder.record(
+                    args["role"], args["task_id"], args["input_text"], args["output_text"], args["round"]
+                )
+
+            start = time.perf_counter()
+            await asyncio.gather(*(subagent(i) for i in range(calls)))
+        return time.perf_counter() - start
+
+    seconds = asyncio.run(run())
+    return _check(tracker, calls, expected_tokens or _expected_tokens(calls), seconds)
+
+
+def run_stress(calls: int = DEFAULT_CALLS, threads: int = DEFAULT_THREADS) -> List[Dict[str, Any]]:
+    """
+    Run the serial baseline and every concurrent mode.
+
+    Args:
+        calls: Calls per mode
+        threads: Recording threads for the threaded modes
+
+    Returns:
+        One result dict per mode, with "mode" and "overhead" (seconds
+        relative to the serial baseline) added
+    """
+    expected = _expected_tokens(calls)
+    results = [dict(stress_serial(calls, expected), mode="serial")]
+    results.append(dict(stress_threads(calls, threads, True, expected), mode=f"{threads} threads, buffered"))
+    results.append(dict(stress_threads(calls, threads, False, expected), mode=f"{threads} threads, locked"))
+    results.append(dict(stress_asyncio(calls, expected), mode="asyncio queue"))
+
+    baseline = results[0]["seconds"]
+    for result in results:
+        result["overhead"] = result["seconds"] / baseline if baseline else 0.0
+    return results
+
+
+def format_stress_table(results: List[Dict[str, Any]]) -> str:
+    """
+    Render stress results as a markdown table.
+
+    Args:
+        results: Output of run_stress()
+
+    Returns:
+        Markdown table
+    """
+    lines = [
+        "| Mode | Recorded | Lost | Duplicated | Tokens OK | Calls/s | vs Serial |",
+        "|------|----------|------|------------|-----------|---------|-----------|",
+    ]
+    for r in results:
+        lines.append(
+            f"| {r['mode']} | {r['recorded']:,} | {r['lost']} | {r['duplicated']} | "
+            f"{'yes' if r['tokens_match'] else 'NO'} | {r['calls_per_second']:,.0f} | {r['overhead']:.2f}x |"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage: python tracker_stress.py [--calls N] [--threads N]
+    parser = argparse.ArgumentParser(description="Stress CostTracker with concurrent calls")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="calls per mode")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="recording threads")
+    args = parser.parse_args()
+
+    stress_results = run_stress(args.calls, args.threads)
+    print(format_stress_table(stress_results))
+
+    failed = [
+        r["mode"] for r in stress_results
+        if r["lost"] or r["duplicated"] or not r["tokens_match"] or r["aggregate_calls"] != r["calls"]
+    ]
+    if failed:
+        print(f"FAILED: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
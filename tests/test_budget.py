@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from budget import BudgetExceededError, PlannedSpawn, TokenBudget  # noqa: E402
+from cost_tracker import CostTracker  # noqa: E402
+
+
+class AdmissionTest(unittest.TestCase):
+    def _tracker(self, **limits):
+        return CostTracker(budget=TokenBudget(min_output_tokens=500, **limits))
+
+    def test_admits_spawns_that_fit(self):
+        tracker = self._tracker(max_run_tokens=100_000)
+        planned = [PlannedSpawn("coder", f"t{i}", 10_000, 5_000) for i in range(3)]
+
+        decision = tracker.admit(planned, round_num=1)
+
+        self.assertEqual(decision.admitted, planned)
+        self.assertTrue(decision.all_admitted)
+        self.assertEqual(decision.predicted_tokens, 45_000)
+        self.assertEqual(decision.output_caps, {})
+
+    def test_refuses_spawn_with_no_room(self):
+        tracker = self._tracker(max_run_tokens=10_000)
+        spawn = PlannedSpawn("coder", "t1", 9_800, 4_000)
+
+        decision = tracker.admit([spawn], round_num=1)
+
+        self.assertEqual(decision.refused, [spawn])
+        self.assertEqual(decision.admitted, [])
+        self.assertIn("t1", decision.reasons)
+
+    def test_clamps_output_without_changing_the_plan(self):
+        tracker = self._tracker(max_run_tokens=12_000)
+        spawn = PlannedSpawn("coder", "t1", 10_000, 4_000)
+
+        decision = tracker.admit([spawn], round_num=1)
+
+        self.assertEqual(decision.downgraded, [spawn])
+        self.assertEqual(decision.admitted, [spawn])
+        self.assertEqual(decision.output_caps, {"t1": 2_000})
+        self.assertEqual(spawn, PlannedSpawn("coder", "t1", 10_000, 4_000))
+
+    def test_round_crossing_the_limit_partway(self):
+        tracker = self._tracker(max_round_tokens=37_000)
+        tracker.track_subagent_call("coder", "done", "x" * 6_500, "y" * 6_500, 1)  # 10,000 tokens
+        planned = [PlannedSpawn("coder", f"t{i}", 6_000, 4_000) for i in range(4)]
+
+        decision = tracker.admit(planned, round_num=1)
+
+        # 27,000 left: two full spawns, a third capped at 1,000 output, the fourth refused
+        self.assertEqual([s.task_id for s in decision.admitted], ["t0", "t1", "t2"])
+        self.assertEqual(decision.output_caps, {"t2": 1_000})
+        self.assertEqual([s.task_id for s in decision.refused], ["t3"])
+        self.assertEqual(decision.predicted_tokens, 27_000)
+        self.assertTrue(all(s.output_tokens == 4_000 for s in planned))
+
+        # Other rounds have their own headroom
+        self.assertTrue(tracker.admit(planned[:3], round_num=2).all_admitted)
+
+
+class HardBudgetTest(unittest.TestCase):
+    def test_recording_past_a_ceiling_raises(self):
+        tracker = CostTracker(budget=TokenBudget(max_role_tokens={"coder": 1_000}))
+        tracker.track_subagent_call("coder", "t1", "x" * 650, "y" * 130, 1)
+
+        with self.assertRaises(BudgetExceededError) as raised:
+            tracker.track_subagent_call("coder", "t2", "x" * 650, "y" * 130, 1)
+
+        self.assertEqual(str(raised.exception), "role 'coder' tokens budget exceeded: 1,200 > 1,000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from chunk_cache import ChunkResultCache  # noqa: E402
+from chunk_manifest import ChunkManifest, write_manifest  # noqa: E402
+from chunking import ChunkingConfig, ChunkingStrategy  # noqa: E402
+
+
+class ChunkResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        text = "".join(f"Paragraph {i}: naïve café text.\n\n" for i in range(1_000))
+        self.chunks = ChunkingStrategy(ChunkingConfig(chunk_size_tokens=500, overlap_tokens=50)).create_chunks(text)
+
+    def test_content_hash_matches_the_manifest(self):
+        path = os.path.join(self.dir, "chunks.manifest")
+        write_manifest(path, self.chunks)
+
+        with ChunkManifest(path) as manifest:
+            for chunk, entry in zip(self.chunks, manifest):
+                self.assertEqual(ChunkResultCache.content_hash(chunk.content), entry.content_hash)
+
+    def test_partition_returns_cached_results(self):
+        cache = ChunkResultCache(os.path.join(self.dir, "cache"), namespace="v1")
+        cache.put(self.chunks[1], {"tasks": ["cached"]})
+
+        cached, to_compile = cache.partition(self.chunks)
+
+        self.assertEqual(cached, {1: {"tasks": ["cached"]}})
+        self.assertEqual([c.chunk_id for c in to_compile], [c.chunk_id for c in self.chunks if c.chunk_id != 1])
+        self.assertIsNone(ChunkResultCache(cache.cache_dir, namespace="v2").get(self.chunks[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
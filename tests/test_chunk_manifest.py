@@ -0,0 +1,94 @@
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from chunk_manifest import ChunkManifest, ManifestError, update_manifest, write_manifest  # noqa: E402
+from chunking import ChunkingConfig, ChunkingStrategy  # noqa: E402
+
+
+class ChunkManifestTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "chunks.manifest")
+        self.text = "".join(f"Paragraph {i}: naïve café text.\n\n" for i in range(2_000))
+
+    def test_round_trip(self):
+        strategy = ChunkingStrategy(ChunkingConfig(chunk_size_tokens=500, overlap_tokens=50))
+        chunks = strategy.create_chunks(self.text)
+
+        self.assertEqual(write_manifest(self.path, chunks, len(self.text)), len(chunks))
+
+        with ChunkManifest(self.path) as manifest:
+            self.assertEqual(len(manifest), len(chunks))
+            self.assertEqual(manifest.total_chars, len(self.text))
+            self.assertFalse(manifest.byte_offsets)
+            for chunk, entry in zip(chunks, manifest):
+                self.assertEqual(
+                    (entry.chunk_id, entry.start_char, entry.end_char, entry.overlap_with_next,
+                     entry.estimated_tokens),
+                    (chunk.chunk_id, chunk.start_char, chunk.end_char, chunk.overlap_with_next,
+                     chunk.estimated_tokens)
+                )
+                self.assertEqual(entry.content_hash, hashlib.sha256(chunk.content.encode("utf-8")).hexdigest())
+
+            self.assertEqual(manifest[-1], manifest[len(chunks) - 1])
+            with self.assertRaises(IndexError):
+                manifest[len(chunks)]
+
+            table = manifest.to_chunk_table()
+            self.assertEqual(len(table), len(chunks))
+            self.assertEqual(table[3].end_char, chunks[3].end_char)
+
+    def test_rejects_a_truncated_manifest(self):
+        chunks = ChunkingStrategy(ChunkingConfig(chunk_size_tokens=500, overlap_tokens=50)).create_chunks(self.text)
+        write_manifest(self.path, chunks)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaises(ManifestError):
+            ChunkManifest(self.path)
+
+
+class AppendChunksTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "chunks.manifest")
+        self.config = ChunkingConfig(chunk_size_tokens=500, overlap_tokens=50)
+        self.text = "".join(f"Paragraph {i}: some text here.\n\n" for i in range(3_000))
+        write_manifest(self.path, ChunkingStrategy(self.config).create_chunks(self.text), len(self.text))
+
+    def test_append_matches_fresh_chunking(self):
+        grown = self.text + "".join(f"Appended {i}: more words follow.\n\n" for i in range(1_000))
+        fresh = ChunkingStrategy(self.config).create_chunks(grown)
+
+        with ChunkManifest(self.path) as previous:
+            changed = ChunkingStrategy(self.config).append_chunks(previous, grown)
+            self.assertEqual(changed[0].chunk_id, len(previous) - 1)
+            update_manifest(self.path, previous, changed, len(grown))
+
+        with ChunkManifest(self.path) as manifest:
+            self.assertEqual(manifest.total_chars, len(grown))
+            self.assertEqual(
+                [(e.chunk_id, e.start_char, e.end_char, e.overlap_with_next) for e in manifest],
+                [(c.chunk_id, c.start_char, c.end_char, c.overlap_with_next) for c in fresh]
+            )
+            self.assertEqual(
+                [e.content_hash for e in manifest],
+                [hashlib.sha256(c.content.encode("utf-8")).hexdigest() for c in fresh]
+            )
+
+    def test_rejects_an_input_edited_before_the_append(self):
+        edited = self.text[:-4] + "done\n\nAppended text.\n"
+
+        with ChunkManifest(self.path) as previous, self.assertRaises(ValueError):
+            ChunkingStrategy(self.config).append_chunks(previous, edited)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,330 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from chunking import BoundaryIndex, Chunk, ChunkingConfig, ChunkingStrategy, ChunkSource, StructureIndex  # noqa: E402
+from token_estimation import ContentClassEstimator, HeuristicEstimator, get_estimator, set_estimator  # noqa: E402
+
+
+class StructureIndexTest(unittest.TestCase):
+    def test_headings_before_and_after_fence_are_indexed(self):
+        sections = []
+        for i in range(20):
+            sections.append(f"# Section {i}\n\nSome prose for section {i}.\n\n")
+            if i == 10:
+                sections.append("```python\n# not a heading\ndef f():\n    pass\n```\n\n")
+        text = "x\n" + "".join(sections)
+
+        index = StructureIndex.build(text)
+
+        heading_offsets = [
+            i for i in range(len(text))
+            if text.startswith("# Section", i) and (i == 0 or text[i - 1] == "\n")
+        ]
+        self.assertEqual(len(heading_offsets), 20)
+        for offset in heading_offsets:
+            self.assertIn(offset, index.boundaries)
+        self.assertNotIn(text.index("# not a heading"), index.boundaries)
+
+    def test_log_starting_with_class_is_not_tokenized_as_python(self):
+        text = "class of service: gold\n" + "INFO request served in 12ms\n" * 5_000
+
+        with mock.patch.object(StructureIndex, "_python_definitions") as definitions:
+            index = StructureIndex.build(text.encode())
+
+        definitions.assert_not_called()
+        self.assertEqual(len(index.boundaries), 0)
+
+    def test_python_source_splits_at_top_level_definitions(self):
+        text = (
+            '"""Module."""\n\n# Comment, not a heading\nimport os\n\n\n'
+            '@decorator\ndef first():\n    s = """\ndef not_top_level():\n"""\n\n\n'
+            'class Second:\n    def method(self):\n        pass\n'
+        )
+
+        for document in (text, text.encode()):
+            index = StructureIndex.build(document)
+            self.assertEqual(list(index.boundaries), [text.index("@decorator"), text.index("class Second")])
+
+
+class SemanticChunkingTest(unittest.TestCase):
+    def _document(self):
+        parts = []
+        for i in range(200):
+            parts.append(f"## Section {i}\n\n" + "Prose sentence here. " * (10 + i % 40) + "\n\n")
+            if i % 3 == 0:
+                parts.append("```python\n" + "".join(f"value_{j} = {j}\n" for j in range(5 + i % 60)) + "```\n\n")
+        return "".join(parts)
+
+    def test_chunks_stay_full_and_never_split_a_fence(self):
+        text = self._document()
+        config = ChunkingConfig(strategy="semantic", chunk_size_tokens=1_000, overlap_tokens=100)
+        strategy = ChunkingStrategy(config)
+        chunks = strategy.create_chunks(text)
+
+        fence_starts = {start for start, _ in strategy.structure_index.fences}
+        for chunk in chunks[:-1]:
+            self.assertIsNone(strategy.structure_index.enclosing_fence(chunk.end_char))
+            if chunk.end_char not in fence_starts:
+                self.assertGreaterEqual(
+                    chunk.metadata["estimated_tokens"],
+                    int(config.chunk_size_tokens * ChunkingStrategy.SEMANTIC_MIN_FILL) - 1
+                )
+
+        uniform = ChunkingStrategy(ChunkingConfig(chunk_size_tokens=1_000, overlap_tokens=100)).create_chunks(text)
+        self.assertLessEqual(len(chunks), len(uniform) * 1.25)
+
+
+class AdaptiveChunkingTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(set_estimator, get_estimator())
+
+    def test_dense_region_gets_shorter_chunks(self):
+        prose = "The quick brown fox jumps over the lazy dog. " * 400
+        code = "".join(f"x_{i}={{'k':[{i},{i * 2}]}};" for i in range(800))
+        text = prose + code + prose
+        set_estimator(ContentClassEstimator())
+
+        config = ChunkingConfig(strategy="adaptive", chunk_size_tokens=1_000, overlap_tokens=0,
+                                density_window_chars=512)
+        chunks = ChunkingStrategy(config).create_chunks(text)
+
+        def lengths(start, end):
+            return [c.end_char - c.start_char for c in chunks[:-1] if start <= c.start_char and c.end_char <= end]
+
+        prose_lengths = lengths(0, len(prose))
+        code_lengths = lengths(len(prose), len(prose) + len(code))
+        self.assertTrue(prose_lengths and code_lengths)
+        self.assertLess(max(code_lengths), min(prose_lengths) * 0.6)
+
+
+class MergeStrategyTest(unittest.TestCase):
+    def _results(self, count):
+        return [
+            {
+                "intent": {"goal": "g"},
+                "tasks": [
+                    {"id": f"t{j}", "role": "coder", "description": f"chunk {i} step {j}",
+                     "depends_on": [f"t{j - 1}"] if j else []}
+                    for j in range(1 + i % 4)
+                ],
+                "context": {"facts": [f"f{i}"], "meta": {f"k{i % 3}": i}},
+                "deliverables": [f"d{i}"],
+            }
+            for i in range(count)
+        ]
+
+    def test_tree_merge_matches_sequential(self):
+        for count in (1, 2, 5, 17):
+            sequential = ChunkingStrategy(ChunkingConfig(merge_strategy="sequential"))
+            tree = ChunkingStrategy(ChunkingConfig(merge_strategy="tree"))
+            a = sequential.merge_chunk_results(self._results(count), "prompt")
+            b = tree.merge_chunk_results(self._results(count), "prompt")
+
+            self.assertEqual(b["context"].pop("merge_strategy"), "tree")
+            a["context"].pop("merge_strategy")
+            self.assertEqual(a["tasks"], b["tasks"])
+            self.assertEqual(a["context"], b["context"])
+            self.assertEqual(sorted(a["deliverables"]), sorted(b["deliverables"]))
+
+    def test_dependencies_resolve_across_chunks(self):
+        results = [
+            {"tasks": [{"id": "setup", "depends_on": []}, {"id": "build", "depends_on": ["setup"]}]},
+            {"tasks": [
+                {"id": "build", "depends_on": ["setup"]},
+                {"id": "chunky", "depends_on": ["build", "chunk0_build", "deploy", "missing"]},
+            ]},
+            {"tasks": [{"id": "deploy", "depends_on": []}]},
+        ]
+        original = repr(results)
+
+        merged = ChunkingStrategy(ChunkingConfig(dedup_overlap_tasks=False)).merge_chunk_results(results, "prompt")
+
+        depends_on = {task["id"]: task["depends_on"] for task in merged["tasks"]}
+        self.assertEqual(depends_on["chunk0_build"], ["chunk0_setup"])
+        # Nearest earlier chunk defining the ID
+        self.assertEqual(depends_on["chunk1_build"], ["chunk0_setup"])
+        # Same chunk first, prefixed IDs as-is, then a later chunk; unknown IDs are dropped
+        self.assertEqual(depends_on["chunk1_chunky"], ["chunk1_build", "chunk0_build", "chunk2_deploy"])
+        self.assertEqual(
+            merged["chunking_metadata"]["dangling_dependencies"],
+            [{"task": "chunk1_chunky", "depends_on": "missing"}]
+        )
+        self.assertEqual(repr(results), original)
+
+    def test_report_describes_the_configured_merge(self):
+        for merge_strategy, heading in (("sequential", "**Sequential Merge:**"), ("parallel", "**Tree Merge:**")):
+            strategy = ChunkingStrategy(ChunkingConfig(
+                merge_strategy=merge_strategy, chunk_size_tokens=100, overlap_tokens=10
+            ))
+            strategy.create_chunks("word " * 2_000)
+            report = strategy.to_markdown()
+            self.assertIn(heading, report)
+            self.assertEqual("**Sequential Merge:**" in report, merge_strategy == "sequential")
+
+
+class OverlapDedupTest(unittest.TestCase):
+    DUPLICATE = "Implement the login form validation with email format and password strength checks on submit"
+
+    def _chunk(self, i):
+        return {
+            "tasks": [
+                {"id": "setup", "role": "architect",
+                 "description": f"Setup step {i}: " + " ".join(f"word{i}_{j}" for j in range(12))},
+                {"id": "login", "role": "coder", "description": self.DUPLICATE, "depends_on": ["setup"]},
+                {"id": "tests", "role": "tester",
+                 "description": f"Tests {i}: " + " ".join(f"check{i}_{j}" for j in range(12)),
+                 "depends_on": ["login"]},
+            ],
+            "context": {},
+            "deliverables": [],
+        }
+
+    def test_three_way_duplicate_chain_collapses_onto_first_copy(self):
+        strategy = ChunkingStrategy(ChunkingConfig(dedup_overlap_tasks=True))
+        merged = strategy.merge_chunk_results([self._chunk(i) for i in range(3)], "prompt")
+
+        self.assertEqual(
+            merged["chunking_metadata"]["deduplicated_tasks"],
+            {"chunk1_login": "chunk0_login", "chunk2_login": "chunk0_login"}
+        )
+        tasks = {task["id"]: task for task in merged["tasks"]}
+        self.assertNotIn("chunk1_login", tasks)
+        self.assertNotIn("chunk2_login", tasks)
+        # The survivor keeps every dropped copy's dependencies
+        self.assertEqual(tasks["chunk0_login"]["depends_on"], ["chunk0_setup", "chunk1_setup", "chunk2_setup"])
+        for chunk_idx in range(3):
+            self.assertEqual(tasks[f"chunk{chunk_idx}_tests"]["depends_on"], ["chunk0_login"])
+
+
+class CorpusChunkingTest(unittest.TestCase):
+    def test_packed_chunks_stay_within_budget(self):
+        words = ["alpha", "beta.", "gamma\n", "delta,", "x"]
+        for budget in (300, 2_000, 5_000):
+            documents = {
+                f"src/file_{i}.md": " ".join(words[(i + j) % 5] for j in range((5, 50, 400, 3_000, 12_000)[i % 5]))
+                for i in range(60)
+            }
+            strategy = ChunkingStrategy(ChunkingConfig(chunk_size_tokens=budget, overlap_tokens=budget // 10))
+            chunks = strategy.create_corpus_chunks(documents)
+
+            for chunk in chunks:
+                self.assertLessEqual(chunk.estimated_tokens, budget)
+            for path, entries in strategy.metadata["file_index"].items():
+                for entry in entries:
+                    content = chunks[entry["chunk_id"]].content
+                    self.assertEqual(
+                        content[entry["offset"]:entry["offset"] + entry["length"]],
+                        documents[path][entry["doc_start"]:entry["doc_end"]]
+                    )
+
+
+class SchedulingHintTest(unittest.TestCase):
+    def _strategy(self, tokens):
+        strategy = ChunkingStrategy(ChunkingConfig())
+        strategy.chunks = [
+            Chunk(chunk_id, "", 0, 0, 0, metadata={"estimated_tokens": count})
+            for chunk_id, count in enumerate(tokens)
+        ]
+        return strategy
+
+    def test_longest_chunks_are_dispatched_first(self):
+        hint = self._strategy([1, 1, 1, 1, 4]).scheduling_hint(workers=2)
+
+        self.assertEqual(hint["policy"], "lpt")
+        self.assertEqual(hint["order"], [4, 0, 1, 2, 3])
+        self.assertEqual(hint["assignments"], [[4], [0, 1, 2, 3]])
+        self.assertEqual(hint["predicted_makespan_tokens"], 4)
+        self.assertEqual(hint["document_order_makespan_tokens"], 6)
+        self.assertEqual(hint["lower_bound_tokens"], 4)
+
+    def test_document_order_is_kept_when_it_finishes_sooner(self):
+        hint = self._strategy([3, 2, 2, 3, 2]).scheduling_hint(workers=2)
+
+        self.assertEqual(hint["policy"], "document")
+        self.assertEqual(hint["order"], [0, 1, 2, 3, 4])
+        self.assertEqual(hint["predicted_makespan_tokens"], 6)
+
+
+class ChunkSourceTest(unittest.TestCase):
+    def test_prompt_naming_a_file_is_text(self):
+        prompt = os.path.abspath(__file__)
+        source = ChunkSource(prompt)
+        self.assertTrue(source.is_text)
+        self.assertEqual(source.read(0, len(prompt)), prompt)
+
+        strategy = ChunkingStrategy(ChunkingConfig(chunk_size_tokens=10, overlap_tokens=2))
+        chunks = strategy.create_chunks(prompt)
+        self.assertTrue(all(chunk.content for chunk in chunks))
+        self.assertEqual(chunks[0].content, prompt[:len(chunks[0].content)])
+
+    def test_from_path_maps_the_file(self):
+        with open(__file__, "rb") as f:
+            expected = f.read()
+        with ChunkSource.from_path(__file__) as source:
+            self.assertFalse(source.is_text)
+            self.assertEqual(bytes(source.buffer[:]), expected)
+
+
+class ParallelScanTest(unittest.TestCase):
+    def setUp(self):
+        paragraphs = [
+            f"Line {i} of the report. It ends here!\n" + ("\n" if i % 7 == 0 else "")
+            for i in range(5_000)
+        ]
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "wb") as f:
+            f.write("".join(paragraphs).encode())
+        self.addCleanup(os.remove, self.path)
+
+    def test_parallel_scan_matches_serial_scan(self):
+        with ChunkSource.from_path(self.path) as source, \
+                mock.patch.object(BoundaryIndex, "PARALLEL_SCAN_MIN_BYTES", 0):
+            serial = BoundaryIndex.build(source.buffer)
+            parallel = BoundaryIndex(source.buffer)
+            parallel.enable_parallel_scan(source.path, 2)
+            self.assertTrue(parallel._use_parallel_scan())
+
+            for class_idx in range(len(BoundaryIndex.BOUNDARY_CLASSES)):
+                self.assertEqual(parallel.get_positions(class_idx), serial.get_positions(class_idx))
+
+    def test_chunk_spans_do_not_depend_on_scan_workers(self):
+        spans = {}
+        with mock.patch.object(BoundaryIndex, "PARALLEL_SCAN_MIN_BYTES", 0):
+            for workers in (1, 2):
+                config = ChunkingConfig(chunk_size_tokens=2_000, overlap_tokens=100, scan_workers=workers)
+                with ChunkSource.from_path(self.path) as source:
+                    spans[workers] = [
+                        (c.start_char, c.end_char) for c in ChunkingStrategy(config).iter_chunks(source)
+                    ]
+        self.assertGreater(len(spans[1]), 1)
+        self.assertEqual(spans[1], spans[2])
+
+
+class StreamingEstimatorTest(unittest.TestCase):
+    def setUp(self):
+        self.previous = get_estimator()
+        self.addCleanup(set_estimator, self.previous)
+
+    def test_iter_chunks_sizes_with_the_active_estimator(self):
+        text = "word " * 4_000
+        config = ChunkingConfig(chunk_size_tokens=500, overlap_tokens=50)
+
+        set_estimator(HeuristicEstimator(chars_per_token=4.0))
+        chunks = list(ChunkingStrategy(config).iter_chunks(text))
+
+        self.assertEqual(len(chunks), 11)
+        for chunk in chunks[:-1]:
+            self.assertAlmostEqual(chunk.estimated_tokens, 500, delta=25)
+
+        streamed = [(c.start_char, c.end_char) for c in chunks]
+        created = [(c.start_char, c.end_char) for c in ChunkingStrategy(config).create_chunks(text)]
+        self.assertEqual(streamed, created)
+
+
+if __name__ == "__main__":
+    unittest.main()
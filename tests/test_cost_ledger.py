@@ -0,0 +1,160 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+import cost_ledger  # noqa: E402
+from cost_ledger import CallLedger, LedgerError, LedgerReader, LedgerWriter  # noqa: E402
+from cost_tracker import MODEL_PRICING, SubagentCall  # noqa: E402
+
+
+def _calls():
+    return [
+        SubagentCall("coder", f"t{i}", 1_000 + i, 200 + i, "", 1 + i % 2,
+                     model="claude-haiku-4-5" if i % 3 == 0 else "",
+                     cache_read_tokens=50 * (i % 4), cache_write_tokens=10 * (i % 2),
+                     started_at=100.0 + i, finished_at=101.5 + i, level=i % 3)
+        for i in range(12)
+    ] + [
+        SubagentCall("reviewer", "r0", 3_000, 900, "2026-01-01T00:00:00", 2, model="claude-opus-4-1"),
+    ]
+
+
+def _expected_totals(calls, key, default_model="claude-sonnet-4-5"):
+    expected = {}
+    for call in calls:
+        rates = MODEL_PRICING[call.model or default_model]
+        totals = expected.setdefault(getattr(call, key), [0, 0, 0, 0.0])
+        totals[0] += call.input_tokens
+        totals[1] += call.output_tokens
+        totals[2] += 1
+        totals[3] += rates.cost(call.input_tokens, call.output_tokens,
+                                call.cache_read_tokens, call.cache_write_tokens)
+    return expected
+
+
+class CallLedgerTest(unittest.TestCase):
+    def test_calls_round_trip(self):
+        calls = _calls()
+        ledger = CallLedger()
+        for call in calls:
+            ledger.append(call)
+
+        self.assertEqual(len(ledger), len(calls))
+        self.assertEqual(ledger[-1], calls[-1])
+        for call, stored in zip(calls, ledger):
+            self.assertEqual(stored.role, call.role)
+            self.assertEqual(stored.model, call.model)
+            self.assertEqual(
+                (stored.input_tokens, stored.output_tokens, stored.cache_read_tokens, stored.cache_write_tokens,
+                 stored.round, stored.started_at, stored.finished_at, stored.level),
+                (call.input_tokens, call.output_tokens, call.cache_read_tokens, call.cache_write_tokens,
+                 call.round, call.started_at, call.finished_at, call.level)
+            )
+
+    def test_totals_by_prices_each_call_at_its_model(self):
+        calls = _calls()
+        ledger = CallLedger()
+        for call in calls:
+            ledger.append(call)
+
+        for column, key in (("role", "role"), ("round", "round")):
+            totals = ledger.totals_by(column, MODEL_PRICING, lambda role: "claude-sonnet-4-5")
+            expected = _expected_totals(calls, key)
+            self.assertEqual(set(totals), set(expected))
+            for group, (input_tokens, output_tokens, count, cost) in expected.items():
+                self.assertEqual(
+                    (totals[group].input_tokens, totals[group].output_tokens, totals[group].calls),
+                    (input_tokens, output_tokens, count)
+                )
+                self.assertAlmostEqual(totals[group].cost, cost)
+
+        with self.assertRaises(ValueError):
+            ledger.totals_by("model")
+
+
+class PersistentLedgerTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "costs.ledger")
+        self.calls = _calls()
+        with LedgerWriter(self.path, sync_every=5) as writer:
+            for i, call in enumerate(self.calls):
+                writer.append_row(
+                    call.role, call.task_id, call.input_tokens, call.output_tokens, 1_000.0 + i,
+                    call.round, call.model, call.cache_read_tokens, call.cache_write_tokens,
+                    call.started_at, call.finished_at, call.level
+                )
+
+    def _numpy_modes(self):
+        """numpy (if installed) and None, for the pure-Python fallback."""
+        return [None] if cost_ledger.numpy is None else [cost_ledger.numpy, None]
+
+    def test_records_round_trip(self):
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), len(self.calls))
+            for i, call in enumerate(self.calls):
+                stored = reader[i]
+                self.assertEqual(
+                    (stored.role, stored.task_id, stored.model, stored.input_tokens, stored.output_tokens,
+                     stored.cache_read_tokens, stored.cache_write_tokens, stored.round, stored.level),
+                    (call.role, call.task_id, call.model, call.input_tokens, call.output_tokens,
+                     call.cache_read_tokens, call.cache_write_tokens, call.round, call.level)
+                )
+                self.assertEqual(reader.timestamp(i), 1_000.0 + i)
+
+    def test_totals_match_the_calls(self):
+        for module in self._numpy_modes():
+            with self.subTest(numpy=module is not None), mock.patch.object(cost_ledger, "numpy", module), \
+                    LedgerReader(self.path) as reader:
+                for column, key in (("role", "role"), ("task_id", "task_id"), ("round", "round")):
+                    totals = reader.totals_by(column, pricing=MODEL_PRICING)
+                    expected = _expected_totals(self.calls, key)
+                    self.assertEqual(set(totals), set(expected))
+                    for group, (input_tokens, output_tokens, count, cost) in expected.items():
+                        self.assertEqual(
+                            (totals[group].input_tokens, totals[group].output_tokens, totals[group].calls),
+                            (input_tokens, output_tokens, count)
+                        )
+                        self.assertAlmostEqual(totals[group].cost, cost)
+
+                costs = reader.cost_by_role()
+                self.assertAlmostEqual(costs["reviewer"], _expected_totals(self.calls, "role")["reviewer"][3])
+
+    def test_time_range_selects_records(self):
+        for module in self._numpy_modes():
+            with self.subTest(numpy=module is not None), mock.patch.object(cost_ledger, "numpy", module), \
+                    LedgerReader(self.path) as reader:
+                self.assertEqual(reader.range_for(1_002.0, 1_005.0), (2, 5))
+                totals = reader.totals_by("task_id", since=1_002.0, until=1_005.0)
+                self.assertEqual(sorted(totals), ["t2", "t3", "t4"])
+
+    def test_reopening_drops_a_torn_record_and_appends(self):
+        with open(self.path, "ab") as f:
+            f.write(b"\x01" * (LedgerWriter.RECORD.size // 2))
+
+        with LedgerWriter(self.path) as writer:
+            writer.append_row("coder", "late", 10, 20, 500.0, 3)
+
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), len(self.calls) + 1)
+            self.assertEqual(reader[-1].task_id, "late")
+            # Timestamps never go backwards, so readers can bisect on them
+            self.assertEqual(reader.timestamp(len(reader) - 1), 1_000.0 + len(self.calls) - 1)
+
+    def test_rejects_a_foreign_file(self):
+        with open(self.path, "r+b") as f:
+            f.write(b"NOTLEDGR")
+
+        with self.assertRaises(LedgerError):
+            LedgerReader(self.path)
+        with self.assertRaises(LedgerError):
+            LedgerWriter(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from cost_tracker import MODEL_PRICING, CostTracker, SubagentCall  # noqa: E402
+
+
+class CostByRoleTest(unittest.TestCase):
+    def test_detailed_report_lists_models_actually_used(self):
+        tracker = CostTracker(role_models={"coder": "claude-haiku-4-5"})
+        tracker.track_subagent_call("coder", "t1", "x" * 1300, "y" * 1300, 1)
+        tracker.track_subagent_call("coder", "t2", "x" * 1300, "y" * 1300, 1, model="claude-opus-4-1")
+        tracker.track_subagent_call("reviewer", "t3", "x" * 1300, "y" * 1300, 1, model="claude-opus-4-1")
+
+        report = tracker.get_cost_by_role(detailed=True)
+
+        self.assertEqual(report["coder"]["model"], "mixed")
+        self.assertEqual(report["coder"]["models"], ["claude-haiku-4-5", "claude-opus-4-1"])
+        self.assertEqual(report["reviewer"]["model"], "claude-opus-4-1")
+
+
+class CacheRecommendationTest(unittest.TestCase):
+    def _cache_advice(self, tracker):
+        return [r for r in tracker.get_optimization_recommendations() if r.startswith("Little prompt-cache reuse")]
+
+    def test_no_cache_advice_without_reported_cache_usage(self):
+        tracker = CostTracker()
+        for i in range(5):
+            tracker.track_subagent_call("coder", f"t{i}", "x" * 1300, "y" * 130, 1)
+
+        self.assertEqual(self._cache_advice(tracker), [])
+
+    def test_cache_advice_for_roles_missing_the_cache(self):
+        tracker = CostTracker()
+        tracker.track_subagent_call("reviewer", "r0", "x" * 1300, "y" * 130, 1, cache_read_tokens=2000)
+        for i in range(5):
+            tracker.track_subagent_call("coder", f"t{i}", "x" * 1300, "y" * 130, 1)
+
+        advice = self._cache_advice(tracker)
+        self.assertEqual(len(advice), 1)
+        self.assertIn("coder", advice[0])
+        self.assertNotIn("reviewer", advice[0])
+
+    def test_uncached_input_is_priced_at_the_calls_models(self):
+        tracker = CostTracker(role_models={"coder": "claude-haiku-4-5"})
+        tracker.track_subagent_call("reviewer", "r0", "x" * 1300, "y" * 130, 1, cache_read_tokens=2000)
+        for i in range(4):
+            tracker.track_subagent_call("coder", f"t{i}", "x" * 1300, "y" * 130, 1, model="claude-opus-4-1")
+        tracker.track_subagent_call("coder", "t4", "x" * 1300, "y" * 130, 1)
+
+        # 4,000 input tokens at $15/M on Opus plus 1,000 at $1/M on Haiku
+        advice = self._cache_advice(tracker)
+        self.assertEqual(len(advice), 1)
+        self.assertIn("coder ($0.0610 uncached input)", advice[0])
+
+
+class RunningAggregatesTest(unittest.TestCase):
+    def _record(self, tracker):
+        for i in range(30):
+            tracker.track_subagent_call(
+                ("coder", "reviewer", "researcher")[i % 3], f"t{i}", "x" * (500 + 37 * i), "y" * (90 + 11 * i),
+                1 + i % 4, cache_read_tokens=40 * (i % 5),
+                model="claude-opus-4-1" if i % 7 == 0 else None
+            )
+
+    def _recomputed(self, tracker):
+        """Totals summed from scratch over the recorded calls."""
+        by_role, by_round = {}, {}
+        total_input = total_output = 0
+        for call in tracker.iter_calls():
+            cost = MODEL_PRICING[call.model or tracker.model_for(call.role)].cost(
+                call.input_tokens, call.output_tokens, call.cache_read_tokens, call.cache_write_tokens
+            )
+            by_role[call.role] = by_role.get(call.role, 0.0) + cost
+            by_round[call.round] = by_round.get(call.round, 0.0) + cost
+            total_input += call.input_tokens + call.cache_read_tokens + call.cache_write_tokens
+            total_output += call.output_tokens
+        return by_role, by_round, (total_input, total_output)
+
+    def assert_matches_recompute(self, tracker):
+        by_role, by_round, tokens = self._recomputed(tracker)
+        self.assertEqual(tracker.get_total_tokens(), tokens)
+        self.assertAlmostEqual(tracker.get_total_cost(), sum(by_role.values()))
+        for expected, actual in ((by_role, tracker.get_cost_by_role()), (by_round, tracker.get_cost_by_round())):
+            self.assertEqual(set(actual), set(expected))
+            for key, cost in expected.items():
+                self.assertAlmostEqual(actual[key], cost)
+
+    def test_aggregates_match_a_full_recompute(self):
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                tracker = CostTracker(columnar=columnar, role_models={"reviewer": "claude-haiku-4-5"})
+                self._record(tracker)
+                self.assert_matches_recompute(tracker)
+
+    def test_calls_edited_directly_are_picked_up(self):
+        tracker = CostTracker()
+        self._record(tracker)
+        tracker.get_total_cost()
+
+        tracker.calls.append(SubagentCall("planner", "p0", 5_000, 700, "", 9))
+        self.assert_matches_recompute(tracker)
+
+        del tracker.calls[:10]
+        self.assert_matches_recompute(tracker)
+        self.assertEqual(tracker.get_usage_totals("run").calls, 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from latency import LatencyTracker  # noqa: E402
+
+
+class LatencyTrackerTest(unittest.TestCase):
+    def test_phase_roles_stay_out_of_level_barriers(self):
+        latency = LatencyTracker()
+        latency.record("coder", "c1", 1, 0, 0.0, 10.0)
+        latency.record("coder", "c2", 1, 0, 0.0, 4.0)
+        latency.record("validator", "val", 1, 0, 11.0, 40.0)
+
+        barrier = latency.levels[(1, 0)]
+        self.assertEqual(barrier.calls, 2)
+        self.assertEqual(barrier.barrier_wait_seconds, 6.0)
+        self.assertEqual(latency.barrier_path_seconds(), 10.0)
+        self.assertIn("validator", latency.role_histograms)
+
+
+if __name__ == "__main__":
+    unittest.main()
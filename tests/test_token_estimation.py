@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from token_estimation import (  # noqa: E402
+    BPEEstimator, CalibratedEstimator, CachedEstimator, ContentClassEstimator, HeuristicEstimator, TokenEstimator
+)
+
+
+class TokenEstimatorTest(unittest.TestCase):
+    def test_subclass_without_count_cannot_be_created(self):
+        class Incomplete(TokenEstimator):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_builtin_estimators_are_concrete(self):
+        for estimator_class in (HeuristicEstimator, CalibratedEstimator, ContentClassEstimator):
+            self.assertGreater(estimator_class().count("some text to count"), 0)
+        self.assertGreater(CachedEstimator(HeuristicEstimator()).count("some text"), 0)
+        self.assertFalse(getattr(BPEEstimator.count, "__isabstractmethod__", False))
+
+
+
+class ContentClassEstimatorTest(unittest.TestCase):
+    def test_class_counts_cover_every_character_once(self):
+        text = (
+            "Plain English prose, with punctuation.\n"
+            "def f(x_1):\n    return {'key': x_1 ** 2}  # 42\n"
+            "日本語のテキスト、カタカナ・ひらがな。한국어 123\t\n"
+        )
+        estimator = ContentClassEstimator()
+
+        counts = dict(zip(estimator.CONTENT_CLASSES, estimator.class_counts(text)))
+
+        self.assertEqual(sum(counts.values()), len(text))
+        self.assertEqual(counts["digits"], len("1" "1" "2" "42" "123"))
+        self.assertEqual(counts["cjk"], len("日本語のテキスト") + len("カタカナ・ひらがな") + len("한국어"))
+        self.assertTrue(all(chars > 0 for chars in counts.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from cost_tracker import MODEL_PRICING, CostTracker  # noqa: E402
+from trace_export import build_chrome_trace  # noqa: E402
+
+
+class ChromeTraceTest(unittest.TestCase):
+    def test_call_cost_uses_per_call_model_override(self):
+        tracker = CostTracker(role_models={"coder": "claude-haiku-4-5"})
+        tracker.track_subagent_call("coder", "t1", "x" * 1300, "y" * 1300, 1, started_at=100.0, finished_at=110.0)
+        tracker.track_subagent_call(
+            "coder", "t2", "x" * 1300, "y" * 1300, 1,
+            model="claude-opus-4-1", started_at=100.0, finished_at=120.0
+        )
+
+        slices = {
+            event["args"]["task_id"]: event["args"]
+            for event in build_chrome_trace(tracker)["traceEvents"]
+            if event.get("cat") == "call"
+        }
+
+        for task_id, model in (("t1", "claude-haiku-4-5"), ("t2", "claude-opus-4-1")):
+            args = slices[task_id]
+            self.assertEqual(args["model"], model)
+            expected = MODEL_PRICING[model].cost(args["input_tokens"], args["output_tokens"])
+            self.assertAlmostEqual(args["cost_usd"], round(expected, 6))
+        self.assertGreater(slices["t2"]["cost_usd"], slices["t1"]["cost_usd"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from cost_tracker import AsyncCostRecorder, CostTracker  # noqa: E402
+from tracker_stress import _expected_tokens, stress_asyncio, stress_serial, stress_threads  # noqa: E402
+
+
+CALLS = 2_000
+
+
+class TrackerStressTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = _expected_tokens(CALLS)
+
+    def assert_complete(self, result):
+        self.assertEqual(result["recorded"], CALLS)
+        self.assertEqual(result["lost"], 0)
+        self.assertEqual(result["duplicated"], 0)
+        self.assertEqual(result["aggregate_calls"], CALLS)
+        self.assertTrue(result["tokens_match"])
+
+    def test_serial(self):
+        self.assert_complete(stress_serial(CALLS, self.expected))
+
+    def test_threads_buffered(self):
+        self.assert_complete(stress_threads(CALLS, 16, True, self.expected))
+
+    def test_threads_locked(self):
+        self.assert_complete(stress_threads(CALLS, 16, False, self.expected))
+
+    def test_asyncio_queue(self):
+        self.assert_complete(stress_asyncio(CALLS, self.expected))
+
+
+class AsyncCostRecorderTest(unittest.TestCase):
+    def test_loop_keeps_running_while_another_thread_holds_the_tracker(self):
+        tracker = CostTracker()
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with tracker._lock:
+                held.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        held.wait(5)
+
+        async def run():
+            async with AsyncCostRecorder(tracker) as recorder:
+                await recorder.record("coder", "t1", "x" * 130, "y" * 130, 1)
+
+                # The consumer picks the call up and waits on the lock meanwhile
+                start = time.perf_counter()
+                for _ in range(5):
+                    await asyncio.sleep(0.01)
+                stalled = time.perf_counter() - start
+
+                release.set()
+            return stalled
+
+        try:
+            stalled = asyncio.run(run())
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertLess(stalled, 0.5)
+        self.assertEqual([call.task_id for call in tracker.iter_calls()], ["t1"])
+
+
+if __name__ == "__main__":
+    unittest.main()